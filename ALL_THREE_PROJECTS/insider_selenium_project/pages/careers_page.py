@@ -1,6 +1,6 @@
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 from resources.base_page import BasePage
-import time
 
 
 class CareersPage(BasePage):
@@ -12,10 +12,13 @@ class CareersPage(BasePage):
     FILTER_DEPARTMENT = (By.ID, "filter-by-department")
     LOCATION_OPTION_ISTANBUL = (By.XPATH, "//option[contains(@class, 'istanbulturkiye')]")
     DEPARTMENT_OPTION_QA = (By.XPATH, "//span[@id='select2-filter-by-department-container']")
+    JOBS_LIST_CONTAINER = (By.ID, "jobs-list")
     JOB_LIST = (By.XPATH, "//*[contains(@class, 'position-list-item')][1]//a")
-    POSITION_TITLE = (By.XPATH, "//*[contains(@class, 'position-title')]")
-    POSITION_DEPARTMENT = (By.XPATH, "//*[contains(@class, 'position-department')]")
-    POSITION_LOCATION = (By.XPATH, "//*[contains(@class, 'position-location')]")
+    JOB_ITEM = (By.CSS_SELECTOR, ".position-list-item")
+    # Relative to a job item (also usable page-wide)
+    POSITION_TITLE = (By.XPATH, ".//*[contains(@class, 'position-title')]")
+    POSITION_DEPARTMENT = (By.XPATH, ".//*[contains(@class, 'position-department')]")
+    POSITION_LOCATION = (By.XPATH, ".//*[contains(@class, 'position-location')]")
     VIEW_ROLE_BTN = (By.XPATH, "//div[@class='position-list-item-wrapper bg-light']//a")
     
     def __init__(self, driver):
@@ -26,16 +29,19 @@ class CareersPage(BasePage):
         """Navigate to QA Careers page"""
         self.navigate_to(self.qa_careers_url)
         self.wait_for_page_load()
-        time.sleep(2)  # Allow dynamic content to load
+        self.wait_for_network_idle()  # Dynamic content is loaded via XHR
         
     def click_see_all_qa_jobs(self):
         """Click on 'See all QA jobs' button"""
         try:
             self.is_element_visible(self.SEE_ALL_QA_JOBS_BTN, timeout=10)
-            time.sleep(1)
+            listing_url = self.get_current_url()
             self.click_element(self.SEE_ALL_QA_JOBS_BTN)
+            self.wait_until(EC.url_changes(listing_url), kind="url change", label=listing_url)
             self.wait_for_page_load()
-            time.sleep(3)  # Wait for jobs to load
+            # Jobs are fetched and rendered after load, then the department filter is preselected
+            self.wait_for_network_idle()
+            self.wait_for_dom_settled(self.JOBS_LIST_CONTAINER)
         except Exception as e:
             self.take_screenshot("click_see_all_qa_jobs_failed")
             raise
@@ -45,9 +51,10 @@ class CareersPage(BasePage):
         try:
             # Click location dropdown
             self.click_element(self.FILTER_LOCATION)
-            time.sleep(1)
-            self.select_from_dropdown_by_select_class('filter-by-location', 'Istanbul, Turkiye')
-            time.sleep(2)
+            self.wait_for_rerender(
+                self.JOBS_LIST_CONTAINER,
+                lambda: self.select_from_dropdown_by_select_class('filter-by-location', 'Istanbul, Turkiye')
+            )
         except Exception as e:
             self.take_screenshot("filter_by_location_failed")
             raise
@@ -57,8 +64,10 @@ class CareersPage(BasePage):
         try:
             # Click department dropdown
             self.click_element(self.FILTER_DEPARTMENT)
-            self.select_from_dropdown_by_select_class('filter-by-department', 'Quality Assurance')
-            time.sleep(2)
+            self.wait_for_rerender(
+                self.JOBS_LIST_CONTAINER,
+                lambda: self.select_from_dropdown_by_select_class('filter-by-department', 'Quality Assurance')
+            )
         except Exception as e:
             self.take_screenshot("filter_by_department_failed")
             raise
@@ -72,16 +81,43 @@ class CareersPage(BasePage):
             self.take_screenshot("get_job_list_failed")
             return []
             
-    def verify_all_jobs_match_criteria(self):
-        """Verify all jobs match the filter criteria"""
+    def get_job_details(self):
+        """Position, department and location of every visible job (one WebDriver round trip)"""
+        return self.extract_records(self.JOB_ITEM, {
+            "position": self.POSITION_TITLE,
+            "department": self.POSITION_DEPARTMENT,
+            "location": self.POSITION_LOCATION,
+        })
+        
+    def verify_all_jobs_match_criteria(self, position="Quality Assurance", department="Quality Assurance",
+                                       location="Istanbul, Turkiye"):
+        """Verify every listed job contains the expected position, department and location"""
         self.wait_for_page_load()
-        jobs = self.get_job_list()
+        self.is_element_present(self.JOB_ITEM)
+        jobs = self.get_job_details()
         
         if not jobs:
             self.take_screenshot("no_jobs_found")
             raise AssertionError("No jobs found in the list")
             
         print(f"\nFound {len(jobs)} jobs. Verifying each job...")
+        expected = {"position": position, "department": department, "location": location}
+        mismatches = []
+        for index, job in enumerate(jobs, start=1):
+            wrong = [
+                f"{field} '{job[field]}' does not contain '{value}'"
+                for field, value in expected.items()
+                if value.lower() not in (job[field] or "").lower()
+            ]
+            status = "✗" if wrong else "✓"
+            print(f"  {status} {index}. {job['position']} | {job['department']} | {job['location']}")
+            if wrong:
+                mismatches.append(f"Job {index}: " + "; ".join(wrong))
+                
+        if mismatches:
+            self.take_screenshot("jobs_criteria_mismatch")
+            raise AssertionError(f"{len(mismatches)} of {len(jobs)} jobs do not match the filters:\n"
+                                 + "\n".join(mismatches))
         
     def click_view_role_for_first_job(self):
         """Click 'View Role' button for the first job"""
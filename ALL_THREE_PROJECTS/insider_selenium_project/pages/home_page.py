@@ -1,3 +1,4 @@
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from resources.base_page import BasePage
 
@@ -27,7 +28,12 @@ class HomePage(BasePage):
     def accept_cookies_if_present(self):
         """Accept cookies popup if it appears"""
         try:
-            if self.is_element_visible(self.ACCEPT_COOKIES_BTN, timeout=5):
+            # The banner is injected by a script after the load event; let the DOM settle first
+            self.wait_for_dom_settled(timeout=5)
+        except TimeoutException:
+            pass  # Animations kept the DOM busy; the visibility wait below still applies
+        try:
+            if self.is_element_visible(self.ACCEPT_COOKIES_BTN, timeout=2):
                 self.click_element(self.ACCEPT_COOKIES_BTN)
         except:
             pass  # Cookie popup didn't appear
@@ -36,8 +42,9 @@ class HomePage(BasePage):
         """Verify home page is loaded by checking main elements"""
         try:
             logo_visible = self.is_element_visible(self.LOGO, timeout=10)
-            main_menu_banner1 = self.is_element_visible(self.MAIN_MENU_BANNER_1, timeout=10)
             main_menu_banner2 = self.is_element_visible(self.MAIN_MENU_BANNER_2, timeout=10)
+            # Informational only (not part of the result), so it must not burn a full timeout
+            main_menu_banner1 = self.is_element_visible(self.MAIN_MENU_BANNER_1, quick=True)
             return logo_visible and main_menu_banner2
         except Exception as e:
             self.take_screenshot("home_page_load_failed")
@@ -16,6 +16,7 @@ class LeverApplicationPage(BasePage):
     def is_lever_application_page(self):
         """Verify we are on Lever application page"""
         try:
+            self.wait_for_page_load()
             current_url = self.get_current_url()
             print(f"\nCurrent URL: {current_url}")
             
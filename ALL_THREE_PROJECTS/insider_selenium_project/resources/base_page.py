@@ -1,27 +1,181 @@
-import os
-from datetime import datetime
-from selenium.common.exceptions import TimeoutException
+import sys
+import time
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.by import By
 
+from resources.screenshots import SCREENSHOTS
+from resources.wait_profiler import WAITS
+
+
+# Poll interval of explicit waits; quick (absence) checks return within one
+POLL_INTERVAL = 0.5
+
+
+# Counts in-flight XHR/fetch requests and remembers the last network activity.
+# Installed once per document; requests started before installation are still
+# noticed through the resource timing entries they produce when they finish.
+NETWORK_PROBE_JS = """
+if (!window.__networkProbe) {
+    const probe = window.__networkProbe = {pending: new Map(), nextId: 0, last: performance.now()};
+    const start = () => { const id = probe.nextId++; probe.pending.set(id, performance.now()); probe.last = performance.now(); return id; };
+    const done = (id) => { probe.pending.delete(id); probe.last = performance.now(); };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        const id = start();
+        this.addEventListener('loadend', () => done(id));
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            const id = start();
+            return fetch.apply(this, arguments).finally(() => done(id));
+        };
+    }
+    try {
+        new PerformanceObserver(() => { probe.last = performance.now(); }).observe({type: 'resource'});
+    } catch (e) {}
+}
+const probe = window.__networkProbe, now = performance.now(), ignoreAfter = arguments[0];
+let active = 0;
+probe.pending.forEach((started) => { if (now - started < ignoreAfter) active++; });
+return {active: active, idle_ms: now - probe.last};
+"""
+
+# Counts DOM mutations below a root element and remembers the last one
+MUTATION_PROBE_JS = """
+const root = arguments[0] || document.documentElement;
+if (!root.__mutationProbe) {
+    const probe = root.__mutationProbe = {count: 0, last: performance.now()};
+    new MutationObserver((records) => { probe.count += records.length; probe.last = performance.now(); })
+        .observe(root, {childList: true, subtree: true, characterData: true, attributes: arguments[1]});
+}
+return {count: root.__mutationProbe.count, idle_ms: performance.now() - root.__mutationProbe.last};
+"""
+
+# Collects the text of several fields per list item in one round trip.
+# arguments: item locator, {field: locator} relative to the item, visible_only;
+# locators arrive as [strategy, value] with strategy "css" or "xpath".
+EXTRACT_RECORDS_JS = """
+const [itemLocator, fields, visibleOnly] = arguments;
+const query = (context, [strategy, value], all) => {
+    if (strategy === 'css') {
+        return all ? Array.from(context.querySelectorAll(value)) : context.querySelector(value);
+    }
+    const type = all ? XPathResult.ORDERED_NODE_SNAPSHOT_TYPE : XPathResult.FIRST_ORDERED_NODE_TYPE;
+    const result = document.evaluate(value, context, null, type, null);
+    if (!all) return result.singleNodeValue;
+    return Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));
+};
+const text = (node) => node ? (node.innerText || node.textContent || '').replace(/\\s+/g, ' ').trim() : null;
+return query(document, itemLocator, true)
+    .filter((item) => !visibleOnly || item.getClientRects().length > 0)
+    .map((item) => Object.fromEntries(
+        Object.entries(fields).map(([name, locator]) => [name, text(query(item, locator, false))])
+    ));
+"""
+
+
+def _script_locator(locator):
+    """Translate a Selenium (By, value) locator into the [strategy, value] form used by scripts"""
+    by, value = locator
+    if by == By.XPATH:
+        return ["xpath", value]
+    if by == By.CSS_SELECTOR:
+        return ["css", value]
+    if by == By.ID:
+        return ["css", f'[id="{value}"]']
+    if by == By.CLASS_NAME:
+        return ["css", f".{value}"]
+    if by == By.TAG_NAME:
+        return ["css", value]
+    if by == By.NAME:
+        return ["css", f'[name="{value}"]']
+    raise ValueError(f"Locator strategy '{by}' is not supported in scripts")
+
+
+def _label(locator):
+    by, value = locator
+    return f"{by}={value}"
+
 
 class BasePage:
     """Base page class containing common methods for all page objects"""
     
+    # Callables receiving the page after every wait_for_page_load (e.g. metrics collectors)
+    page_load_hooks = []
+    # Callables receiving (page, previous_step) when the test moves on to another step
+    step_hooks = []
+    # Page object method currently running (see _current_step); reset per test
+    active_step = None
+    
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, 15)
         
     def navigate_to(self, url):
-        """Navigate to a specific URL"""
+        """Navigate to a specific URL (get blocks until load, so it is profiled like a wait)"""
+        step = self._enter_step()
+        started = time.perf_counter()
         self.driver.get(url)
+        WAITS.record(step, "navigate", url, time.perf_counter() - started, False)
+        
+    def wait_until(self, condition, timeout=15, kind="wait", label="", message="",
+                   poll_frequency=POLL_INTERVAL, ignored_exceptions=None):
+        """
+        WebDriverWait.until that records its duration in the wait profiler
+        
+        Args:
+            condition: Callable receiving the driver, truthy when done
+            timeout: Seconds before TimeoutException
+            kind: Wait type shown in the report, e.g. 'visible'
+            label: Locator or condition shown in the report
+            message: TimeoutException message
+            poll_frequency: Seconds between checks
+            ignored_exceptions: Exceptions treated as 'not yet'
+            
+        Returns:
+            The condition's result
+        """
+        step = self._enter_step()
+        started = time.perf_counter()
+        timed_out = True
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency, ignored_exceptions).until(condition, message)
+            timed_out = False
+            return result
+        finally:
+            WAITS.record(step, kind, label, time.perf_counter() - started, timed_out)
+            
+    def _enter_step(self):
+        """Current step; runs the step hooks when it differs from the previous one"""
+        step = self._current_step()
+        previous = BasePage.active_step
+        if step != previous:
+            BasePage.active_step = step
+            if previous is not None:
+                for hook in self.step_hooks:
+                    hook(self, previous)
+        return step
+            
+    def _current_step(self):
+        """Outermost page object method on the call stack, i.e. the one the test called"""
+        step = None
+        frame = sys._getframe(1)
+        while frame is not None:
+            owner = frame.f_locals.get("self")
+            if isinstance(owner, BasePage):
+                step = f"{type(owner).__name__}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return step or "(test)"
         
     def find_element(self, locator):
         """Find a single element with explicit wait"""
         try:
-            return self.wait.until(EC.presence_of_element_located(locator))
+            return self.wait_until(EC.presence_of_element_located(locator), kind="present", label=_label(locator))
         except TimeoutException:
             self.take_screenshot(f"element_not_found_{locator[1]}")
             raise
@@ -29,7 +183,7 @@ class BasePage:
     def find_elements(self, locator):
         """Find multiple elements with explicit wait"""
         try:
-            self.wait.until(EC.presence_of_element_located(locator))
+            self.wait_until(EC.presence_of_element_located(locator), kind="present", label=_label(locator))
             return self.driver.find_elements(*locator)
         except TimeoutException:
             self.take_screenshot(f"elements_not_found_{locator[1]}")
@@ -38,7 +192,7 @@ class BasePage:
     def click_element(self, locator):
         """Click on an element with explicit wait for clickability"""
         try:
-            element = self.wait.until(EC.element_to_be_clickable(locator))
+            element = self.wait_until(EC.element_to_be_clickable(locator), kind="clickable", label=_label(locator))
             element.click()
         except Exception as e:
             self.take_screenshot(f"click_failed_{locator[1]}")
@@ -56,6 +210,9 @@ class BasePage:
 
     def select_from_dropdown_by_select_class(self, dropdown_id, option_text):
         self.wait_for_page_load()
+        # Seçenekler JS ile sonradan doldurulabilir; ilgili option gelene kadar bekle
+        option = (By.XPATH, f"//select[@id='{dropdown_id}']/option[normalize-space()='{option_text}']")
+        self.wait_until(EC.presence_of_element_located(option), kind="present", label=_label(option))
         # Dropdown'ı bul
         dropdown_element = self.driver.find_element(By.ID, dropdown_id)
         # Select objesi oluştur
@@ -64,21 +221,33 @@ class BasePage:
         select.select_by_visible_text(option_text)
         print(f"✓ Selected: {option_text}")
             
-    def is_element_visible(self, locator, timeout=10):
-        """Check if element is visible"""
+    def is_element_visible(self, locator, timeout=10, quick=False):
+        """
+        Check if element is visible
+        
+        Args:
+            locator: Element locator
+            timeout: Seconds to wait for the element to become visible
+            quick: Absence check for elements that are usually not there;
+                   returns within one poll interval instead of burning the timeout
+        """
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
+            self.wait_until(
+                EC.visibility_of_element_located(locator),
+                timeout=POLL_INTERVAL if quick else timeout,
+                kind="quick visible" if quick else "visible", label=_label(locator)
             )
             return True
         except TimeoutException:
             return False
             
-    def is_element_present(self, locator, timeout=10):
-        """Check if element is present in DOM"""
+    def is_element_present(self, locator, timeout=10, quick=False):
+        """Check if element is present in DOM (quick: see is_element_visible)"""
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
+            self.wait_until(
+                EC.presence_of_element_located(locator),
+                timeout=POLL_INTERVAL if quick else timeout,
+                kind="quick present" if quick else "present", label=_label(locator)
             )
             return True
         except TimeoutException:
@@ -99,10 +268,130 @@ class BasePage:
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
         
     def wait_for_page_load(self, timeout=30):
-        """Wait for page to load completely"""
-        WebDriverWait(self.driver, timeout).until(
-            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        """Wait for page to load completely, then run the page load hooks"""
+        self.wait_until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete",
+            timeout=timeout, kind="page load"
+        )
+        for hook in self.page_load_hooks:
+            hook(self)
+        
+    def extract_records(self, item_locator, fields, visible_only=True):
+        """
+        Text of several fields for every list item, fetched with a single execute_script
+        
+        Reading N items field by field with find_element/.text costs one
+        WebDriver round trip per field and item; this costs one in total.
+        
+        Args:
+            item_locator: Locator of the list items (e.g. job cards)
+            fields: {name: locator} evaluated relative to each item; XPath
+                    locators must start with '.' to stay inside the item
+            visible_only: Skip items that are hidden (e.g. filtered out)
+            
+        Returns:
+            One dict per item, {name: text or None if the field is missing}
+        """
+        return self.driver.execute_script(
+            EXTRACT_RECORDS_JS,
+            _script_locator(item_locator),
+            {name: _script_locator(locator) for name, locator in fields.items()},
+            visible_only
+        )
+        
+    # ==================== EVENT-DRIVEN WAITS ====================
+    
+    def network_state(self, ignore_after_ms=5000):
+        """In-flight requests (long polls and beacons older than ignore_after_ms excluded) and ms since last activity"""
+        return self.driver.execute_script(NETWORK_PROBE_JS, ignore_after_ms)
+        
+    def mutation_state(self, root=None, attributes=False):
+        """Mutation count below root (default: whole document) and ms since the last mutation"""
+        return self.driver.execute_script(MUTATION_PROBE_JS, root, attributes)
+        
+    def wait_for_network_idle(self, timeout=15, quiet_ms=500, ignore_after_ms=5000):
+        """
+        Wait until no XHR/fetch is in flight and nothing was loaded for quiet_ms
+        
+        Args:
+            timeout: Seconds before TimeoutException
+            quiet_ms: Required period without network activity
+            ignore_after_ms: Requests pending longer than this (long polling,
+                             analytics beacons) do not keep the page busy
+        """
+        self.wait_until(
+            lambda driver: self._is_network_idle(quiet_ms, ignore_after_ms),
+            timeout=timeout, kind="network idle", poll_frequency=0.1,
+            message=f"Network not idle for {quiet_ms}ms within {timeout}s"
+        )
+        
+    def _is_network_idle(self, quiet_ms, ignore_after_ms):
+        state = self.network_state(ignore_after_ms)
+        return state["active"] == 0 and state["idle_ms"] >= quiet_ms
+        
+    def wait_for_dom_settled(self, locator=None, timeout=15, quiet_ms=500, attributes=False):
+        """
+        Wait until the DOM below locator (default: whole document) stops changing
+        
+        Args:
+            locator: Root element to observe; scoping to a container keeps
+                     unrelated animations (sliders, counters) from resetting the wait
+            timeout: Seconds before TimeoutException
+            quiet_ms: Required period without mutations
+            attributes: Count attribute changes as mutations too
+        """
+        root = self.find_element(locator) if locator else None
+        self.wait_until(
+            lambda driver: self.mutation_state(root, attributes)["idle_ms"] >= quiet_ms,
+            timeout=timeout, kind="dom settled", label=_label(locator) if locator else "document",
+            poll_frequency=0.1, message=f"DOM not settled for {quiet_ms}ms within {timeout}s"
+        )
+        
+    def wait_for_rerender(self, locator, action, timeout=15, quiet_ms=500):
+        """
+        Run action and wait until the container at locator was re-rendered and has settled
+        
+        The container counts as re-rendered when its content mutated or the
+        element itself was replaced. If the action leaves the content
+        unchanged (e.g. a filter that matches the same items), the wait ends
+        once the network is idle and nothing changed for twice quiet_ms.
+        
+        Args:
+            locator: Container whose content the action re-renders (e.g. a result list)
+            action: Callable triggering the change (click, select, ...)
+            timeout: Seconds before TimeoutException
+            quiet_ms: Required period without mutations after the re-render
+            
+        Returns:
+            True if the content changed, False if it stayed the same
+        """
+        container = self.find_element(locator)
+        before = self.mutation_state(container)["count"]
+        action()
+        started = time.monotonic()
+        outcome = {}
+        
+        def rerendered(driver):
+            nonlocal container, before
+            try:
+                state = self.mutation_state(container)
+            except StaleElementReferenceException:
+                # The whole container was replaced; observe the new one from scratch
+                container, before = driver.find_element(*locator), -1
+                outcome["changed"] = True
+                return False
+            if state["count"] > before:
+                outcome["changed"] = True
+            if not self._is_network_idle(quiet_ms, 5000) or state["idle_ms"] < quiet_ms:
+                return False
+            return outcome.get("changed") or (time.monotonic() - started) * 1000 >= 2 * quiet_ms
+            
+        self.wait_until(
+            rerendered, timeout=timeout, kind="re-render", label=_label(locator), poll_frequency=0.1,
+            ignored_exceptions=[NoSuchElementException],
+            message=f"{locator[1]} not re-rendered within {timeout}s"
         )
+        return outcome.get("changed", False)
         
     def get_current_url(self):
         """Get current page URL"""
@@ -114,11 +403,7 @@ class BasePage:
         self.driver.switch_to.window(windows[-1])
         
     def take_screenshot(self, name="screenshot"):
-        """Take screenshot and save with timestamp"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_dir = os.path.join(os.path.dirname(__file__), "..", "screenshots")
-        os.makedirs(screenshot_dir, exist_ok=True)
-        screenshot_path = os.path.join(screenshot_dir, f"{name}_{timestamp}.png")
-        self.driver.save_screenshot(screenshot_path)
+        """Take screenshot and save with timestamp (encoded and written in the background)"""
+        screenshot_path = SCREENSHOTS.capture(self.driver, name)
         print(f"Screenshot saved: {screenshot_path}")
         return screenshot_path
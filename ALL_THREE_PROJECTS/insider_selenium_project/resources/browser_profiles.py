@@ -0,0 +1,69 @@
+class BrowserProfile:
+    """
+    Browser settings a test run can be executed with
+
+    Page objects are unaware of the profile; it only changes how the browser
+    is launched and which requests it is allowed to make.
+    """
+
+    def __init__(self, name, headless=False, chrome_args=(), blocked_urls=(), firefox_prefs=None):
+        """
+        Args:
+            name: Profile name used on the command line and in reports
+            headless: Run without a visible window
+            chrome_args: Additional Chrome command line switches
+            blocked_urls: URL patterns ('*' wildcards) Chrome must not load, applied via CDP
+            firefox_prefs: about:config preferences approximating the blocklist in Firefox
+        """
+        self.name = name
+        self.headless = headless
+        self.chrome_args = list(chrome_args)
+        self.blocked_urls = list(blocked_urls)
+        self.firefox_prefs = dict(firefox_prefs or {})
+
+    def __repr__(self):
+        return f"BrowserProfile({self.name!r})"
+
+
+# The flow only needs the DOM: no pixels, sound, glyphs or tracking.
+# Patterns match the whole URL, so extensions end in '*' to allow query strings.
+BLOCKED_IMAGES = ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"]
+BLOCKED_MEDIA = ["*.mp4*", "*.webm*", "*.ogg*", "*.mp3*", "*.wav*", "*.m3u8*"]
+BLOCKED_FONTS = ["*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+BLOCKED_ANALYTICS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*connect.facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*", "*snap.licdn.com*",
+    "*px.ads.linkedin.com*", "*bat.bing.com*", "*hs-scripts.com*", "*hs-analytics.net*", "*hubspot.com*",
+    "*adroll.com*", "*youtube.com*", "*vimeo.com*",
+]
+
+PROFILES = {
+    "default": BrowserProfile("default"),
+    "performance": BrowserProfile(
+        "performance",
+        headless=True,
+        chrome_args=[
+            # Keep timers and rendering at full speed although nothing is on screen
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+            "--disable-extensions",
+            "--mute-audio",
+        ],
+        blocked_urls=BLOCKED_IMAGES + BLOCKED_MEDIA + BLOCKED_FONTS + BLOCKED_ANALYTICS,
+        firefox_prefs={
+            "permissions.default.image": 2,
+            "media.autoplay.default": 5,
+            "gfx.downloadable_fonts.enabled": False,
+            "dom.timeout.enable_budget_timer_throttling": False,
+        },
+    ),
+}
+
+
+def get_profile(name):
+    """Profile by name; raises ValueError listing the known profiles"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Browser profile '{name}' is not supported. Use one of: {', '.join(PROFILES)}") from None
@@ -0,0 +1,91 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+from resources.browser_profiles import get_profile
+from resources.driver_resolver import DriverResolver
+
+
+SUPPORTED_BROWSERS = ("chrome", "firefox")
+
+# Explicit waits in BasePage do all the waiting; an implicit wait on top
+# would stretch every failing lookup inside them to the implicit timeout
+IMPLICIT_WAIT = 0
+
+
+class DriverFactory:
+    """Launches configured browser sessions, locally or on a Selenium Grid; driver binaries are resolved once"""
+
+    def __init__(self, browser="chrome", profile="default", performance_log=False, remote_url=None):
+        """
+        Args:
+            browser: 'chrome' or 'firefox'
+            profile: Name of a profile in resources/browser_profiles.py
+            performance_log: Record DevTools Network events in Chrome's performance log
+            remote_url: Selenium Grid (or compatible) endpoint, e.g. http://localhost:4444;
+                        None launches the browser locally
+        """
+        self.browser = browser.lower()
+        self.profile = get_profile(profile)
+        self.performance_log = performance_log
+        self.remote_url = remote_url
+        if self.browser not in SUPPORTED_BROWSERS:
+            raise ValueError(f"Browser '{browser}' is not supported. Use 'chrome' or 'firefox'")
+        self.resolver = DriverResolver(self.browser)
+        self._driver_path = None
+
+    def driver_path(self):
+        """Path of chromedriver/geckodriver, taken from the driver lock file when still valid"""
+        if self._driver_path is None:
+            self._driver_path = self.resolver.resolve()
+        return self._driver_path
+
+    def create(self):
+        """Launch a new browser session"""
+        if self.browser == "chrome":
+            options = webdriver.ChromeOptions()
+            if self.profile.headless:
+                # A headless window cannot be maximized; give it the same viewport instead
+                options.add_argument("--headless=new")
+                options.add_argument("--window-size=1920,1080")
+            else:
+                options.add_argument("--start-maximized")
+            for argument in self.profile.chrome_args:
+                options.add_argument(argument)
+            options.add_argument("--disable-blink-features=AutomationControlled")
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            options.add_experimental_option('useAutomationExtension', False)
+            if self.performance_log:
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+            if self.remote_url:
+                driver = webdriver.Remote(command_executor=self.remote_url, options=options)
+            else:
+                driver = webdriver.Chrome(
+                    service=ChromeService(self.driver_path()),
+                    options=options
+                )
+            # Remote sessions expose no CDP; conftest rejects blocking profiles with --remote-url
+            if self.profile.blocked_urls and hasattr(driver, "execute_cdp_cmd"):
+                # Applies to every navigation of this tab, including after pool resets
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.profile.blocked_urls})
+        else:
+            options = webdriver.FirefoxOptions()
+            options.add_argument("--width=1920")
+            options.add_argument("--height=1080")
+            if self.profile.headless:
+                options.add_argument("-headless")
+            for name, value in self.profile.firefox_prefs.items():
+                options.set_preference(name, value)
+
+            if self.remote_url:
+                driver = webdriver.Remote(command_executor=self.remote_url, options=options)
+            else:
+                driver = webdriver.Firefox(
+                    service=FirefoxService(self.driver_path()),
+                    options=options
+                )
+
+        driver.implicitly_wait(IMPLICIT_WAIT)
+        return driver
@@ -0,0 +1,261 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+from resources.driver_factory import IMPLICIT_WAIT
+
+# Raised by a session whose browser or driver process died: a dead driver
+# process surfaces as a connection error (e.g. MaxRetryError), not a WebDriverException
+SESSION_ERRORS = (WebDriverException, HTTPError, ConnectionError)
+
+# Clears the current page's origin and reports what is left (0 when clean, -1 on error)
+_CLEAR_STORAGE_SCRIPT = """
+const done = arguments[arguments.length - 1];
+(async () => {
+    let left = 0;
+    localStorage.clear();
+    sessionStorage.clear();
+    left += localStorage.length + sessionStorage.length;
+    if (window.indexedDB && indexedDB.databases) {
+        const names = (await indexedDB.databases()).map(db => db.name);
+        // A database still open elsewhere stays blocked and is counted below
+        await Promise.all(names.map(name => new Promise(resolve => {
+            const request = indexedDB.deleteDatabase(name);
+            request.onsuccess = request.onerror = request.onblocked = resolve;
+        })));
+        left += (await indexedDB.databases()).length;
+    }
+    if (window.caches) {
+        for (const key of await caches.keys()) {
+            await caches.delete(key);
+        }
+        left += (await caches.keys()).length;
+    }
+    return left + (document.cookie ? 1 : 0);
+})().then(done, () => done(-1));
+"""
+
+
+def _origin(url):
+    """scheme://host[:port] of an http(s) URL; None for about:, data: and other opaque URLs"""
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    port = f":{parts.port}" if parts.port else ""
+    return f"{parts.scheme}://{parts.hostname}{port}"
+
+
+class DriverPool:
+    """
+    Keeps warm browser sessions and hands them out one test at a time
+
+    Launching a browser takes seconds; a pooled session is reset between
+    tests instead (cookies, storage of every origin the test visited, extra
+    windows, back to about:blank). Origins are recorded by track(), which
+    runs as a BasePage page load and step hook. A session is quit and
+    replaced after max_uses tests, when its storage could not be cleared
+    and verified empty, or as soon as a reset fails because the browser
+    crashed.
+    """
+
+    def __init__(self, factory, size=1, max_uses=20, implicit_wait=IMPLICIT_WAIT):
+        """
+        Args:
+            factory: Callable launching a new driver, e.g. DriverFactory("chrome").create
+            size: Number of warm sessions kept
+            max_uses: Tests served by one session before it is recycled
+            implicit_wait: Implicit wait restored on every reset
+        """
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.implicit_wait = implicit_wait
+        self._idle = []
+        self._uses = {}
+        self._origins = {}
+        self._lock = threading.Lock()
+        self._warmed = False
+
+        self.launches = 0
+        self.launch_time_s = 0.0
+        self.reuses = 0
+        self.recycled = 0
+        self.crashed = 0
+        self.unclean = 0
+
+    # ==================== LIFECYCLE ====================
+
+    def _launch(self):
+        started = time.perf_counter()
+        driver = self.factory()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.launches += 1
+            self.launch_time_s += elapsed
+            self._uses[id(driver)] = 0
+            self._origins[id(driver)] = set()
+        return driver
+
+    def prewarm(self):
+        """Launch all sessions concurrently (done on the first acquire)"""
+        with self._lock:
+            missing = self.size - len(self._idle)
+            self._warmed = True
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            drivers = list(executor.map(lambda _: self._launch(), range(missing)))
+        with self._lock:
+            self._idle.extend(drivers)
+
+    def acquire(self):
+        """Take a warm session, launching one if none is idle"""
+        if not self._warmed:
+            self.prewarm()
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+        if driver is None:
+            return self._launch()
+        with self._lock:
+            # Prewarmed sessions serving their first test saved nothing
+            if self._uses.get(id(driver)):
+                self.reuses += 1
+        return driver
+
+    def release(self, driver):
+        """Reset a session after a test and return it to the pool"""
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_uses
+            full = len(self._idle) >= self.size
+        if worn_out or full:
+            with self._lock:
+                self.recycled += 1
+            self._quit(driver)
+            return
+        try:
+            clean = self.reset(driver)
+        except SESSION_ERRORS:
+            # Browser or driver process died; replace it on the next acquire
+            with self._lock:
+                self.crashed += 1
+            self._quit(driver)
+            return
+        if not clean:
+            # Storage of a visited origin survived; never hand it to the next test
+            with self._lock:
+                self.unclean += 1
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    def track(self, page, *_):
+        """
+        Remember the origin a pooled session is on (BasePage page load / step hook)
+
+        Args:
+            page: Page object whose driver may belong to this pool
+        """
+        driver = page.driver
+        with self._lock:
+            if id(driver) not in self._origins:
+                return
+        origin = _origin(driver.current_url)
+        if origin is not None:
+            with self._lock:
+                self._origins.get(id(driver), set()).add(origin)
+
+    def reset(self, driver):
+        """
+        Bring a session back to a clean, blank state
+
+        Every open window's origin is cleared in place and checked empty
+        (local/session storage, IndexedDB, CacheStorage, cookies). On Chromium
+        every tracked origin is also cleared over CDP, then cookies and
+        IndexedDB are checked for all of them. Without CDP an origin can only
+        be cleared from a page on it, so a tracked origin that is no longer
+        open in any window makes the session unclean.
+
+        Returns:
+            True when the session is clean and can serve the next test
+        """
+        with self._lock:
+            origins = self._origins.get(id(driver), set())
+            self._origins[id(driver)] = set()
+        chromium = hasattr(driver, "execute_cdp_cmd")
+        if chromium:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+        clean = True
+        cleared = set()
+        handles = driver.window_handles
+        # Extra windows are cleared, then closed; the loop ends on the first one
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            origin = _origin(driver.current_url)
+            if origin is not None:
+                if not chromium:
+                    driver.delete_all_cookies()  # Only the current page's cookies
+                clean = driver.execute_async_script(_CLEAR_STORAGE_SCRIPT) == 0 and clean
+                cleared.add(origin)
+            if handle != handles[0]:
+                driver.close()
+
+        origins |= cleared
+        if chromium:
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            clean = self._chromium_storage_empty(driver, origins) and clean
+        else:
+            clean = origins <= cleared and clean
+
+        driver.get("about:blank")
+        driver.implicitly_wait(self.implicit_wait)
+        return clean
+
+    @staticmethod
+    def _chromium_storage_empty(driver, origins):
+        """No cookies left in the browser and no IndexedDB database in any of the origins"""
+        if driver.execute_cdp_cmd("Storage.getCookies", {})["cookies"]:
+            return False
+        driver.execute_cdp_cmd("IndexedDB.enable", {})
+        for origin in origins:
+            if driver.execute_cdp_cmd("IndexedDB.requestDatabaseNames", {"securityOrigin": origin})["databaseNames"]:
+                return False
+        return True
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._origins.pop(id(driver), None)
+        try:
+            driver.quit()
+        except SESSION_ERRORS:
+            pass
+
+    def close(self):
+        """Quit all idle sessions"""
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._quit(driver)
+
+    # ==================== STATISTICS ====================
+
+    def stats(self):
+        """Launch/reuse counts and the startup time saved by reusing sessions"""
+        average = self.launch_time_s / self.launches if self.launches else 0.0
+        return {
+            "launches": self.launches,
+            "reuses": self.reuses,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+            "unclean": self.unclean,
+            "average_launch_s": average,
+            "saved_s": self.reuses * average,
+        }
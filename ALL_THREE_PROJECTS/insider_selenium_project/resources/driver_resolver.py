@@ -0,0 +1,254 @@
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+
+LOCK_VERSION = 1
+
+# How long a resolution made without a browser executable (nothing to fingerprint) is trusted
+UNFINGERPRINTED_TTL_S = 600
+
+# Executables probed for the installed browser, in order of preference
+BROWSER_BINARIES = {
+    "chrome": {
+        "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+        "darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+                   "/Applications/Chromium.app/Contents/MacOS/Chromium"],
+        "win32": [r"%PROGRAMFILES%\Google\Chrome\Application\chrome.exe",
+                  r"%PROGRAMFILES(X86)%\Google\Chrome\Application\chrome.exe",
+                  r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"],
+    },
+    "firefox": {
+        "linux": ["firefox", "firefox-esr"],
+        "darwin": ["/Applications/Firefox.app/Contents/MacOS/firefox"],
+        "win32": [r"%PROGRAMFILES%\Mozilla Firefox\firefox.exe",
+                  r"%PROGRAMFILES(X86)%\Mozilla Firefox\firefox.exe"],
+    },
+}
+
+DRIVER_NAMES = {"chrome": "chromedriver", "firefox": "geckodriver"}
+
+_VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)(?:\.(\d+))?(?:\.(\d+))?")
+
+
+class DriverResolutionError(RuntimeError):
+    """No usable driver binary could be downloaded or found locally"""
+
+
+def default_cache_dir():
+    """Per-machine cache directory, overridable with SELENIUM_DRIVER_CACHE"""
+    return os.environ.get("SELENIUM_DRIVER_CACHE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "insider-selenium"
+    )
+
+
+def parse_version(text):
+    """First dotted version number in text, e.g. '131.0.6778.85', or None"""
+    match = _VERSION_PATTERN.search(text or "")
+    return match.group(0) if match else None
+
+
+def major_version(version):
+    return int(version.split(".")[0]) if version else None
+
+
+class DriverResolver:
+    """
+    Resolves the chromedriver/geckodriver binary once per machine
+
+    The resolved binary is recorded in a lock file together with the
+    browser version it was validated against and a fingerprint (mtime and
+    size) of the browser executable. As long as the browser is not updated,
+    resolving is a lock file read plus two stats: no version probing and no
+    network. When the browser changes, the driver is re-validated and, if
+    incompatible, downloaded again; a download that does not match the
+    browser, or no network at all, falls back to a compatible driver
+    already on the machine (PATH, webdriver-manager or Selenium Manager
+    caches). When no browser executable is found there is nothing to
+    fingerprint, and the entry is trusted for UNFINGERPRINTED_TTL_S instead.
+    """
+
+    def __init__(self, browser, cache_dir=None):
+        """
+        Args:
+            browser: 'chrome' or 'firefox'
+            cache_dir: Directory holding the lock file (default: default_cache_dir())
+        """
+        self.browser = browser
+        self.driver_name = DRIVER_NAMES[browser]
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.lock_path = os.path.join(self.cache_dir, "drivers.lock.json")
+
+    # ==================== RESOLUTION ====================
+
+    def resolve(self, refresh=False):
+        """
+        Path of a driver binary compatible with the installed browser
+
+        Args:
+            refresh: Ignore the lock file and resolve again
+
+        Returns:
+            Absolute path of the driver binary
+
+        Raises:
+            DriverResolutionError: Nothing compatible could be downloaded or found
+        """
+        entry = None if refresh else self._read_lock().get(self.browser)
+        binary = None
+        if entry and os.path.isfile(entry["driver_path"]):
+            if entry.get("browser_fingerprint"):
+                if self._fingerprint(entry.get("browser_binary")) == entry["browser_fingerprint"]:
+                    return entry["driver_path"]
+            elif time.time() < entry.get("expires_at", 0):
+                # Still no browser executable to fingerprint: reuse until the entry expires
+                binary = self.browser_binary()
+                if binary is None:
+                    return entry["driver_path"]
+
+        binary = binary or self.browser_binary()
+        browser_version = self.browser_version(binary)
+
+        # Browser changed but the locked driver may still fit (e.g. a patch update)
+        if entry and os.path.isfile(entry["driver_path"]) and \
+                self.is_compatible(entry.get("driver_version"), browser_version):
+            driver_path, driver_version = entry["driver_path"], entry.get("driver_version")
+        else:
+            driver_path, driver_version = self._download(browser_version)
+
+        fingerprint = self._fingerprint(binary)
+        self._write_lock({
+            "driver_path": driver_path,
+            "driver_version": driver_version,
+            "browser_binary": binary,
+            "browser_version": browser_version,
+            "browser_fingerprint": fingerprint,
+            "resolved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "expires_at": None if fingerprint else time.time() + UNFINGERPRINTED_TTL_S,
+        })
+        return driver_path
+
+    def is_compatible(self, driver_version, browser_version):
+        """chromedriver must match Chrome's major version; geckodriver spans many Firefox releases"""
+        if self.browser != "chrome" or not driver_version or not browser_version:
+            return True
+        return major_version(driver_version) == major_version(browser_version)
+
+    def _download(self, browser_version):
+        from webdriver_manager.chrome import ChromeDriverManager
+        from webdriver_manager.firefox import GeckoDriverManager
+
+        manager = ChromeDriverManager() if self.browser == "chrome" else GeckoDriverManager()
+        try:
+            path = manager.install()
+        except Exception as download_error:
+            # Offline or rate limited: fall back to drivers already on this machine
+            return self._local_fallback(browser_version, f"Could not download {self.driver_name} ({download_error})",
+                                        download_error)
+        version = self.driver_version(path)
+        if version is None or not self.is_compatible(version, browser_version):
+            # Wrong release or a binary that does not run; never lock it
+            return self._local_fallback(
+                browser_version, f"Downloaded {self.driver_name} {version or '(version unknown)'} at {path} "
+                                 f"does not match {self.browser} {browser_version}")
+        return path, version
+
+    def _local_fallback(self, browser_version, reason, cause=None):
+        local = self.find_local_driver(browser_version)
+        if local is None:
+            raise DriverResolutionError(
+                f"{reason} and no {self.driver_name} compatible with {self.browser} {browser_version} was found locally"
+            ) from cause
+        return local
+
+    def find_local_driver(self, browser_version):
+        """Newest compatible driver on PATH or in the webdriver-manager/Selenium Manager caches"""
+        exe = self.driver_name + (".exe" if sys.platform == "win32" else "")
+        home = os.path.expanduser("~")
+        candidates = [shutil.which(self.driver_name)]
+        candidates += glob.glob(os.path.join(home, ".wdm", "drivers", self.driver_name, "**", exe), recursive=True)
+        candidates += glob.glob(os.path.join(home, ".cache", "selenium", self.driver_name, "**", exe), recursive=True)
+
+        best = None
+        for path in filter(None, candidates):
+            if not os.access(path, os.X_OK):
+                continue
+            version = self.driver_version(path)
+            if not self.is_compatible(version, browser_version):
+                continue
+            key = tuple(int(part) for part in version.split(".")) if version else ()
+            if best is None or key > best[0]:
+                best = (key, path, version)
+        return (best[1], best[2]) if best else None
+
+    # ==================== VERSION PROBING ====================
+
+    def browser_binary(self):
+        """Path of the installed browser executable, or None if not found"""
+        platform = "win32" if sys.platform == "win32" else "darwin" if sys.platform == "darwin" else "linux"
+        for candidate in BROWSER_BINARIES[self.browser][platform]:
+            candidate = os.path.expandvars(candidate)
+            path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+            if path and os.path.isfile(path):
+                return os.path.realpath(path)
+        return None
+
+    def browser_version(self, binary):
+        """Installed browser version, e.g. '131.0.6778.85', or None if unknown"""
+        if binary and sys.platform != "win32":
+            version = parse_version(self._run(binary, "--version"))
+            if version:
+                return version
+        # Windows browsers print no version; webdriver-manager reads it from the registry
+        try:
+            from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+            browser_type = ChromeType.GOOGLE if self.browser == "chrome" else "firefox"
+            return parse_version(OperationSystemManager().get_browser_version_from_os(browser_type))
+        except Exception:
+            return None
+
+    def driver_version(self, path):
+        return parse_version(self._run(path, "--version"))
+
+    @staticmethod
+    def _run(*command):
+        try:
+            return subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    @staticmethod
+    def _fingerprint(path):
+        """Changes whenever the browser is updated or replaced"""
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    # ==================== LOCK FILE ====================
+
+    def _read_lock(self):
+        try:
+            with open(self.lock_path, encoding="utf-8") as lock_file:
+                content = json.load(lock_file)
+        except (OSError, ValueError):
+            return {}
+        if content.get("version") != LOCK_VERSION:
+            return {}
+        return content.get("drivers", {})
+
+    def _write_lock(self, entry):
+        drivers = self._read_lock()
+        drivers[self.browser] = entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write-then-rename so parallel sessions never read a half-written lock
+        temp_path = f"{self.lock_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as lock_file:
+            json.dump({"version": LOCK_VERSION, "drivers": drivers}, lock_file, indent=2)
+        os.replace(temp_path, self.lock_path)
@@ -0,0 +1,219 @@
+import json
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from resources.driver_resolver import DriverResolver
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _driver_command(browser, path, port):
+    if browser == "firefox":
+        return [path, "--port", str(port)]
+    return [path, f"--port={port}"]
+
+
+class LocalGrid:
+    """
+    Minimal Selenium Grid stand-in serving the W3C WebDriver protocol locally
+
+    Tests connect to it exactly as to a Grid hub (--remote-url). Each new
+    session starts its own chromedriver/geckodriver, resolved through
+    DriverResolver, and every command for the session is forwarded to it;
+    deleting the session stops the driver. At most max_sessions run at once,
+    further session requests wait for a free slot like on a Grid node.
+    """
+
+    def __init__(self, host="127.0.0.1", port=4444, max_sessions=4, slot_timeout=300):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            max_sessions: Concurrent browser sessions
+            slot_timeout: Seconds a new session request waits for a free slot
+        """
+        self.max_sessions = max_sessions
+        self.slot_timeout = slot_timeout
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._sessions = {}
+        self._resolvers = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self.sessions_started = 0
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-grid", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop accepting requests and end the drivers of sessions still open"""
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._stop_driver(session)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # ==================== SESSIONS ====================
+
+    def _new_session(self, body):
+        """Start a driver for the requested browser and open the session on it"""
+        capabilities = json.loads(body or b"{}").get("capabilities", {})
+        browser = capabilities.get("alwaysMatch", {}).get("browserName")
+        for candidate in capabilities.get("firstMatch", [{}]):
+            browser = browser or candidate.get("browserName")
+        browser = (browser or "chrome").lower()
+        if browser not in ("chrome", "firefox"):
+            return 400, _error("invalid argument", f"Browser '{browser}' is not supported by the local grid")
+
+        if not self._slots.acquire(timeout=self.slot_timeout):
+            return 500, _error("session not created", f"No free slot within {self.slot_timeout}s")
+        session = None
+        try:
+            with self._lock:
+                resolver = self._resolvers.setdefault(browser, DriverResolver(browser))
+            driver_path = resolver.resolve()
+            port = free_port()
+            process = subprocess.Popen(_driver_command(browser, driver_path, port),
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            session = {"process": process, "url": f"http://127.0.0.1:{port}"}
+            self._wait_for_driver(session)
+            status, response = _forward(session["url"], "POST", "/session", body)
+            if status != 200:
+                self._stop_driver(session)
+                return status, response
+            session_id = json.loads(response)["value"]["sessionId"]
+        except Exception as e:
+            if session is None:
+                self._slots.release()
+            else:
+                self._stop_driver(session)
+            return 500, _error("session not created", str(e))
+        with self._lock:
+            self._sessions[session_id] = session
+            self.sessions_started += 1
+        return status, response
+
+    def _delete_session(self, session_id, path):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return 404, _error("invalid session id", f"Unknown session {session_id}")
+        try:
+            return _forward(session["url"], "DELETE", path, None)
+        finally:
+            self._stop_driver(session)
+
+    def _stop_driver(self, session):
+        session["process"].terminate()
+        try:
+            session["process"].wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            session["process"].kill()
+        self._slots.release()
+
+    @staticmethod
+    def _wait_for_driver(session, timeout=20):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if session["process"].poll() is not None:
+                raise RuntimeError(f"Driver exited with code {session['process'].returncode}")
+            try:
+                with urllib.request.urlopen(session["url"] + "/status", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f"Driver did not start within {timeout}s")
+
+    # ==================== HTTP ====================
+
+    def dispatch(self, method, path, body):
+        """Route one WebDriver request; returns (status, response body)"""
+        # Selenium 3 clients address the hub under /wd/hub
+        if path.startswith("/wd/hub"):
+            path = path[len("/wd/hub"):] or "/"
+        parts = path.rstrip("/").split("/")
+        if method == "GET" and path.rstrip("/") == "/status":
+            with self._lock:
+                active = len(self._sessions)
+            return 200, json.dumps({"value": {
+                "ready": active < self.max_sessions,
+                "message": f"Local grid: {active}/{self.max_sessions} sessions",
+            }}).encode()
+        if method == "POST" and path.rstrip("/") == "/session":
+            return self._new_session(body)
+        if len(parts) >= 3 and parts[1] == "session":
+            session_id = parts[2]
+            if method == "DELETE" and len(parts) == 3:
+                return self._delete_session(session_id, path)
+            with self._lock:
+                session = self._sessions.get(session_id)
+            if session is None:
+                return 404, _error("invalid session id", f"Unknown session {session_id}")
+            return _forward(session["url"], method, path, body)
+        return 404, _error("unknown command", f"{method} {path}")
+
+    def _handler(self):
+        grid = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                status, response = grid.dispatch(self.command, self.path, body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _forward(base_url, method, path, body):
+    request = urllib.request.Request(base_url + path, data=body, method=method,
+                                     headers={"Content-Type": "application/json; charset=utf-8"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except OSError as e:
+        return 500, _error("unknown error", f"Driver unreachable: {e}")
+
+
+def _error(error, message):
+    return json.dumps({"value": {"error": error, "message": message, "stacktrace": ""}}).encode()
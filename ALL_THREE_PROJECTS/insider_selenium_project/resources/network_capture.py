@@ -0,0 +1,254 @@
+import heapq
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from selenium.common.exceptions import WebDriverException
+
+
+HAR_CREATOR = {"name": "insider-selenium-tests", "version": "1.0.0"}
+
+
+def _headers(headers):
+    return [{"name": name, "value": str(value)} for name, value in (headers or {}).items()]
+
+
+def _header(headers, name):
+    """Header value by case-insensitive name (HTTP/2 sends lowercase names, HTTP/1.1 as written)"""
+    return next((str(value) for key, value in (headers or {}).items() if key.lower() == name), "")
+
+
+def _phases(timing, total_ms):
+    """HAR timing phases (ms, -1 = not applicable) from a CDP ResourceTiming"""
+    if not timing:
+        return {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 0, "wait": total_ms, "receive": 0}
+
+    def span(start, end):
+        return timing[end] - timing[start] if timing.get(start, -1) >= 0 else -1
+
+    first = next((timing[key] for key in ("dnsStart", "connectStart", "sendStart") if timing.get(key, -1) >= 0), 0)
+    headers_end = timing.get("receiveHeadersEnd", 0)
+    return {
+        "blocked": first,
+        "dns": span("dnsStart", "dnsEnd"),
+        "connect": span("connectStart", "connectEnd"),
+        "ssl": span("sslStart", "sslEnd"),
+        "send": max(timing.get("sendEnd", 0) - timing.get("sendStart", 0), 0),
+        "wait": max(headers_end - timing.get("sendEnd", 0), 0),
+        "receive": max(total_ms - headers_end, 0),
+    }
+
+
+class NetworkCapture:
+    """
+    Aggregates Chrome's network events per page step and streams them to a HAR file
+
+    Chrome records the DevTools Network events in its performance log when
+    the session is started with goog:loggingPrefs {"performance": "ALL"}.
+    The log is drained whenever the test moves on to another page object
+    step (BasePage.step_hooks), so every request is attributed to the step
+    that caused it. Finished requests are written to the HAR file right
+    away; only requests still in flight and per-step totals are kept. The
+    closing part of the document is rewritten after every entry, so the
+    file is valid HAR even if the run dies before close().
+    """
+
+    def __init__(self, path, top=5):
+        """
+        Args:
+            path: HAR file to write
+            top: Number of slowest resources kept per step
+        """
+        self.path = path
+        self.top = top
+        self.current_test = None
+        self.steps = {}
+        self._pending = {}
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._har = None
+        self._entries = 0
+        self._tail_at = 0
+        self._pages_json = "[]"
+
+    # ==================== DRIVER SIDE ====================
+
+    def __call__(self, page, previous_step):
+        """Step hook: everything logged so far belongs to the step that just ended"""
+        self.drain(page.driver, previous_step)
+
+    def start(self, driver, test):
+        """Begin capturing for a test; discards events of earlier tests and pool resets"""
+        self.current_test = test
+        self._read_log(driver)
+        with self._lock:
+            self._pending.clear()
+
+    def stop(self, driver, last_step):
+        """Drain the rest of the test's events and return its per-step summary"""
+        self.drain(driver, last_step)
+        with self._lock:
+            self._pending.clear()
+            steps = {step: stats for (test, step), stats in self.steps.items() if test == self.current_test}
+        self.current_test = None
+        return steps
+
+    def drain(self, driver, step):
+        """Attribute all logged network events to step"""
+        for message in self._read_log(driver):
+            self.process(message["method"], message["params"], step or "(test)")
+
+    @staticmethod
+    def _read_log(driver):
+        try:
+            entries = driver.get_log("performance")
+        except WebDriverException:
+            return []
+        messages = []
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            if message["method"].startswith("Network."):
+                messages.append(message)
+        return messages
+
+    # ==================== EVENT PROCESSING ====================
+
+    def process(self, method, params, step):
+        """Feed one DevTools Network event"""
+        request_id = params.get("requestId")
+        with self._lock:
+            if method == "Network.requestWillBeSent":
+                previous = self._pending.pop(request_id, None)
+                if previous is not None and params.get("redirectResponse"):
+                    previous["response"] = params["redirectResponse"]
+                    self._finish(previous, params["timestamp"], params["redirectResponse"].get("encodedDataLength", 0))
+                self._pending[request_id] = {
+                    "step": step,
+                    "request": params["request"],
+                    "started": params["timestamp"],
+                    "wall_time": params.get("wallTime"),
+                    "response": None,
+                    "cached": False,
+                }
+                return
+            pending = self._pending.get(request_id)
+            if pending is None:
+                return
+            if method == "Network.responseReceived":
+                pending["response"] = params["response"]
+            elif method == "Network.requestServedFromCache":
+                pending["cached"] = True
+            elif method == "Network.loadingFinished":
+                del self._pending[request_id]
+                self._finish(pending, params["timestamp"], params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed":
+                del self._pending[request_id]
+                pending["error"] = params.get("blockedReason") or params.get("errorText", "failed")
+                self._finish(pending, params["timestamp"], 0)
+
+    def _finish(self, pending, finished, transferred):
+        response = pending["response"] or {}
+        cached = pending["cached"] or any(
+            response.get(flag) for flag in ("fromDiskCache", "fromPrefetchCache", "fromServiceWorker")
+        )
+        total_ms = (finished - pending["started"]) * 1000
+        phases = _phases(response.get("timing"), total_ms)
+        url = pending["request"]["url"]
+
+        stats = self.steps.setdefault((self.current_test, pending["step"]), {
+            "requests": 0, "bytes": 0, "cache_hits": 0, "failed": 0, "slowest": [],
+        })
+        stats["requests"] += 1
+        stats["bytes"] += transferred
+        stats["cache_hits"] += cached
+        stats["failed"] += "error" in pending
+        # The running entry number breaks ties, so phases are never compared
+        resource = (total_ms, self._entries, url, phases)
+        if len(stats["slowest"]) < self.top:
+            heapq.heappush(stats["slowest"], resource)
+        elif total_ms > stats["slowest"][0][0]:
+            heapq.heapreplace(stats["slowest"], resource)
+
+        self._write_entry(pending, response, total_ms, phases, transferred, cached)
+
+    # ==================== HAR OUTPUT ====================
+
+    def _write_entry(self, pending, response, total_ms, phases, transferred, cached):
+        page_id = f"{self.current_test}::{pending['step']}"
+        started = datetime.fromtimestamp(pending["wall_time"] or 0, tz=timezone.utc).isoformat()
+        if page_id not in self._pages:
+            self._pages[page_id] = {
+                "id": page_id, "title": pending["step"], "startedDateTime": started, "pageTimings": {},
+            }
+            self._pages_json = json.dumps(list(self._pages.values()))
+        request = pending["request"]
+        entry = {
+            "pageref": page_id,
+            "startedDateTime": started,
+            "time": total_ms,
+            "request": {
+                "method": request.get("method", "GET"),
+                "url": request["url"],
+                "httpVersion": response.get("protocol", ""),
+                "headers": _headers(request.get("headers")),
+                "queryString": [],
+                "cookies": [],
+                "headersSize": -1,
+                "bodySize": -1,
+            },
+            "response": {
+                "status": response.get("status", 0),
+                "statusText": response.get("statusText", pending.get("error", "")),
+                "httpVersion": response.get("protocol", ""),
+                "headers": _headers(response.get("headers")),
+                "cookies": [],
+                "content": {"size": -1, "mimeType": response.get("mimeType", "")},
+                "redirectURL": _header(response.get("headers"), "location"),
+                "headersSize": -1,
+                "bodySize": -1,
+                "_transferSize": transferred,
+            },
+            "cache": {"beforeRequest": {"hitCount": 1}} if cached else {},
+            "timings": dict(phases),
+        }
+        if self._har is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._har = open(self.path, "w", encoding="utf-8")
+            self._har.write('{"log": ' + json.dumps({"version": "1.2", "creator": HAR_CREATOR})[:-1] + ', "entries": [\n')
+            self._tail_at = self._har.tell()
+        # Entries are streamed: the new entry overwrites the tail ("pages" and the
+        # closing brackets), which is written again after it
+        self._har.seek(self._tail_at)
+        self._har.write((",\n" if self._entries else "") + json.dumps(entry))
+        self._tail_at = self._har.tell()
+        self._har.write('\n], "pages": ' + self._pages_json + "}}\n")
+        self._har.truncate()
+        self._har.flush()
+        self._entries += 1
+
+    def close(self):
+        """Close the HAR file (already a complete document after every entry)"""
+        with self._lock:
+            if self._har is None:
+                return
+            self._har.close()
+            self._har = None
+
+    # ==================== REPORTING ====================
+
+    @staticmethod
+    def format_steps(steps):
+        """Per-step lines for the test report"""
+        lines = []
+        for step, stats in steps.items():
+            lines.append(
+                f"{step}: {stats['requests']} requests, {stats['bytes'] / 1024:.0f} KiB, "
+                f"{stats['cache_hits']} from cache, {stats['failed']} failed"
+            )
+            for total_ms, _, url, phases in sorted(stats["slowest"], reverse=True):
+                detail = ", ".join(f"{name} {value:.0f}" for name, value in phases.items() if value >= 0)
+                lines.append(f"    {total_ms:8.0f}ms  {url[:100]}  ({detail})")
+        return "\n".join(lines)
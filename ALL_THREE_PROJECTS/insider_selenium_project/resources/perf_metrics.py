@@ -0,0 +1,151 @@
+import json
+import os
+import statistics
+import threading
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+
+# Observes LCP, layout shifts and long tasks. Injected before any page script
+# runs where CDP is available; otherwise installed on first collection, when
+# buffered entries still deliver what happened before.
+PERF_OBSERVER_JS = """
+if (!window.__perfMetrics) {
+    const metrics = window.__perfMetrics = {lcp: null, cls: 0, longTasks: 0, longTaskMs: 0, blockingMs: 0};
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback)).observe({type: type, buffered: true});
+        } catch (e) {}
+    };
+    observe('largest-contentful-paint', (entry) => { metrics.lcp = entry.startTime; });
+    observe('layout-shift', (entry) => { if (!entry.hadRecentInput) metrics.cls += entry.value; });
+    observe('longtask', (entry) => {
+        metrics.longTasks += 1;
+        metrics.longTaskMs += entry.duration;
+        metrics.blockingMs += Math.max(0, entry.duration - 50);
+    });
+}
+"""
+
+# Async: gives buffered observer callbacks a moment to run, then reports
+COLLECT_JS = PERF_OBSERVER_JS + """
+const done = arguments[arguments.length - 1];
+setTimeout(() => {
+    const nav = performance.getEntriesByType('navigation')[0] || {};
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    const metrics = window.__perfMetrics;
+    done({
+        url: location.href,
+        time_origin: performance.timeOrigin,
+        ttfb_ms: nav.responseStart ?? null,
+        dom_interactive_ms: nav.domInteractive ?? null,
+        dom_content_loaded_ms: nav.domContentLoadedEventEnd ?? null,
+        load_ms: nav.loadEventEnd ?? null,
+        transfer_bytes: nav.transferSize ?? null,
+        fcp_ms: fcp ? fcp.startTime : null,
+        lcp_ms: metrics.lcp,
+        cls: metrics.cls,
+        long_tasks: metrics.longTasks,
+        long_task_ms: metrics.longTaskMs,
+        blocking_ms: metrics.blockingMs
+    });
+}, 50);
+"""
+
+# Columns of the terminal report: (metric, header, format)
+REPORT_COLUMNS = [
+    ("ttfb_ms", "TTFB", "{:.0f}"),
+    ("fcp_ms", "FCP", "{:.0f}"),
+    ("lcp_ms", "LCP", "{:.0f}"),
+    ("dom_content_loaded_ms", "DCL", "{:.0f}"),
+    ("load_ms", "load", "{:.0f}"),
+    ("cls", "CLS", "{:.3f}"),
+    ("long_tasks", "tasks", "{:.0f}"),
+    ("blocking_ms", "TBT", "{:.0f}"),
+]
+
+
+class PerfMetricsCollector:
+    """
+    Page-load hook recording front-end performance metrics of every page visited
+
+    Registered in BasePage.page_load_hooks, it runs after each
+    wait_for_page_load and measures each document once: Navigation Timing,
+    first/largest contentful paint, cumulative layout shift and long tasks.
+    Samples are tagged with test, page object and step and appended to a
+    JSON Lines time series, so repeated runs form a synthetic monitor.
+    """
+
+    def __init__(self, path, run_id=None):
+        """
+        Args:
+            path: JSON Lines file the samples are appended to
+            run_id: Identifies this run in the time series (default: start time)
+        """
+        self.path = path
+        self.run_id = run_id or datetime.now().isoformat(timespec="seconds")
+        self.current_test = None
+        self.samples = []
+        self._lock = threading.Lock()
+        self._measured = set()
+        self._prepared = set()
+
+    def __call__(self, page):
+        self.collect(page)
+
+    def collect(self, page):
+        """Measure the page's current document unless it was measured already"""
+        driver = page.driver
+        try:
+            self._prepare(driver)
+            sample = driver.execute_async_script(COLLECT_JS)
+        except WebDriverException:
+            return None  # Metrics are best effort; never fail the functional test
+        document = (sample["time_origin"], sample["url"])
+        with self._lock:
+            if document in self._measured:
+                return None
+            self._measured.add(document)
+        sample.update({
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "run_id": self.run_id,
+            "test": self.current_test,
+            "page": type(page).__name__,
+            "step": page._current_step(),
+        })
+        self._append(sample)
+        return sample
+
+    def _prepare(self, driver):
+        """Install the observers ahead of page scripts in later documents (Chromium only)"""
+        # Keyed by session: a relaunched driver object can reuse a quit one's id()
+        if driver.session_id in self._prepared or not hasattr(driver, "execute_cdp_cmd"):
+            return
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PERF_OBSERVER_JS})
+        self._prepared.add(driver.session_id)
+
+    def _append(self, sample):
+        with self._lock:
+            self.samples.append(sample)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as series:
+                series.write(json.dumps(sample) + "\n")
+
+    def summary(self):
+        """Median of every report column per step, in first-visit order"""
+        with self._lock:
+            samples = list(self.samples)
+        steps = {}
+        for sample in samples:
+            steps.setdefault(sample["step"], []).append(sample)
+        result = {}
+        for step, step_samples in steps.items():
+            row = {"samples": len(step_samples)}
+            for metric, _, _ in REPORT_COLUMNS:
+                values = [sample[metric] for sample in step_samples if sample.get(metric) is not None]
+                row[metric] = statistics.median(values) if values else None
+            result[step] = row
+        return result
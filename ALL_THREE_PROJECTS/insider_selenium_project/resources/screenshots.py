@@ -0,0 +1,181 @@
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from PIL import Image
+
+
+FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "screenshots")
+
+
+class ScreenshotService:
+    """
+    Takes screenshots without stalling the test on image encoding and disk I/O
+
+    The test thread only fetches the browser's PNG capture and hashes it.
+    Re-encoding (format/quality) and writing happen on a background worker
+    fed through a bounded queue; when the queue is full, capture waits for
+    the worker instead of buffering more images. flush() blocks until
+    everything queued is on disk. A frame identical to one already written
+    is not written again; the capture is recorded in `aliases` instead.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, image_format="png", quality=80, queue_size=8):
+        """
+        Args:
+            directory: Where screenshots are written
+            image_format: 'png', 'jpeg' or 'webp'
+            quality: JPEG/WebP quality 1-95 (PNG is always lossless, optimized)
+            queue_size: Captures waiting for the worker before capture() blocks
+        """
+        self.configure(directory, image_format, quality)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._names = set()
+        self.aliases = []
+
+        self.captured = 0
+        self.duplicates = 0
+        self.written = 0
+        self.errors = []
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self.capture_time_s = 0.0
+        self.encode_time_s = 0.0
+
+    def configure(self, directory=None, image_format=None, quality=None):
+        """Change output settings; applies to captures made afterwards"""
+        if image_format is not None and image_format not in FORMATS:
+            raise ValueError(f"Screenshot format '{image_format}' is not supported. Use one of: {', '.join(FORMATS)}")
+        self.directory = directory or getattr(self, "directory", DEFAULT_DIRECTORY)
+        self.image_format = image_format or getattr(self, "image_format", "png")
+        self.quality = quality or getattr(self, "quality", 80)
+
+    # ==================== TEST THREAD ====================
+
+    def capture(self, driver, name="screenshot"):
+        """
+        Grab the current frame and queue it for writing
+
+        Args:
+            driver: WebDriver to capture
+            name: File name prefix
+
+        Returns:
+            Path the screenshot is (or will shortly be) written to. An
+            identical frame written successfully earlier returns that
+            earlier file, which may carry another name.
+        """
+        started = time.perf_counter()
+        png = driver.get_screenshot_as_png()
+        digest = hashlib.sha1(png).hexdigest()
+        with self._lock:
+            self.captured += 1
+            self.capture_time_s += time.perf_counter() - started
+            key = (digest, self.directory, self.image_format, self.quality)
+            # Only frames already on disk: a queued write may still fail
+            if key in self._frames:
+                self.duplicates += 1
+                self.aliases.append((name, self._frames[key]))
+                return self._frames[key]
+            self.raw_bytes += len(png)
+            path = self._unique_path(name)
+        self._ensure_worker()
+        self._queue.put((png, path, self.image_format, self.quality, key))
+        return path
+
+    def _unique_path(self, name):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = EXTENSIONS[self.image_format]
+        path = os.path.join(self.directory, f"{name}_{timestamp}.{extension}")
+        counter = 1
+        while path in self._names:
+            counter += 1
+            path = os.path.join(self.directory, f"{name}_{timestamp}_{counter}.{extension}")
+        self._names.add(path)
+        return path
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+                self._worker.start()
+
+    # ==================== WORKER ====================
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"{job[1]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, png, path, image_format, quality, key):
+        started = time.perf_counter()
+        if image_format == "png":
+            image = Image.open(io.BytesIO(png))
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG", optimize=True)
+            data = buffer.getvalue()
+            # Browser PNGs are sometimes already smaller than Pillow's result
+            if len(data) >= len(png):
+                data = png
+        else:
+            image = Image.open(io.BytesIO(png)).convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, FORMATS[image_format], quality=quality, optimize=True)
+            data = buffer.getvalue()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as screenshot_file:
+            screenshot_file.write(data)
+        with self._lock:
+            self.written += 1
+            self.written_bytes += len(data)
+            self.encode_time_s += time.perf_counter() - started
+            self._frames.setdefault(key, path)
+
+    # ==================== LIFECYCLE ====================
+
+    def flush(self):
+        """Block until every queued screenshot is written"""
+        self._queue.join()
+
+    def close(self):
+        """Flush and stop the worker (it restarts on the next capture)"""
+        with self._lock:
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
+        self._queue.join()
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "duplicates": self.duplicates,
+            "written": self.written,
+            "errors": len(self.errors),
+            "raw_bytes": self.raw_bytes,
+            "written_bytes": self.written_bytes,
+            "capture_time_s": self.capture_time_s,
+            "encode_time_s": self.encode_time_s,
+        }
+
+
+# Process-wide service used by BasePage and the failure hook; configured by tests/conftest.py
+SCREENSHOTS = ScreenshotService()
@@ -0,0 +1,109 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class WaitProfiler:
+    """
+    Records the time spent in explicit waits, per locator and per page step
+
+    A step is the page object method the test called (e.g.
+    CareersPage.filter_by_location); every wait inside it is attributed to
+    it. Comparing the total wait time with the tests' wall time shows where
+    the suite spends its time, and timed-out waits show budget burned on
+    elements that never appeared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+        self.test_time_s = {}
+        self.current_test = None
+
+    def record(self, step, kind, label, elapsed_s, timed_out):
+        """
+        Args:
+            step: Page object method the wait belongs to
+            kind: Wait type, e.g. 'visible', 'clickable', 'network idle'
+            label: Locator or condition description
+            elapsed_s: Time spent waiting
+            timed_out: True if the condition was never met
+        """
+        with self._lock:
+            self.records.append({
+                "test": self.current_test,
+                "step": step,
+                "kind": kind,
+                "wait": f"{kind} {label}".strip(),
+                "elapsed_s": elapsed_s,
+                "timed_out": timed_out,
+            })
+
+    @contextmanager
+    def test(self, nodeid):
+        """Attribute waits to a test and measure its wall time"""
+        self.current_test = nodeid
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.test_time_s[nodeid] = self.test_time_s.get(nodeid, 0.0) + time.perf_counter() - started
+            self.current_test = None
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self.test_time_s.clear()
+
+    def by_label(self, label_of, kinds=("navigate", "page load")):
+        """
+        Per-test totals grouped by a label of the test, e.g. its browser profile
+
+        Args:
+            label_of: Maps a test node id to its label
+            kinds: Wait kinds counted as page-load time
+
+        Returns:
+            {label: {"tests", "flow_s", "page_load_s"}}
+        """
+        with self._lock:
+            records = list(self.records)
+            test_time_s = dict(self.test_time_s)
+        groups = {}
+        for nodeid, elapsed_s in test_time_s.items():
+            group = groups.setdefault(label_of(nodeid), {"tests": 0, "flow_s": 0.0, "page_load_s": 0.0})
+            group["tests"] += 1
+            group["flow_s"] += elapsed_s
+        for record in records:
+            if record["kind"] in kinds and record["test"] in test_time_s:
+                groups[label_of(record["test"])]["page_load_s"] += record["elapsed_s"]
+        return groups
+
+    def summary(self, top=10):
+        """Totals plus the steps and waits that took longest"""
+        with self._lock:
+            records = list(self.records)
+            wall_s = sum(self.test_time_s.values())
+
+        def grouped(key):
+            groups = {}
+            for record in records:
+                group = groups.setdefault(record[key], {"name": record[key], "waits": 0, "timeouts": 0, "total_s": 0.0})
+                group["waits"] += 1
+                group["timeouts"] += record["timed_out"]
+                group["total_s"] += record["elapsed_s"]
+            return sorted(groups.values(), key=lambda group: group["total_s"], reverse=True)[:top]
+
+        return {
+            "wall_s": wall_s,
+            "wait_s": sum(record["elapsed_s"] for record in records),
+            "timeout_s": sum(record["elapsed_s"] for record in records if record["timed_out"]),
+            "timeouts": sum(record["timed_out"] for record in records),
+            "steps": grouped("step"),
+            "waits": grouped("wait"),
+        }
+
+
+# Process-wide profiler fed by BasePage and reported by tests/conftest.py
+WAITS = WaitProfiler()
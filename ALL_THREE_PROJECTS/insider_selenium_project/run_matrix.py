@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Parallel cross-browser runner for Insider Selenium Tests
+
+The suite is collected once, split across N pytest workers per browser and
+run in parallel. Every worker writes its screenshots, reports and log to
+its own artifact directory; the results are aggregated into one report
+with per-browser timing. A single worker streams its output to the console;
+with several, the end of each failed worker's log is printed after the run.
+
+Usage:
+    python run_matrix.py                                  # Chrome and Firefox, workers sized to the machine
+    python run_matrix.py --browsers chrome --workers 2
+    python run_matrix.py --backend grid                   # Through a local Selenium Grid stand-in
+    python run_matrix.py --backend grid --grid-url http://grid:4444
+    python run_matrix.py -- -k careers --browser-profile=performance   # Extra pytest arguments after --
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_PATH = "tests/test_insider_careers.py"
+BROWSERS = ("chrome", "firefox")
+
+# Lines of a failed worker's pytest.log printed after the run
+LOG_TAIL_LINES = 40
+
+# Resident memory of one worker: the browser with its renderer processes plus pytest
+WORKER_MEMORY_MB = {"chrome": 600, "firefox": 700}
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo; None where it cannot be read"""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def auto_workers(browsers):
+    """
+    Workers per browser that the machine can run side by side
+
+    One CPU stays free for the runner and the drivers; 80% of the available
+    memory is shared out by the browsers' footprint. The result is split
+    evenly across the browsers.
+    """
+    by_cpu = max((os.cpu_count() or 2) - 1, 1)
+    memory_mb = available_memory_mb()
+    if memory_mb is None:
+        total = by_cpu
+    else:
+        per_worker_mb = sum(WORKER_MEMORY_MB[browser] for browser in browsers) / len(browsers)
+        total = min(by_cpu, int(memory_mb * 0.8 / per_worker_mb))
+    return max(total // len(browsers), 1)
+
+
+def collect_tests(pytest_args):
+    """Node ids of the tests to run, collected once for all workers"""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", TEST_PATH, "--collect-only", "-q", "-p", "no:cacheprovider", *pytest_args],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    tests = [line.strip() for line in result.stdout.splitlines() if "::" in line]
+    if result.returncode not in (0, 5) or not tests:
+        sys.stderr.write(result.stdout + result.stderr)
+    return tests
+
+
+def shard(tests, workers):
+    """Round-robin split; a browser never gets more workers than tests"""
+    count = max(min(workers, len(tests)), 1)
+    return [tests[index::count] for index in range(count)]
+
+
+def sessions_per_worker(pytest_args):
+    """
+    Browser sessions one worker holds at once: its --browser-pool-size
+
+    The pytest default is 1; a pool size of 0 still opens one browser per test.
+    """
+    size = 1
+    for index, arg in enumerate(pytest_args):
+        if arg.startswith("--browser-pool-size="):
+            value = arg.split("=", 1)[1]
+        elif arg == "--browser-pool-size" and index + 1 < len(pytest_args):
+            value = pytest_args[index + 1]
+        else:
+            continue
+        if value.isdigit():
+            size = int(value)  # The last occurrence wins, as in pytest's option parsing
+    return max(size, 1)
+
+
+def run_logged(cmd, log_path, stream=False):
+    """
+    Run a command with its output in log_path
+
+    Args:
+        cmd: Command line
+        log_path: File receiving stdout and stderr
+        stream: Also echo the output to the console as it arrives
+
+    Returns:
+        The command's exit code
+    """
+    with open(log_path, "w", encoding="utf-8") as log:
+        if not stream:
+            return subprocess.run(cmd, cwd=PROJECT_DIR, stdout=log, stderr=subprocess.STDOUT).returncode
+        process = subprocess.Popen(cmd, cwd=PROJECT_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, encoding="utf-8", errors="replace")
+        for line in process.stdout:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            log.write(line)
+        return process.wait()
+
+
+def log_tail(path, lines=LOG_TAIL_LINES):
+    """Last lines of a log file; empty when it does not exist"""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as log:
+            return [line.rstrip("\n") for line in deque(log, maxlen=lines)]
+    except OSError:
+        return []
+
+
+def run_worker(browser, index, tests, artifact_dir, remote_url, pytest_args, stream=False):
+    """Run one pytest worker; returns its result summary (stream: echo its output to the console)"""
+    worker_dir = os.path.join(artifact_dir, f"{browser}-{index}")
+    os.makedirs(worker_dir, exist_ok=True)
+    junit_path = os.path.join(worker_dir, "junit.xml")
+    cmd = [
+        sys.executable, "-m", "pytest", *tests,
+        "-v",
+        f"--browser={browser}",
+        f"--artifact-dir={worker_dir}",
+        f"--junitxml={junit_path}",
+        "-p", "no:cacheprovider",
+        *pytest_args,
+    ]
+    if remote_url:
+        cmd.append(f"--remote-url={remote_url}")
+
+    started = time.perf_counter()
+    returncode = run_logged(cmd, os.path.join(worker_dir, "pytest.log"), stream)
+    wall_s = time.perf_counter() - started
+
+    worker = {"browser": browser, "worker": index, "directory": worker_dir, "returncode": returncode,
+              "wall_s": wall_s, "tests": [], "streamed": stream}
+    if os.path.exists(junit_path):
+        worker["tests"] = read_junit(junit_path)
+    return worker
+
+
+def read_junit(path):
+    """Per-test outcome and duration from a JUnit XML report"""
+    tests = []
+    for case in ElementTree.parse(path).iter("testcase"):
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed"
+            elif child.tag == "skipped":
+                outcome = "skipped"
+        tests.append({
+            "test": f"{case.get('classname')}::{case.get('name')}",
+            "outcome": outcome,
+            "time_s": float(case.get("time") or 0),
+        })
+    return tests
+
+
+def aggregate(workers, browsers, started_at, wall_s):
+    """One report for the run: per-browser totals plus every test result"""
+    report = {"started": started_at, "wall_s": wall_s, "browsers": {}, "workers": []}
+    for browser in browsers:
+        runs = [worker for worker in workers if worker["browser"] == browser]
+        tests = [test for worker in runs for test in worker["tests"]]
+        report["browsers"][browser] = {
+            "workers": len(runs),
+            "tests": len(tests),
+            "passed": sum(test["outcome"] == "passed" for test in tests),
+            "failed": sum(test["outcome"] == "failed" for test in tests),
+            "skipped": sum(test["outcome"] == "skipped" for test in tests),
+            # Workers without a report crashed before pytest could write one
+            "crashed_workers": sum(not worker["tests"] and worker["returncode"] not in (0, 5) for worker in runs),
+            "wall_s": max((worker["wall_s"] for worker in runs), default=0.0),
+            "test_time_s": sum(test["time_s"] for test in tests),
+        }
+    for worker in workers:
+        report["workers"].append({key: worker[key] for key in ("browser", "worker", "directory", "returncode", "wall_s")})
+    report["tests"] = [dict(test, browser=worker["browser"]) for worker in workers for test in worker["tests"]]
+    return report
+
+
+def print_report(report, report_path):
+    print()
+    print("=" * 70)
+    print("CROSS-BROWSER RESULTS")
+    print("=" * 70)
+    print(f"{'browser':<10}{'workers':>8}{'tests':>7}{'passed':>8}{'failed':>8}{'skipped':>9}{'wall s':>9}{'test s':>9}")
+    for browser, totals in report["browsers"].items():
+        print(f"{browser:<10}{totals['workers']:>8}{totals['tests']:>7}{totals['passed']:>8}{totals['failed']:>8}"
+              f"{totals['skipped']:>9}{totals['wall_s']:>9.1f}{totals['test_time_s']:>9.1f}")
+        if totals["crashed_workers"]:
+            print(f"  {totals['crashed_workers']} worker(s) produced no results - see pytest.log in the worker directory")
+    failed = [test for test in report["tests"] if test["outcome"] == "failed"]
+    if failed:
+        print()
+        print("Failed:")
+        for test in failed:
+            print(f"  [{test['browser']}] {test['test']}")
+    print()
+    print(f"Total wall time: {report['wall_s']:.1f}s")
+    print(f"Report: {report_path}")
+    print("=" * 70)
+
+
+def start_local_grid(max_sessions):
+    from resources.local_grid import LocalGrid
+
+    return LocalGrid(port=0, max_sessions=max_sessions).start()
+
+
+def parse_args(argv):
+    if "--" in argv:
+        split = argv.index("--")
+        argv, pytest_args = argv[:split], argv[split + 1:]
+    else:
+        pytest_args = []
+
+    parser = argparse.ArgumentParser(description="Run the suite across browsers with parallel workers")
+    parser.add_argument("--browsers", default=",".join(BROWSERS),
+                        help="Comma separated browsers (default: chrome,firefox)")
+    parser.add_argument("--workers", default="auto",
+                        help="Workers per browser, or 'auto' to size them to CPU and memory (default: auto)")
+    parser.add_argument("--backend", choices=("local", "grid"), default="local",
+                        help="local: each worker launches its browsers; grid: sessions run on a Selenium Grid")
+    parser.add_argument("--grid-url", default=None,
+                        help="Selenium Grid endpoint for --backend grid (default: start a local grid stand-in)")
+    parser.add_argument("--artifacts", default=None,
+                        help="Directory for worker artifacts and the report (default: artifacts/<timestamp>)")
+    args = parser.parse_args(argv)
+
+    args.browsers = [browser.strip().lower() for browser in args.browsers.split(",") if browser.strip()]
+    unsupported = [browser for browser in args.browsers if browser not in BROWSERS]
+    if unsupported or not args.browsers:
+        parser.error(f"Unsupported browser(s): {', '.join(unsupported)}. Use: {', '.join(BROWSERS)}")
+    if args.workers != "auto":
+        if not args.workers.isdigit() or int(args.workers) < 1:
+            parser.error("--workers must be a positive number or 'auto'")
+        args.workers = int(args.workers)
+    args.pytest_args = pytest_args
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    os.chdir(PROJECT_DIR)
+    sys.path.insert(0, PROJECT_DIR)
+
+    workers_per_browser = auto_workers(args.browsers) if args.workers == "auto" else args.workers
+    started_at = datetime.now()
+    artifact_dir = os.path.abspath(args.artifacts or os.path.join("artifacts", started_at.strftime("%Y%m%d_%H%M%S")))
+    os.makedirs(artifact_dir, exist_ok=True)
+
+    print("=" * 70)
+    print("INSIDER SELENIUM TESTS - CROSS-BROWSER MATRIX")
+    print("=" * 70)
+    tests = collect_tests(args.pytest_args)
+    if not tests:
+        print("No tests collected")
+        return 5
+    jobs = [(browser, index, chunk)
+            for browser in args.browsers
+            for index, chunk in enumerate(shard(tests, workers_per_browser), start=1)]
+    print(f"Tests: {len(tests)}  Browsers: {', '.join(args.browsers)}  Workers per browser: {workers_per_browser}")
+    print(f"Backend: {args.backend}  Artifacts: {artifact_dir}")
+    print("=" * 70)
+    # A single worker has the console to itself; parallel output would interleave
+    stream = len(jobs) == 1
+
+    grid = None
+    remote_url = None
+    if args.backend == "grid":
+        remote_url = args.grid_url
+        if remote_url is None:
+            # Every worker prewarms its whole pool at once
+            grid = start_local_grid(max_sessions=len(jobs) * sessions_per_worker(args.pytest_args))
+            remote_url = grid.url
+            print(f"Local grid stand-in listening on {remote_url}")
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(run_worker, browser, index, chunk, artifact_dir, remote_url, args.pytest_args,
+                                       stream)
+                       for browser, index, chunk in jobs]
+            workers = []
+            for future in futures:
+                worker = future.result()
+                status = "ok" if worker["returncode"] == 0 else f"exit {worker['returncode']}"
+                print(f"  {worker['browser']}-{worker['worker']}: {len(worker['tests'])} tests, "
+                      f"{worker['wall_s']:.1f}s ({status})")
+                workers.append(worker)
+    finally:
+        if grid is not None:
+            grid.stop()
+
+    for worker in workers:
+        if worker["returncode"] != 0 and not worker["streamed"]:
+            log_path = os.path.join(worker["directory"], "pytest.log")
+            print()
+            print(f"----- {worker['browser']}-{worker['worker']}: last {LOG_TAIL_LINES} lines of {log_path} -----")
+            for line in log_tail(log_path):
+                print(line)
+
+    report = aggregate(workers, args.browsers, started_at.isoformat(timespec="seconds"), time.perf_counter() - started)
+    report_path = os.path.join(artifact_dir, "report.json")
+    with open(report_path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+    print_report(report, report_path)
+
+    if any(worker["returncode"] != 0 for worker in workers):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,42 +5,27 @@ Usage:
     python run_tests.py              # Run with Chrome (default)
     python run_tests.py chrome       # Run with Chrome
     python run_tests.py firefox      # Run with Firefox
+    python run_tests.py all          # Run with Chrome and Firefox in parallel
+
+Runs through run_matrix.py; see it for workers, grid backend and pytest arguments.
 """
 
 import sys
-import os
-import subprocess
+
+from run_matrix import main as run_matrix
+
 
 def main():
     # Parse arguments
     browser = "chrome"
     
     # Check if browser argument provided
-    if len(sys.argv) > 1 and sys.argv[1] in ['chrome', 'firefox']:
+    if len(sys.argv) > 1 and sys.argv[1] in ['chrome', 'firefox', 'all']:
         browser = sys.argv[1]
     
-    # Build pytest command - run from project root
-    cmd = [
-        sys.executable,  # Use current Python interpreter
-        "-m", "pytest",
-        "tests/test_insider_careers.py",
-        "-v",
-        "-s",
-        f"--browser={browser}"
-    ]
-    
-    print("="*70)
-    print(f"Running Insider Selenium Tests with {browser.upper()}")
-    print("="*70)
-    print(f"Command: {' '.join(cmd)}")
-    print(f"Working directory: {os.getcwd()}")
-    print("="*70)
-    print()
-    
-    # Run tests
-    result = subprocess.run(cmd)
-    
-    sys.exit(result.returncode)
+    browsers = "chrome,firefox" if browser == "all" else browser
+    # Same pytest flags as before: verbose (added by run_matrix) and print output shown (-s)
+    sys.exit(run_matrix(["--browsers", browsers, "--", "-s"]))
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,15 @@
+import os
+
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+
+from resources.base_page import BasePage
+from resources.browser_profiles import PROFILES
+from resources.driver_factory import DriverFactory
+from resources.driver_pool import DriverPool
+from resources.network_capture import NetworkCapture
+from resources.perf_metrics import REPORT_COLUMNS, PerfMetricsCollector
+from resources.screenshots import FORMATS, SCREENSHOTS
+from resources.wait_profiler import WAITS
 
 
 def pytest_addoption(parser):
@@ -14,43 +20,297 @@ def pytest_addoption(parser):
         default="chrome",
         help="Browser to run tests: chrome or firefox"
     )
+    parser.addoption(
+        "--remote-url",
+        action="store",
+        default=os.environ.get("SELENIUM_REMOTE_URL"),
+        help="Run browsers on a Selenium Grid (or compatible) endpoint, e.g. http://localhost:4444 "
+             "(default: $SELENIUM_REMOTE_URL, otherwise local browsers)"
+    )
+    parser.addoption(
+        "--artifact-dir",
+        action="store",
+        default=os.environ.get("INSIDER_ARTIFACT_DIR"),
+        help="Directory for screenshots and reports of this run, e.g. one per parallel worker "
+             "(default: $INSIDER_ARTIFACT_DIR, otherwise the project directory)"
+    )
+    parser.addoption(
+        "--browser-pool-size",
+        action="store",
+        type=int,
+        default=1,
+        help="Warm browser sessions kept and reused across tests (0 = new browser per test)"
+    )
+    parser.addoption(
+        "--browser-max-uses",
+        action="store",
+        type=int,
+        default=20,
+        help="Tests served by one pooled browser before it is replaced"
+    )
+    parser.addoption(
+        "--browser-profile",
+        action="store",
+        default="default",
+        help=f"Browser profile(s), comma separated to compare them: {', '.join(PROFILES)}"
+    )
+    parser.addoption(
+        "--perf-metrics",
+        action="store",
+        nargs="?",
+        const=os.path.join("reports", "perf_metrics.jsonl"),
+        default=None,
+        help="Record front-end performance metrics of every page load, appended to a JSON Lines "
+             "file (default reports/perf_metrics.jsonl)"
+    )
+    parser.addoption(
+        "--screenshot-format",
+        action="store",
+        default="png",
+        choices=list(FORMATS),
+        help="Screenshot file format (png is lossless)"
+    )
+    parser.addoption(
+        "--screenshot-quality",
+        action="store",
+        type=int,
+        default=80,
+        help="JPEG/WebP screenshot quality, 1-95"
+    )
+    parser.addoption(
+        "--network-capture",
+        action="store",
+        nargs="?",
+        const=os.path.join("reports", "network.har"),
+        default=None,
+        help="Capture network traffic per page step (Chrome only) into a HAR file "
+             "(default reports/network.har)"
+    )
+
+
+def _browser_profiles(config):
+    return [name.strip() for name in config.getoption("--browser-profile").split(",") if name.strip()]
+
+
+def pytest_configure(config):
+    unknown = [name for name in _browser_profiles(config) if name not in PROFILES]
+    if unknown:
+        raise pytest.UsageError(f"Unknown browser profile(s) {', '.join(unknown)}; use: {', '.join(PROFILES)}")
+    blocking = [name for name in _browser_profiles(config) if PROFILES[name].blocked_urls]
+    if blocking and config.getoption("--browser").lower() == "chrome" and config.getoption("--remote-url"):
+        raise pytest.UsageError(f"Browser profile(s) {', '.join(blocking)} block URLs through a local Chrome's "
+                                "CDP connection; use them without --remote-url")
+    config._driver_pools = {}
+    config._test_profiles = {}
+    artifact_dir = config.getoption("--artifact-dir")
+    SCREENSHOTS.configure(directory=os.path.join(artifact_dir, "screenshots") if artifact_dir else None,
+                          image_format=config.getoption("--screenshot-format"),
+                          quality=config.getoption("--screenshot-quality"))
+    # Relative report paths are placed in the artifact directory
+    base_dir = artifact_dir or str(config.rootpath)
+    config._perf_metrics = None
+    path = config.getoption("--perf-metrics")
+    if path:
+        config._perf_metrics = PerfMetricsCollector(os.path.join(base_dir, path))
+        BasePage.page_load_hooks.append(config._perf_metrics)
+    config._network_capture = None
+    path = config.getoption("--network-capture")
+    if path:
+        if config.getoption("--browser").lower() != "chrome" or config.getoption("--remote-url"):
+            raise pytest.UsageError("--network-capture reads a local Chrome's performance log; "
+                                    "use --browser=chrome without --remote-url")
+        config._network_capture = NetworkCapture(os.path.join(base_dir, path))
+        BasePage.step_hooks.append(config._network_capture)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Write out screenshots still queued"""
+    SCREENSHOTS.close()
+
+
+def pytest_unconfigure(config):
+    collector = getattr(config, "_perf_metrics", None)
+    if collector in BasePage.page_load_hooks:
+        BasePage.page_load_hooks.remove(collector)
+    capture = getattr(config, "_network_capture", None)
+    if capture is not None:
+        capture.close()
+        BasePage.step_hooks.remove(capture)
+
+
+def pytest_generate_tests(metafunc):
+    """Run browser tests once per profile when several profiles are given"""
+    profiles = _browser_profiles(metafunc.config)
+    if "browser_profile" in metafunc.fixturenames and len(profiles) > 1:
+        metafunc.parametrize("browser_profile", profiles, indirect=True, scope="session")
+
+
+@pytest.fixture(scope="session")
+def browser_profile(request):
+    """Name of the browser profile (see resources/browser_profiles.py)"""
+    return getattr(request, "param", _browser_profiles(request.config)[0])
+
+
+@pytest.fixture(scope="session")
+def driver_factory(request, browser_profile):
+    """Browser launcher for the selected browser and profile; driver binaries are resolved once"""
+    return DriverFactory(request.config.getoption("--browser"), browser_profile,
+                         performance_log=request.config._network_capture is not None,
+                         remote_url=request.config.getoption("--remote-url"))
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request, driver_factory, browser_profile):
+    """Warm browser sessions shared by the tests of this worker"""
+    size = request.config.getoption("--browser-pool-size")
+    if size <= 0:
+        yield None
+        return
+    pool = DriverPool(driver_factory.create, size=size,
+                      max_uses=request.config.getoption("--browser-max-uses"))
+    request.config._driver_pools[browser_profile] = pool
+    # Record every origin the tests visit so the reset can clear each one
+    BasePage.page_load_hooks.append(pool.track)
+    BasePage.step_hooks.append(pool.track)
+    yield pool
+    BasePage.page_load_hooks.remove(pool.track)
+    BasePage.step_hooks.remove(pool.track)
+    pool.close()
 
 
 @pytest.fixture(scope="function")
-def driver(request):
+def driver(request, driver_pool, driver_factory):
     """Setup and teardown browser driver"""
-    browser = request.config.getoption("--browser").lower()
-    
-    if browser == "chrome":
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()),
-            options=options
-        )
-        
-    elif browser == "firefox":
-        options = webdriver.FirefoxOptions()
-        options.add_argument("--width=1920")
-        options.add_argument("--height=1080")
-        
-        driver = webdriver.Firefox(
-            service=FirefoxService(GeckoDriverManager().install()),
-            options=options
-        )
-    else:
-        raise ValueError(f"Browser '{browser}' is not supported. Use 'chrome' or 'firefox'")
-    
-    driver.implicitly_wait(10)
+    driver = driver_factory.create() if driver_pool is None else driver_pool.acquire()
+    capture = request.config._network_capture
+    if capture is not None:
+        capture.start(driver, request.node.nodeid)
     
     yield driver
     
-    # Teardown
-    driver.quit()
+    if capture is not None:
+        steps = capture.stop(driver, BasePage.active_step)
+        request.node.add_report_section("teardown", "network", NetworkCapture.format_steps(steps))
+    if driver_pool is None:
+        driver.quit()
+    else:
+        # Teardown: reset and keep warm for the next test
+        driver_pool.release(driver)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Attribute BasePage waits to the running test and measure its wall time"""
+    if "browser_profile" in item.funcargs:
+        item.config._test_profiles[item.nodeid] = item.funcargs["browser_profile"]
+    collector = item.config._perf_metrics
+    if collector is not None:
+        collector.current_test = item.nodeid
+    BasePage.active_step = None
+    with WAITS.test(item.nodeid):
+        yield
+
+
+def _print_profile_timings(terminalreporter, config):
+    groups = WAITS.by_label(lambda nodeid: config._test_profiles.get(nodeid, "-"))
+    groups.pop("-", None)
+    if not groups:
+        return
+    terminalreporter.section("Browser profiles")
+    terminalreporter.write_line(f"{'profile':<14}{'tests':>6}{'page load/test':>16}{'flow/test':>12}")
+    for name, group in groups.items():
+        terminalreporter.write_line(
+            f"{name:<14}{group['tests']:>6}{group['page_load_s'] / group['tests']:>15.2f}s"
+            f"{group['flow_s'] / group['tests']:>11.2f}s"
+        )
+
+
+def _print_wait_budget(terminalreporter):
+    summary = WAITS.summary()
+    if not summary["wall_s"]:
+        return
+    terminalreporter.section("Wait budget")
+    share = summary["wait_s"] / summary["wall_s"] * 100
+    terminalreporter.write_line(
+        f"Tests ran {summary['wall_s']:.1f}s, {summary['wait_s']:.1f}s ({share:.0f}%) in explicit waits; "
+        f"{summary['timeout_s']:.1f}s burned by {summary['timeouts']} timed-out waits"
+    )
+    for title, key in (("Steps", "steps"), ("Waits", "waits")):
+        terminalreporter.write_line(f"{title}:")
+        for group in summary[key]:
+            terminalreporter.write_line(
+                f"  {group['total_s']:7.2f}s  {group['name']}  "
+                f"({group['waits']} waits, {group['timeouts']} timed out)"
+            )
+
+
+def _print_perf_metrics(terminalreporter, config):
+    collector = config._perf_metrics
+    if collector is None or not collector.samples:
+        return
+    terminalreporter.section("Front-end performance (median, ms)")
+    header = "".join(f"{title:>8}" for _, title, _ in REPORT_COLUMNS)
+    terminalreporter.write_line(f"{'step':<40}{'n':>3}{header}")
+    for step, row in collector.summary().items():
+        values = "".join(
+            f"{fmt.format(row[metric]) if row[metric] is not None else '-':>8}"
+            for metric, _, fmt in REPORT_COLUMNS
+        )
+        terminalreporter.write_line(f"{step:<40}{row['samples']:>3}{values}")
+    terminalreporter.write_line(f"Time series appended to {collector.path}")
+
+
+def _print_network_capture(terminalreporter, config):
+    capture = config._network_capture
+    if capture is None or not capture.steps:
+        return
+    terminalreporter.section("Network per step")
+    tests = {}
+    for (test, step), stats in capture.steps.items():
+        tests.setdefault(test, {})[step] = stats
+    for test, steps in tests.items():
+        terminalreporter.write_line(test)
+        for line in NetworkCapture.format_steps(steps).splitlines():
+            terminalreporter.write_line(f"  {line}")
+    terminalreporter.write_line(f"HAR written to {capture.path}")
+
+
+def _print_screenshots(terminalreporter):
+    SCREENSHOTS.flush()
+    stats = SCREENSHOTS.stats()
+    if not stats["captured"]:
+        return
+    terminalreporter.section("Screenshots")
+    terminalreporter.write_line(
+        f"{stats['captured']} captured ({stats['duplicates']} duplicate frames skipped), "
+        f"{stats['written']} written to {SCREENSHOTS.directory}: {stats['raw_bytes'] / 1024:.0f} KiB raw -> "
+        f"{stats['written_bytes'] / 1024:.0f} KiB {SCREENSHOTS.image_format}; "
+        f"{stats['capture_time_s']:.2f}s on the test thread, {stats['encode_time_s']:.2f}s in the background"
+    )
+    for name, path in SCREENSHOTS.aliases:
+        terminalreporter.write_line(f"  {name}: identical to {path}, not written again")
+    for error in SCREENSHOTS.errors:
+        terminalreporter.write_line(f"  failed: {error}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report where the tests spent their time, per-profile timings and the startup time saved by the pools"""
+    _print_wait_budget(terminalreporter)
+    _print_profile_timings(terminalreporter, config)
+    _print_perf_metrics(terminalreporter, config)
+    _print_network_capture(terminalreporter, config)
+    _print_screenshots(terminalreporter)
+    for profile, pool in config._driver_pools.items():
+        if not pool.launches:
+            continue
+        stats = pool.stats()
+        terminalreporter.section(f"Browser pool ({profile})")
+        terminalreporter.write_line(
+            f"{stats['launches']} browser launches (avg {stats['average_launch_s']:.1f}s), "
+            f"{stats['reuses']} reuses, {stats['recycled']} recycled, {stats['unclean']} unclean, "
+            f"{stats['crashed']} crashed; "
+            f"saved ~{stats['saved_s']:.1f}s of browser startup"
+        )
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -63,16 +323,8 @@ def pytest_runtest_makereport(item, call):
         driver = item.funcargs.get('driver')
         if driver:
             try:
-                from datetime import datetime
-                import os
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_dir = os.path.join(os.path.dirname(__file__), "screenshots")
-                os.makedirs(screenshot_dir, exist_ok=True)
-                
                 test_name = item.name
-                screenshot_path = os.path.join(screenshot_dir, f"FAILED_{test_name}_{timestamp}.png")
-                driver.save_screenshot(screenshot_path)
+                screenshot_path = SCREENSHOTS.capture(driver, f"FAILED_{test_name}")
                 print(f"\nTest failed! Screenshot saved: {screenshot_path}")
             except Exception as e:
                 print(f"Failed to take screenshot: {str(e)}")
@@ -0,0 +1,246 @@
+import pytest
+import sys
+import os
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import MaxRetryError
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from resources.driver_pool import DriverPool
+
+
+class StubSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class StubDriver:
+    """Just enough of a WebDriver for DriverPool: windows, navigation and storage"""
+    
+    def __init__(self, url="about:blank", leftover=0):
+        self.windows = {"main": url}
+        self.current = "main"
+        self.switch_to = StubSwitchTo(self)
+        self.leftover = leftover
+        self.error = None
+        self.quit_calls = 0
+        self.scripts = 0
+    
+    @property
+    def window_handles(self):
+        return list(self.windows)
+    
+    @property
+    def current_url(self):
+        return self.windows[self.current]
+    
+    def get(self, url):
+        self.windows[self.current] = url
+    
+    def open_window(self, handle, url):
+        self.windows[handle] = url
+    
+    def close(self):
+        del self.windows[self.current]
+    
+    def delete_all_cookies(self):
+        if self.error is not None:
+            raise self.error
+    
+    def execute_async_script(self, script):
+        if self.error is not None:
+            raise self.error
+        self.scripts += 1
+        return self.leftover
+    
+    def implicitly_wait(self, seconds):
+        pass
+    
+    def quit(self):
+        self.quit_calls += 1
+
+
+class StubChromeDriver(StubDriver):
+    """StubDriver with a CDP connection recording the commands it receives"""
+    
+    def __init__(self, url="about:blank", leftover=0, cookies=(), databases=()):
+        super().__init__(url, leftover)
+        self.commands = []
+        self.cookies = list(cookies)
+        self.databases = list(databases)
+    
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        if command == "Storage.getCookies":
+            return {"cookies": self.cookies}
+        if command == "IndexedDB.requestDatabaseNames":
+            return {"databaseNames": self.databases}
+        return {}
+    
+    def cleared_origins(self):
+        return [params["origin"] for command, params in self.commands if command == "Storage.clearDataForOrigin"]
+
+
+class StubPage:
+    def __init__(self, driver):
+        self.driver = driver
+
+
+def make_pool(driver_class=StubDriver, **kwargs):
+    launched = []
+    
+    def factory():
+        launched.append(driver_class())
+        return launched[-1]
+    
+    pool = DriverPool(factory, implicit_wait=0, **kwargs)
+    return pool, launched
+
+
+class TestDriverPool:
+    """DriverPool with stub drivers (no browser needed)"""
+    
+    def test_session_is_reused(self):
+        """Positive Test: a released session serves the next test"""
+        pool, launched = make_pool(size=1)
+        driver = pool.acquire()
+        pool.release(driver)
+        
+        assert pool.acquire() is driver
+        assert pool.stats()["launches"] == 1 and pool.stats()["reuses"] == 1
+        assert driver.current_url == "about:blank" and driver.quit_calls == 0
+    
+    def test_prewarm_launches_every_session(self):
+        """Positive Test: the first acquire launches the whole pool"""
+        pool, launched = make_pool(size=3)
+        pool.acquire()
+        
+        assert len(launched) == 3
+    
+    def test_worn_out_session_is_recycled(self):
+        """Positive Test: a session is quit after max_uses tests"""
+        pool, launched = make_pool(size=1, max_uses=2)
+        driver = pool.acquire()
+        pool.release(driver)
+        pool.release(pool.acquire())
+        
+        assert driver.quit_calls == 1
+        assert pool.stats()["recycled"] == 1
+        assert pool.acquire() is not driver
+    
+    def test_session_beyond_pool_size_is_quit(self):
+        """Positive Test: a full pool does not keep an extra session"""
+        pool, launched = make_pool(size=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        
+        assert second.quit_calls == 1 and first.quit_calls == 0
+    
+    def test_extra_windows_are_closed(self):
+        """Positive Test: reset leaves one blank window"""
+        pool, launched = make_pool(size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/careers/")
+        driver.open_window("popup", "https://jobs.lever.co/useinsider")
+        pool.release(driver)
+        
+        assert driver.window_handles == ["main"]
+        assert driver.current_url == "about:blank"
+    
+    def test_chromium_clears_every_tracked_origin(self):
+        """Positive Test: origins left behind during the test are cleared over CDP"""
+        pool, launched = make_pool(StubChromeDriver, size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/")
+        pool.track(StubPage(driver))
+        driver.get("https://jobs.lever.co:443/useinsider")
+        pool.track(StubPage(driver), "previous step")
+        driver.get("https://useinsider.com/careers/")
+        pool.release(driver)
+        
+        assert driver.cleared_origins() == ["https://jobs.lever.co:443", "https://useinsider.com"]
+        assert ("Network.clearBrowserCookies", {}) in driver.commands
+        assert pool.stats()["unclean"] == 0
+    
+    def test_tracked_origins_are_forgotten_after_reset(self):
+        """Positive Test: the next test's reset clears only what that test visited"""
+        pool, launched = make_pool(StubChromeDriver, size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/")
+        pool.track(StubPage(driver))
+        pool.release(driver)
+        driver.commands.clear()
+        pool.release(pool.acquire())
+        
+        assert driver.cleared_origins() == []
+    
+    def test_foreign_driver_is_not_tracked(self):
+        """Negative Test: track() ignores sessions this pool did not launch"""
+        pool, launched = make_pool(size=1)
+        pool.track(StubPage(StubDriver("https://useinsider.com/")))
+        
+        assert pool._origins == {}
+    
+    def test_storage_left_in_a_window_makes_session_unclean(self):
+        """Negative Test: storage that survived the clear script is never handed out again"""
+        pool, launched = make_pool(size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/")
+        driver.leftover = 1
+        pool.release(driver)
+        
+        assert driver.quit_calls == 1
+        assert pool.stats()["unclean"] == 1
+        assert pool.acquire() is not driver
+    
+    def test_surviving_cookies_make_chromium_session_unclean(self):
+        """Negative Test: cookies still reported by CDP after the reset fail the check"""
+        pool, launched = make_pool(StubChromeDriver, size=1)
+        driver = pool.acquire()
+        driver.cookies = [{"name": "session"}]
+        pool.release(driver)
+        
+        assert driver.quit_calls == 1 and pool.stats()["unclean"] == 1
+    
+    def test_unreachable_origin_without_cdp_makes_session_unclean(self):
+        """Negative Test: without CDP an origin no window is on any more cannot be cleared"""
+        pool, launched = make_pool(size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/")
+        pool.track(StubPage(driver))
+        driver.get("https://jobs.lever.co/useinsider")
+        pool.release(driver)
+        
+        assert driver.quit_calls == 1 and pool.stats()["unclean"] == 1
+    
+    @pytest.mark.parametrize("error", [WebDriverException("chrome not reachable"),
+                                       MaxRetryError(None, "/session/1/window/handles"),
+                                       ConnectionRefusedError("driver process gone")])
+    def test_crashed_session_is_quit_and_forgotten(self, error):
+        """Negative Test: a reset failing because the browser or driver died recycles the session"""
+        pool, launched = make_pool(size=1)
+        driver = pool.acquire()
+        driver.get("https://useinsider.com/")
+        driver.error = error
+        pool.release(driver)
+        
+        assert driver.quit_calls == 1
+        assert pool.stats()["crashed"] == 1
+        assert id(driver) not in pool._uses and id(driver) not in pool._origins
+        assert pool.acquire() is not driver
+    
+    def test_close_quits_idle_sessions(self):
+        """Positive Test: close() quits every warm session"""
+        pool, launched = make_pool(size=2)
+        pool.release(pool.acquire())
+        pool.close()
+        
+        assert all(driver.quit_calls == 1 for driver in launched)
@@ -0,0 +1,263 @@
+import json
+import pytest
+import sys
+import os
+import time
+
+import webdriver_manager.chrome
+from webdriver_manager.core.os_manager import OperationSystemManager
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from resources.driver_resolver import UNFINGERPRINTED_TTL_S, DriverResolutionError, DriverResolver
+
+
+class FakeMachine:
+    """
+    Browser and driver binaries as DriverResolver sees them
+    
+    --version output and fingerprints come from dicts instead of running or
+    stat-ing anything; the webdriver-manager download returns download_result
+    (a path, or an exception to raise). The lock file lives in a temporary
+    SELENIUM_DRIVER_CACHE, PATH and the driver caches under a temporary home.
+    """
+    
+    def __init__(self, root, monkeypatch):
+        self.root = root
+        self.versions = {}
+        self.fingerprints = {}
+        self.runs = []
+        self.downloads = 0
+        self.download_result = None
+        self.browser = None
+        self.os_browser_version = None
+        (root / "bin").mkdir()
+        monkeypatch.setenv("SELENIUM_DRIVER_CACHE", str(root / "cache"))
+        monkeypatch.setenv("HOME", str(root / "home"))
+        monkeypatch.setenv("PATH", str(root / "bin"))
+        monkeypatch.setattr(DriverResolver, "_run", staticmethod(self.run))
+        monkeypatch.setattr(DriverResolver, "_fingerprint", staticmethod(self.fingerprints.get))
+        monkeypatch.setattr(DriverResolver, "browser_binary", lambda resolver: self.browser)
+        monkeypatch.setattr(webdriver_manager.chrome, "ChromeDriverManager", lambda: self)
+        monkeypatch.setattr(OperationSystemManager, "get_browser_version_from_os",
+                            lambda manager, browser_type: self.os_browser_version)
+    
+    def run(self, *command):
+        self.runs.append(command)
+        return self.versions.get(command[0], "")
+    
+    def install(self):
+        """ChromeDriverManager.install()"""
+        self.downloads += 1
+        if isinstance(self.download_result, Exception):
+            raise self.download_result
+        return self.download_result
+    
+    def install_browser(self, version, fingerprint=(1, 100)):
+        self.browser = str(self.root / "google-chrome")
+        self.versions[self.browser] = f"Google Chrome {version}"
+        self.fingerprints[self.browser] = list(fingerprint)
+    
+    def add_driver(self, version, directory="wdm"):
+        """Executable chromedriver reporting `version`"""
+        path = self.root / directory / version / "chromedriver"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+        path.chmod(0o755)
+        self.versions[str(path)] = f"ChromeDriver {version} (0a1b2c)"
+        return str(path)
+    
+    def lock(self):
+        with open(self.root / "cache" / "drivers.lock.json", encoding="utf-8") as lock_file:
+            return json.load(lock_file)
+
+
+@pytest.fixture
+def machine(tmp_path, monkeypatch):
+    return FakeMachine(tmp_path, monkeypatch)
+
+
+class TestDriverResolver:
+    """Lock file, fingerprint, TTL and fallback branches with stubbed probing (no browser, no network)"""
+    
+    def test_first_resolve_downloads_and_locks(self, machine):
+        """Positive Test: the downloaded driver is validated and locked with the browser fingerprint"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        
+        assert DriverResolver("chrome").resolve() == machine.download_result
+        entry = machine.lock()["drivers"]["chrome"]
+        assert entry["driver_version"] == "131.0.6778.69"
+        assert entry["browser_version"] == "131.0.6778.85"
+        assert entry["browser_fingerprint"] == [1, 100]
+        assert entry["expires_at"] is None
+    
+    def test_unchanged_browser_reuses_lock_without_probing(self, machine):
+        """Positive Test: a matching fingerprint returns the locked driver without running anything"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        machine.runs.clear()
+        
+        assert DriverResolver("chrome").resolve() == machine.download_result
+        assert machine.runs == [] and machine.downloads == 1
+    
+    def test_patch_update_keeps_compatible_driver(self, machine):
+        """Positive Test: a changed fingerprint re-validates, the same major keeps the locked driver"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = driver = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        machine.install_browser("131.0.6778.108", fingerprint=(2, 100))
+        
+        assert DriverResolver("chrome").resolve() == driver
+        assert machine.downloads == 1
+        entry = machine.lock()["drivers"]["chrome"]
+        assert entry["browser_version"] == "131.0.6778.108" and entry["browser_fingerprint"] == [2, 100]
+    
+    def test_major_update_downloads_again(self, machine):
+        """Positive Test: a new major version replaces the locked driver"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        machine.install_browser("132.0.6834.83", fingerprint=(3, 100))
+        machine.download_result = newer = machine.add_driver("132.0.6834.83")
+        
+        assert DriverResolver("chrome").resolve() == newer
+        assert machine.downloads == 2
+    
+    def test_missing_driver_file_is_resolved_again(self, machine):
+        """Negative Test: a locked driver deleted from disk is not returned"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = driver = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        os.remove(driver)
+        machine.download_result = replacement = machine.add_driver("131.0.6778.85")
+        
+        assert DriverResolver("chrome").resolve() == replacement
+    
+    def test_refresh_ignores_lock(self, machine):
+        """Positive Test: refresh=True resolves again although the lock is valid"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        
+        DriverResolver("chrome").resolve(refresh=True)
+        assert machine.downloads == 2
+    
+    @pytest.mark.parametrize("content", ["{not json", json.dumps({"version": 0, "drivers": {"chrome": {}}})])
+    def test_unreadable_or_old_lock_is_ignored(self, machine, content):
+        """Negative Test: a corrupt lock or one from another format version is replaced"""
+        (machine.root / "cache").mkdir()
+        (machine.root / "cache" / "drivers.lock.json").write_text(content)
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = driver = machine.add_driver("131.0.6778.69")
+        
+        assert DriverResolver("chrome").resolve() == driver
+        assert machine.lock()["drivers"]["chrome"]["driver_path"] == driver
+    
+    # ==================== NO BROWSER EXECUTABLE ====================
+    
+    def test_unfingerprinted_entry_is_reused_until_it_expires(self, machine):
+        """Positive Test: without a browser executable the lock is trusted for UNFINGERPRINTED_TTL_S"""
+        machine.os_browser_version = "131.0.6778.85"
+        machine.download_result = driver = machine.add_driver("131.0.6778.69")
+        before = time.time()
+        DriverResolver("chrome").resolve()
+        
+        entry = machine.lock()["drivers"]["chrome"]
+        assert entry["browser_fingerprint"] is None
+        assert before + UNFINGERPRINTED_TTL_S <= entry["expires_at"] <= time.time() + UNFINGERPRINTED_TTL_S
+        # Not noticed within the TTL: nothing is probed
+        machine.os_browser_version = "132.0.6834.83"
+        machine.runs.clear()
+        assert DriverResolver("chrome").resolve() == driver
+        assert machine.runs == [] and machine.downloads == 1
+    
+    def test_expired_unfingerprinted_entry_is_validated_again(self, machine):
+        """Negative Test: past the TTL the browser version is read again and the driver replaced"""
+        machine.os_browser_version = "131.0.6778.85"
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        lock = machine.lock()
+        lock["drivers"]["chrome"]["expires_at"] = time.time() - 1
+        (machine.root / "cache" / "drivers.lock.json").write_text(json.dumps(lock))
+        machine.os_browser_version = "132.0.6834.83"
+        machine.download_result = newer = machine.add_driver("132.0.6834.83")
+        
+        assert DriverResolver("chrome").resolve() == newer
+        assert machine.lock()["drivers"]["chrome"]["expires_at"] > time.time()
+    
+    def test_browser_installed_after_unfingerprinted_lock(self, machine):
+        """Positive Test: a browser that appears within the TTL is fingerprinted at once"""
+        machine.os_browser_version = "131.0.6778.85"
+        machine.download_result = machine.add_driver("131.0.6778.69")
+        DriverResolver("chrome").resolve()
+        machine.install_browser("131.0.6778.85")
+        
+        DriverResolver("chrome").resolve()
+        entry = machine.lock()["drivers"]["chrome"]
+        assert entry["browser_fingerprint"] == [1, 100] and entry["expires_at"] is None
+    
+    # ==================== FALLBACKS ====================
+    
+    def test_offline_falls_back_to_newest_compatible_local_driver(self, machine):
+        """Positive Test: without network, the newest local driver matching the browser is locked"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = ConnectionError("offline")
+        machine.add_driver("130.0.6723.116", directory="home/.wdm/drivers/chromedriver/linux64")
+        machine.add_driver("131.0.6778.69", directory="home/.wdm/drivers/chromedriver/linux64")
+        newest = machine.add_driver("131.0.6778.85", directory="home/.cache/selenium/chromedriver/linux64")
+        
+        assert DriverResolver("chrome").resolve() == newest
+        assert machine.lock()["drivers"]["chrome"]["driver_version"] == "131.0.6778.85"
+    
+    def test_driver_on_path_is_a_fallback(self, machine):
+        """Positive Test: a compatible chromedriver on PATH is used when the download fails"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = ConnectionError("offline")
+        on_path = machine.root / "bin" / "chromedriver"
+        on_path.write_text("")
+        on_path.chmod(0o755)
+        machine.versions[str(on_path)] = "ChromeDriver 131.0.6778.69"
+        
+        assert DriverResolver("chrome").resolve() == str(on_path)
+    
+    def test_mismatched_download_is_never_locked(self, machine):
+        """Negative Test: a downloaded driver for another major falls back to a local one"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("130.0.6723.116")
+        local = machine.add_driver("131.0.6778.69", directory="home/.wdm/drivers/chromedriver/linux64")
+        
+        assert DriverResolver("chrome").resolve() == local
+    
+    def test_mismatched_download_without_local_driver(self, machine):
+        """Negative Test: nothing compatible anywhere raises with the reason"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = machine.add_driver("130.0.6723.116")
+        
+        with pytest.raises(DriverResolutionError, match="does not match chrome 131.0.6778.85"):
+            DriverResolver("chrome").resolve()
+        assert not (machine.root / "cache" / "drivers.lock.json").exists()
+    
+    def test_offline_without_local_driver(self, machine):
+        """Negative Test: the download error is chained to the resolution error"""
+        machine.install_browser("131.0.6778.85")
+        machine.download_result = ConnectionError("offline")
+        machine.add_driver("130.0.6723.116", directory="home/.wdm/drivers/chromedriver/linux64")
+        
+        with pytest.raises(DriverResolutionError, match="Could not download chromedriver") as error:
+            DriverResolver("chrome").resolve()
+        assert isinstance(error.value.__cause__, ConnectionError)
+    
+    @pytest.mark.parametrize("browser, driver_version, browser_version, compatible", [
+        ("chrome", "131.0.6778.69", "131.0.6778.85", True),
+        ("chrome", "130.0.6723.116", "131.0.6778.85", False),
+        ("chrome", None, "131.0.6778.85", True),
+        ("firefox", "0.35.0", "133.0", True),
+    ])
+    def test_is_compatible(self, browser, driver_version, browser_version, compatible):
+        """Positive Test: chromedriver must share Chrome's major, geckodriver spans releases"""
+        assert DriverResolver(browser, cache_dir="unused").is_compatible(driver_version, browser_version) is compatible
@@ -0,0 +1,202 @@
+import json
+import pytest
+import sys
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from resources.network_capture import NetworkCapture, _phases
+
+PAGE = "https://useinsider.com/careers/"
+LOGO = "https://useinsider.com/logo.svg"
+
+# CDP ResourceTiming (ms relative to requestTime) of a fresh HTTPS connection
+TIMING = {"dnsStart": 1, "dnsEnd": 11, "connectStart": 11, "connectEnd": 41, "sslStart": 21, "sslEnd": 41,
+          "sendStart": 42, "sendEnd": 43, "receiveHeadersEnd": 143}
+
+
+class StubDriver:
+    """Chrome's performance log: queued DevTools messages returned by get_log"""
+    
+    def __init__(self):
+        self.log = []
+        self.error = None
+    
+    def queue(self, method, **params):
+        self.log.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+    
+    def get_log(self, log_type):
+        if self.error is not None:
+            raise self.error
+        entries, self.log = self.log, []
+        return entries
+
+
+def request_sent(driver, request_id, url, timestamp, **extra):
+    driver.queue("Network.requestWillBeSent", requestId=request_id, timestamp=timestamp, wallTime=1700000000 + timestamp,
+                 request={"url": url, "method": "GET", "headers": {"Accept": "*/*"}}, **extra)
+
+
+def response(status=200, headers=None, timing=None, protocol="h2"):
+    return {"status": status, "statusText": "", "protocol": protocol, "headers": headers or {},
+            "mimeType": "text/html", "timing": timing}
+
+
+def load_page(driver, request_id="1", url=PAGE, started=10.0, finished=10.2, size=5000, timing=TIMING):
+    request_sent(driver, request_id, url, started)
+    driver.queue("Network.responseReceived", requestId=request_id, response=response(timing=timing))
+    driver.queue("Network.loadingFinished", requestId=request_id, timestamp=finished, encodedDataLength=size)
+
+
+def read_har(path):
+    with open(path, encoding="utf-8") as har:
+        return json.load(har)["log"]
+
+
+class TestPhases:
+    """HAR timing phases derived from a CDP ResourceTiming"""
+    
+    def test_fresh_connection(self):
+        """Positive Test: every phase of a new HTTPS connection, receive up to the total time"""
+        assert _phases(TIMING, 200.0) == {
+            "blocked": 1, "dns": 10, "connect": 30, "ssl": 20, "send": 1, "wait": 100, "receive": 57.0,
+        }
+    
+    def test_reused_connection(self):
+        """Positive Test: phases not taken on a reused connection are -1"""
+        timing = {"dnsStart": -1, "dnsEnd": -1, "connectStart": -1, "connectEnd": -1, "sslStart": -1,
+                  "sslEnd": -1, "sendStart": 2, "sendEnd": 3, "receiveHeadersEnd": 53}
+        
+        assert _phases(timing, 60.0) == {
+            "blocked": 2, "dns": -1, "connect": -1, "ssl": -1, "send": 1, "wait": 50, "receive": 7.0,
+        }
+    
+    def test_without_timing(self):
+        """Negative Test: cached or failed responses carry no timing; the total counts as wait"""
+        assert _phases(None, 12.5) == {
+            "blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 0, "wait": 12.5, "receive": 0,
+        }
+
+
+class TestNetworkCapture:
+    """Event aggregation per step and HAR output, fed from a stub performance log"""
+    
+    @pytest.fixture
+    def capture(self, tmp_path):
+        capture = NetworkCapture(str(tmp_path / "reports" / "network.har"), top=2)
+        yield capture
+        capture.close()
+    
+    def test_events_are_attributed_to_their_step(self, capture):
+        """Positive Test: requests, bytes, cache hits and failures per step"""
+        driver = StubDriver()
+        capture.start(driver, "test_careers")
+        load_page(driver)
+        capture.drain(driver, "HomePage.load")
+        load_page(driver, "2", LOGO, 11.0, 11.05, 800)
+        request_sent(driver, "3", "https://useinsider.com/app.js", 11.0)
+        driver.queue("Network.requestServedFromCache", requestId="3")
+        driver.queue("Network.loadingFinished", requestId="3", timestamp=11.001, encodedDataLength=0)
+        request_sent(driver, "4", "https://tracker.example/pixel", 11.0)
+        driver.queue("Network.loadingFailed", requestId="4", timestamp=11.01, blockedReason="inspector")
+        
+        steps = capture.stop(driver, "CareersPage.open")
+        home = steps["HomePage.load"]
+        assert (home["requests"], home["bytes"], home["cache_hits"], home["failed"]) == (1, 5000, 0, 0)
+        [(total_ms, _, url, phases)] = home["slowest"]
+        assert (total_ms, url) == (pytest.approx(200.0), PAGE)
+        assert phases == pytest.approx(_phases(TIMING, 200.0))
+        careers = steps["CareersPage.open"]
+        assert (careers["requests"], careers["bytes"], careers["cache_hits"], careers["failed"]) == (3, 800, 1, 1)
+        # top=2: the two slowest of the step, the cached hit dropped
+        assert {resource[2] for resource in careers["slowest"]} == {LOGO, "https://tracker.example/pixel"}
+    
+    def test_events_before_start_are_discarded(self, capture):
+        """Negative Test: a request still in flight from the previous test is never finished into this one"""
+        driver = StubDriver()
+        request_sent(driver, "1", PAGE, 9.0)
+        capture.start(driver, "test_careers")
+        driver.queue("Network.loadingFinished", requestId="1", timestamp=9.5, encodedDataLength=100)
+        
+        assert capture.stop(driver, "HomePage.load") == {}
+    
+    def test_unreadable_log_is_ignored(self, capture):
+        """Negative Test: a session without a performance log captures nothing instead of failing"""
+        driver = StubDriver()
+        driver.error = WebDriverException("log type 'performance' not found")
+        capture.start(driver, "test_careers")
+        
+        assert capture.stop(driver, "HomePage.load") == {}
+    
+    def test_har_is_valid_after_every_entry(self, capture):
+        """Positive Test: the HAR file is complete JSON while the run is still going"""
+        driver = StubDriver()
+        capture.start(driver, "test_careers")
+        load_page(driver)
+        capture.drain(driver, "HomePage.load")
+        
+        log = read_har(capture.path)
+        assert log["creator"]["name"] == "insider-selenium-tests"
+        assert [entry["request"]["url"] for entry in log["entries"]] == [PAGE]
+        assert [page["id"] for page in log["pages"]] == ["test_careers::HomePage.load"]
+        
+        load_page(driver, "2", LOGO, 11.0, 11.05, 800)
+        capture.stop(driver, "CareersPage.open")
+        log = read_har(capture.path)
+        assert [entry["pageref"] for entry in log["entries"]] == ["test_careers::HomePage.load",
+                                                                   "test_careers::CareersPage.open"]
+        assert len(log["pages"]) == 2
+        
+        capture.close()
+        assert read_har(capture.path) == log
+    
+    def test_har_entry(self, capture):
+        """Positive Test: request, response and timings of one entry"""
+        driver = StubDriver()
+        capture.start(driver, "test_careers")
+        load_page(driver)
+        capture.stop(driver, "HomePage.load")
+        
+        entry = read_har(capture.path)["entries"][0]
+        assert entry["time"] == pytest.approx(200.0)
+        assert entry["request"]["headers"] == [{"name": "Accept", "value": "*/*"}]
+        assert entry["response"]["status"] == 200 and entry["response"]["httpVersion"] == "h2"
+        assert entry["response"]["_transferSize"] == 5000
+        assert entry["timings"] == pytest.approx(_phases(TIMING, 200.0))
+    
+    @pytest.mark.parametrize("location_header", ["Location", "location"])
+    def test_redirect_is_its_own_entry(self, capture, location_header):
+        """Positive Test: a redirect hop gets redirectURL from HTTP/1.1 and HTTP/2 header names"""
+        driver = StubDriver()
+        capture.start(driver, "test_careers")
+        request_sent(driver, "1", "http://useinsider.com/careers", 10.0)
+        request_sent(driver, "1", PAGE, 10.1,
+                     redirectResponse=dict(response(301, {location_header: PAGE}, protocol="http/1.1"),
+                                           encodedDataLength=300))
+        driver.queue("Network.responseReceived", requestId="1", response=response())
+        driver.queue("Network.loadingFinished", requestId="1", timestamp=10.3, encodedDataLength=5000)
+        steps = capture.stop(driver, "HomePage.load")
+        
+        redirect, page = read_har(capture.path)["entries"]
+        assert redirect["response"]["status"] == 301
+        assert redirect["response"]["redirectURL"] == PAGE
+        assert page["response"]["redirectURL"] == ""
+        assert steps["HomePage.load"]["requests"] == 2 and steps["HomePage.load"]["bytes"] == 5300
+    
+    def test_format_steps(self, capture):
+        """Positive Test: one line per step, then its slowest resources, slowest first"""
+        driver = StubDriver()
+        capture.start(driver, "test_careers")
+        load_page(driver)
+        load_page(driver, "2", LOGO, 10.0, 10.05, 1024, timing=None)
+        steps = capture.stop(driver, "HomePage.load")
+        
+        lines = NetworkCapture.format_steps(steps).splitlines()
+        assert lines[0] == "HomePage.load: 2 requests, 6 KiB, 0 from cache, 0 failed"
+        assert PAGE in lines[1] and LOGO in lines[2]
+        assert "dns 10, connect 30, ssl 20, send 1, wait 100, receive 57" in lines[1]
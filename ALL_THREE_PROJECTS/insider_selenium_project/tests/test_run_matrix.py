@@ -0,0 +1,210 @@
+import json
+import pytest
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import run_matrix
+from resources import local_grid
+from resources.local_grid import LocalGrid
+
+JUNIT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_insider_careers.TestCareers" name="test_home" time="1.5"/>
+<testcase classname="tests.test_insider_careers.TestCareers" name="test_jobs" time="2.25"><failure message="boom"/></testcase>
+<testcase classname="tests.test_insider_careers.TestCareers" name="test_lever" time="0.5"><error message="setup"/></testcase>
+<testcase classname="tests.test_insider_careers.TestCareers" name="test_qa" time=""><skipped message="later"/></testcase>
+</testsuite></testsuites>
+"""
+
+
+def worker(browser, index, returncode=0, wall_s=1.0, tests=()):
+    return {"browser": browser, "worker": index, "directory": f"/tmp/{browser}-{index}",
+            "returncode": returncode, "wall_s": wall_s, "tests": list(tests), "streamed": False}
+
+
+def result(test, outcome="passed", time_s=1.0):
+    return {"test": test, "outcome": outcome, "time_s": time_s}
+
+
+class TestSharding:
+    """Splitting the collected tests and sizing the local grid"""
+    
+    def test_shard_is_round_robin(self):
+        """Positive Test: every test lands in exactly one shard, in collection order"""
+        tests = [f"t{index}" for index in range(7)]
+        
+        assert run_matrix.shard(tests, 3) == [["t0", "t3", "t6"], ["t1", "t4"], ["t2", "t5"]]
+    
+    def test_shard_never_exceeds_test_count(self):
+        """Positive Test: more workers than tests leaves no worker without a test"""
+        assert run_matrix.shard(["t0", "t1"], 8) == [["t0"], ["t1"]]
+    
+    def test_shard_without_tests(self):
+        """Negative Test: no tests still gives one (empty) shard"""
+        assert run_matrix.shard([], 4) == [[]]
+    
+    @pytest.mark.parametrize("pytest_args, expected", [
+        ([], 1),
+        (["--browser-pool-size=3"], 3),
+        (["-k", "careers", "--browser-pool-size", "2"], 2),
+        (["--browser-pool-size=2", "--browser-pool-size=4"], 4),
+        (["--browser-pool-size=0"], 1),
+        (["--browser-pool-size=many"], 1),
+        (["--browser-pool-size"], 1),
+    ])
+    def test_sessions_per_worker(self, pytest_args, expected):
+        """Positive Test: the forwarded pool size, last one winning, at least one session"""
+        assert run_matrix.sessions_per_worker(pytest_args) == expected
+
+
+class TestResults:
+    """Reading worker JUnit reports and aggregating them per browser"""
+    
+    def test_read_junit(self, tmp_path):
+        """Positive Test: outcome and duration of every test case"""
+        path = tmp_path / "junit.xml"
+        path.write_text(JUNIT_XML)
+        prefix = "tests.test_insider_careers.TestCareers::"
+        
+        assert run_matrix.read_junit(str(path)) == [
+            result(prefix + "test_home", "passed", 1.5),
+            result(prefix + "test_jobs", "failed", 2.25),
+            result(prefix + "test_lever", "failed", 0.5),
+            result(prefix + "test_qa", "skipped", 0.0),
+        ]
+    
+    def test_aggregate_per_browser(self):
+        """Positive Test: totals per browser, wall time of the slowest worker"""
+        workers = [
+            worker("chrome", 1, wall_s=4.0, tests=[result("a", time_s=3.0), result("b", "failed", 1.0)]),
+            worker("chrome", 2, returncode=1, wall_s=6.0, tests=[result("c", "skipped", 0.0)]),
+            worker("firefox", 1, wall_s=5.0, tests=[result("a", time_s=4.5)]),
+        ]
+        report = run_matrix.aggregate(workers, ["chrome", "firefox"], "2026-01-01T00:00:00", 6.5)
+        
+        assert report["browsers"]["chrome"] == {
+            "workers": 2, "tests": 3, "passed": 1, "failed": 1, "skipped": 1,
+            "crashed_workers": 0, "wall_s": 6.0, "test_time_s": 4.0,
+        }
+        assert report["browsers"]["firefox"]["passed"] == 1
+        assert report["wall_s"] == 6.5
+        assert [test["browser"] for test in report["tests"]] == ["chrome", "chrome", "chrome", "firefox"]
+        assert "streamed" not in report["workers"][0]
+        assert json.loads(json.dumps(report)) == report  # Written to report.json as is
+    
+    def test_worker_without_report_is_crashed(self):
+        """Negative Test: a worker that failed without a JUnit report is counted as crashed"""
+        workers = [worker("chrome", 1, returncode=3), worker("chrome", 2, returncode=5)]
+        report = run_matrix.aggregate(workers, ["chrome"], "2026-01-01T00:00:00", 1.0)
+        
+        assert report["browsers"]["chrome"]["crashed_workers"] == 1
+        assert report["browsers"]["chrome"]["tests"] == 0
+
+
+class TestWorkerOutput:
+    """Worker logs: streamed for a single worker, tailed after a failure"""
+    
+    def test_streamed_output_is_also_logged(self, tmp_path, capsys):
+        """Positive Test: a streamed worker's output reaches the console and its log"""
+        log_path = tmp_path / "pytest.log"
+        returncode = run_matrix.run_logged([sys.executable, "-c", "print('first'); print('second'); exit(3)"],
+                                           str(log_path), stream=True)
+        
+        assert returncode == 3
+        assert capsys.readouterr().out == "first\nsecond\n"
+        assert log_path.read_text() == "first\nsecond\n"
+    
+    def test_unstreamed_output_is_only_logged(self, tmp_path, capfd):
+        """Positive Test: parallel workers keep the console to the runner"""
+        log_path = tmp_path / "pytest.log"
+        run_matrix.run_logged([sys.executable, "-c", "print('quiet')"], str(log_path))
+        
+        assert capfd.readouterr().out == ""
+        assert log_path.read_text() == "quiet\n"
+    
+    def test_log_tail(self, tmp_path):
+        """Positive Test: the last lines of a failed worker's log, none for a missing log"""
+        log_path = tmp_path / "pytest.log"
+        log_path.write_text("".join(f"line {index}\n" for index in range(100)))
+        
+        assert run_matrix.log_tail(str(log_path), 3) == ["line 97", "line 98", "line 99"]
+        assert run_matrix.log_tail(str(tmp_path / "missing.log")) == []
+
+
+class TestLocalGridDispatch:
+    """Routing of WebDriver requests by the local grid (no driver processes started)"""
+    
+    @pytest.fixture
+    def grid(self):
+        grid = LocalGrid(port=0, max_sessions=2)
+        yield grid
+        grid._server.server_close()
+    
+    @staticmethod
+    def value(response):
+        return json.loads(response)["value"]
+    
+    @pytest.mark.parametrize("path", ["/status", "/wd/hub/status", "/status/"])
+    def test_status(self, grid, path):
+        """Positive Test: /status reports free slots, with or without the Selenium 3 prefix"""
+        grid._sessions["s1"] = {"url": "http://127.0.0.1:1"}
+        status, response = grid.dispatch("GET", path, None)
+        
+        assert status == 200
+        assert self.value(response) == {"ready": True, "message": "Local grid: 1/2 sessions"}
+    
+    def test_status_when_full(self, grid):
+        """Negative Test: a grid with every slot taken is not ready"""
+        grid._sessions.update({"s1": {}, "s2": {}})
+        
+        assert self.value(grid.dispatch("GET", "/status", None)[1])["ready"] is False
+    
+    def test_command_is_forwarded_to_its_session(self, grid, monkeypatch):
+        """Positive Test: a session command goes to that session's driver, without the /wd/hub prefix"""
+        forwarded = []
+        monkeypatch.setattr(local_grid, "_forward",
+                            lambda url, method, path, body: forwarded.append((url, method, path, body)) or (200, b"{}"))
+        grid._sessions["s1"] = {"url": "http://127.0.0.1:9515"}
+        
+        assert grid.dispatch("POST", "/wd/hub/session/s1/url", b'{"url": "about:blank"}') == (200, b"{}")
+        assert forwarded == [("http://127.0.0.1:9515", "POST", "/session/s1/url", b'{"url": "about:blank"}')]
+    
+    def test_delete_session_stops_its_driver(self, grid, monkeypatch):
+        """Positive Test: DELETE /session/<id> is forwarded, then the driver is stopped and forgotten"""
+        stopped = []
+        monkeypatch.setattr(local_grid, "_forward", lambda *args: (200, b'{"value": null}'))
+        monkeypatch.setattr(grid, "_stop_driver", stopped.append)
+        session = {"url": "http://127.0.0.1:9515"}
+        grid._sessions["s1"] = session
+        
+        assert grid.dispatch("DELETE", "/session/s1", None)[0] == 200
+        assert stopped == [session] and grid._sessions == {}
+    
+    @pytest.mark.parametrize("method, path", [("GET", "/session/gone/url"), ("DELETE", "/session/gone")])
+    def test_unknown_session(self, grid, method, path):
+        """Negative Test: commands for a session the grid does not know are 404 invalid session id"""
+        status, response = grid.dispatch(method, path, None)
+        
+        assert status == 404
+        assert self.value(response)["error"] == "invalid session id"
+    
+    def test_unknown_command(self, grid):
+        """Negative Test: anything else is 404 unknown command"""
+        status, response = grid.dispatch("GET", "/sessions", None)
+        
+        assert status == 404
+        assert self.value(response)["error"] == "unknown command"
+    
+    def test_unsupported_browser_is_rejected(self, grid):
+        """Negative Test: a new session for a browser the grid cannot start is refused before taking a slot"""
+        body = json.dumps({"capabilities": {"alwaysMatch": {"browserName": "safari"}}}).encode()
+        status, response = grid.dispatch("POST", "/session", body)
+        
+        assert status == 400
+        assert self.value(response)["error"] == "invalid argument"
+        assert grid._slots.acquire(blocking=False) and grid._slots.acquire(blocking=False)
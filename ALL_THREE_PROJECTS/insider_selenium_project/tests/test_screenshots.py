@@ -0,0 +1,135 @@
+import io
+import pytest
+import sys
+import os
+import threading
+
+from PIL import Image
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from resources.screenshots import ScreenshotService
+
+
+def frame(color):
+    """Browser-like PNG capture of a solid color"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class StubDriver:
+    def __init__(self, png):
+        self.png = png
+    
+    def get_screenshot_as_png(self):
+        return self.png
+
+
+class TestScreenshotService:
+    """Background writing, flushing and identical-frame deduplication"""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        service = ScreenshotService(directory=str(tmp_path / "screenshots"), queue_size=2)
+        yield service
+        service.close()
+    
+    def test_queued_captures_are_written_on_flush(self, service):
+        """Positive Test: every capture is on disk once flush() returns"""
+        paths = [service.capture(StubDriver(frame((index * 40, 0, 0))), f"step{index}") for index in range(5)]
+        service.flush()
+        
+        assert all(os.path.isfile(path) for path in paths)
+        assert len(set(paths)) == 5
+        assert service.stats()["written"] == 5 and service.errors == []
+    
+    def test_full_queue_blocks_capture(self, service, monkeypatch):
+        """Positive Test: with the worker busy and the queue full, capture waits instead of buffering"""
+        release = threading.Event()
+        monkeypatch.setattr(service, "_write", lambda *job: release.wait(5))
+        frames = [frame((0, index * 40, 0)) for index in range(4)]
+        # One frame on the worker, two in the queue (queue_size=2), the fourth waits
+        capturing = threading.Thread(target=lambda: [service.capture(StubDriver(png), "step") for png in frames])
+        capturing.start()
+        capturing.join(0.3)
+        
+        assert capturing.is_alive()
+        release.set()
+        capturing.join(5)
+        service.flush()
+        assert not capturing.is_alive() and service.stats()["captured"] == 4
+    
+    @pytest.mark.parametrize("image_format, extension, pil_format", [
+        ("png", ".png", "PNG"), ("jpeg", ".jpg", "JPEG"), ("webp", ".webp", "WEBP"),
+    ])
+    def test_frames_are_encoded_in_the_configured_format(self, service, image_format, extension, pil_format):
+        """Positive Test: the worker re-encodes the PNG capture"""
+        service.configure(image_format=image_format, quality=50)
+        path = service.capture(StubDriver(frame("blue")), "home")
+        service.flush()
+        
+        assert path.endswith(extension)
+        with Image.open(path) as image:
+            assert image.format == pil_format and image.size == (64, 48)
+    
+    def test_unsupported_format(self, service):
+        """Negative Test: an unknown format is rejected when configured"""
+        with pytest.raises(ValueError, match="not supported"):
+            service.configure(image_format="bmp")
+    
+    def test_identical_frame_returns_written_file(self, service):
+        """Positive Test: a frame already on disk is not written again; the alias is recorded"""
+        driver = StubDriver(frame("green"))
+        first = service.capture(driver, "timeout_1")
+        service.flush()
+        second = service.capture(driver, "timeout_2")
+        service.flush()
+        
+        assert second == first
+        assert service.aliases == [("timeout_2", first)]
+        assert service.stats()["duplicates"] == 1 and service.stats()["written"] == 1
+        assert os.listdir(os.path.dirname(first)) == [os.path.basename(first)]
+    
+    def test_settings_change_is_not_a_duplicate(self, service):
+        """Positive Test: the same frame in another format is a new file"""
+        driver = StubDriver(frame("green"))
+        first = service.capture(driver, "home")
+        service.flush()
+        service.configure(image_format="jpeg")
+        
+        assert service.capture(driver, "home") != first
+    
+    def test_failed_write_is_never_a_dedup_target(self, service, tmp_path):
+        """Negative Test: an identical frame whose earlier write failed is written again under its own name"""
+        blocker = tmp_path / "blocked"
+        blocker.write_text("a file where the screenshot directory should be")
+        service.configure(directory=str(blocker / "screenshots"))
+        driver = StubDriver(frame("red"))
+        
+        failed = service.capture(driver, "FAILED_test_a")
+        service.flush()
+        retried = service.capture(driver, "FAILED_test_b")
+        service.flush()
+        assert retried != failed
+        assert len(service.errors) == 2 and service.aliases == []
+        
+        blocker.unlink()
+        written = service.capture(driver, "FAILED_test_c")
+        service.flush()
+        assert os.path.isfile(written)
+        assert service.capture(driver, "FAILED_test_d") == written
+    
+    def test_close_stops_the_worker_and_capture_restarts_it(self, service):
+        """Positive Test: close() flushes; a later capture starts a new worker"""
+        first = service.capture(StubDriver(frame("white")), "before")
+        service.close()
+        assert os.path.isfile(first)
+        assert not service._worker.is_alive()
+        
+        second = service.capture(StubDriver(frame("black")), "after")
+        service.flush()
+        assert os.path.isfile(second)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PetStoreAPIClient throughput and latency per swagger operation
+Usage:
+    python benchmarks/bench_client_throughput.py                          # print results
+    python benchmarks/bench_client_throughput.py --output results.json    # machine-readable
+    python benchmarks/bench_client_throughput.py --save-baseline          # store a baseline
+    python benchmarks/bench_client_throughput.py --baseline               # compare, exit 1 on regression
+
+Every swagger /pet operation (addPet, getPetById, updatePet, ...) plus the
+bulk paths (large findByStatus decode, streaming, concurrent cleanup) is run
+at several concurrency levels against utils/petstore_stub.py. The stand-in
+runs in a separate process so it does not compete with the client for the
+GIL; with zero server latency the numbers are dominated by client-side cost
+(serialization, session and connection handling).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from utils.api_client import PetStoreAPIClient
+from utils.latency import percentile
+from utils.resource_tracker import PetResourceTracker
+from utils.test_data import BulkPetGenerator, TestDataGenerator
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(PROJECT_DIR, "benchmarks", "results", "client_throughput_baseline.json")
+
+# Pets seeded for reads, updates and deletes; BULK_PETS are "sold" for the list benchmarks
+SEEDED_ID_START = 5_000_000
+BULK_PETS = 2000
+
+
+# ==================== STAND-IN SERVER ====================
+
+class StubProcess:
+    """utils/petstore_stub.py in a child process"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", "-m", "utils.petstore_stub", "--port", "0",
+             "--latency-ms", str(latency_ms)],
+            cwd=PROJECT_DIR, stdout=subprocess.PIPE, text=True
+        )
+        # First line: "Petstore stand-in listening on http://127.0.0.1:PORT/v2"
+        self.base_url = self.process.stdout.readline().strip().rsplit(" ", 1)[-1]
+        if not self.base_url.startswith("http"):
+            self.stop()
+            raise RuntimeError("Petstore stand-in did not start")
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+# ==================== OPERATIONS ====================
+
+class Workload:
+    """Per-run state shared by the operations: seeded pets and a unique ID source"""
+
+    def __init__(self, base_url: str, iterations: int):
+        self.base_url = base_url
+        self._ids = itertools.count(SEEDED_ID_START + 10 * iterations + BULK_PETS)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.seeded = [TestDataGenerator.generate_valid_pet(SEEDED_ID_START + i) for i in range(iterations)]
+        # Changes to the seeded dataset made by the current round, undone by reset()
+        self._created: List[int] = []
+        self._modified: Set[int] = set()
+
+    def client(self) -> PetStoreAPIClient:
+        """One client (and session) per worker thread, as in the load tests"""
+        if not hasattr(self._local, "client"):
+            self._local.client = PetStoreAPIClient(base_url=self.base_url, record_latency=False,
+                                                   capture_exchanges=False)
+        return self._local.client
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def created(self, pet_id: int):
+        with self._lock:
+            self._created.append(pet_id)
+
+    def modified(self, index: int):
+        with self._lock:
+            self._modified.add(index)
+
+    def reset(self):
+        """
+        Undo the previous round: delete the pets it added and restore the seeded pets it changed
+
+        Without this, every addPet round adds "available" pets and findPetsByStatus
+        payloads grow with iterations x levels x repeat.
+        """
+        with self._lock:
+            created, self._created = self._created, []
+            modified, self._modified = self._modified, set()
+        client = PetStoreAPIClient(base_url=self.base_url, record_latency=False, capture_exchanges=False)
+        for pet_id in created:
+            _check(client.delete_pet(pet_id), 200, 404)
+        for index in sorted(modified):
+            _check(client.update_pet(self.seeded[index]), 200)
+
+    def seed(self):
+        client = PetStoreAPIClient(base_url=self.base_url, record_latency=False, capture_exchanges=False)
+        for pet in self.seeded:
+            client.create_pet(pet)
+        for batch in BulkPetGenerator(seed=7, status_mix={"sold": 1.0},
+                                      id_start=SEEDED_ID_START + len(self.seeded)).iter_batches(BULK_PETS):
+            for pet in batch.to_dicts():
+                client.create_pet(pet)
+
+
+def _check(response: requests.Response, *expected: int) -> requests.Response:
+    if response.status_code not in expected:
+        raise RuntimeError(f"Unexpected HTTP {response.status_code} for {response.request.method} "
+                           f"{response.request.url}")
+    return response
+
+
+def op_add_pet(w: Workload, i: int):
+    pet_id = w.next_id()
+    w.created(pet_id)
+    _check(w.client().create_pet(TestDataGenerator.generate_valid_pet(pet_id)), 200)
+
+
+def _seeded(w: Workload, i: int, modify: bool = False) -> Dict[str, Any]:
+    # More operations than seeded pets when concurrency exceeds iterations
+    index = i % len(w.seeded)
+    if modify:
+        w.modified(index)
+    return w.seeded[index]
+
+
+def op_get_pet_by_id(w: Workload, i: int):
+    _check(w.client().get_pet(_seeded(w, i)["id"]), 200)
+
+
+def op_update_pet(w: Workload, i: int):
+    pet = dict(_seeded(w, i, modify=True), name=f"Bench{i}")
+    _check(w.client().update_pet(pet), 200)
+
+
+def op_update_pet_with_form(w: Workload, i: int):
+    _check(w.client().update_pet_with_form(_seeded(w, i, modify=True)["id"], status="pending"), 200)
+
+
+def op_find_pets_by_status(w: Workload, i: int):
+    _check(w.client().find_pets_by_status("available"), 200)
+
+
+def op_delete_pet(w: Workload, i: int):
+    client = w.client()
+    pet_id = w.next_id()
+    _check(client.create_pet(TestDataGenerator.generate_valid_pet(pet_id)), 200)
+    _check(client.delete_pet(pet_id), 200)
+
+
+def op_find_large_list(w: Workload, i: int):
+    client = w.client()
+    pets = client.decode(_check(client.find_pets_by_status("sold"), 200), list)
+    assert len(pets) >= BULK_PETS
+
+
+def op_stream_large_list(w: Workload, i: int):
+    assert sum(1 for _ in w.client().iter_pets_by_status("sold")) >= BULK_PETS
+
+
+# Swagger operationId (or client path) -> one benchmarked call
+OPERATIONS: Dict[str, Callable[[Workload, int], None]] = {
+    "addPet": op_add_pet,
+    "getPetById": op_get_pet_by_id,
+    "updatePet": op_update_pet,
+    "updatePetWithForm": op_update_pet_with_form,
+    "findPetsByStatus": op_find_pets_by_status,
+    "addPet+deletePet": op_delete_pet,
+    f"findPetsByStatus[{BULK_PETS} pets]": op_find_large_list,
+    f"iterPetsByStatus[{BULK_PETS} pets]": op_stream_large_list,
+}
+
+# The large-list operations move ~BULK_PETS x 200 bytes each; run fewer of them
+HEAVY_DIVISOR = 20
+
+
+# ==================== MEASUREMENT ====================
+
+def best_of(repeat: int, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Highest-throughput round; the other rounds mostly measure machine noise"""
+    return max((run() for _ in range(repeat)), key=lambda result: result["ops_per_s"])
+
+
+def measure(func: Callable[[Workload, int], None], workload: Workload,
+            iterations: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    # Every round sees the seeded dataset, whatever the previous rounds did
+    workload.reset()
+
+    def run(i: int):
+        started = time.perf_counter()
+        try:
+            func(workload, i)
+        except Exception as e:  # Recorded, never aborts the run
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    # Warm up connections of every worker thread
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda i: workload.client().session.get(f"{workload.base_url}/pet/0"),
+                          range(concurrency * 2)))
+        started = time.perf_counter()
+        list(executor.map(run, range(iterations)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "operations": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "ops_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) if latencies else None,
+        "p95_ms": percentile(latencies, 95) if latencies else None,
+        "p99_ms": percentile(latencies, 99) if latencies else None,
+    }
+
+
+def measure_cleanup(base_url: str, pets: int, concurrency: int) -> Dict[str, Any]:
+    """Bulk path: PetResourceTracker.cleanup deleting `pets` pets with `concurrency` workers"""
+    client = PetStoreAPIClient(base_url=base_url, record_latency=False, capture_exchanges=False)
+    tracker = PetResourceTracker()
+    for i in range(pets):
+        pet_id = SEEDED_ID_START * 2 + concurrency * pets + i
+        client.create_pet(TestDataGenerator.generate_minimal_pet(pet_id))
+        tracker.register(pet_id)
+    # One client per worker thread
+    local = threading.local()
+
+    def delete(pet_id):
+        if not hasattr(local, "client"):
+            local.client = PetStoreAPIClient(base_url=base_url, record_latency=False, capture_exchanges=False)
+        return local.client.delete_pet(pet_id)
+
+    report = tracker.cleanup(delete, max_workers=concurrency)
+    wall = report["wall_time_s"]
+    return {
+        "concurrency": concurrency,
+        "operations": report["deleted"],
+        "errors": len(report["failed"]) + report["already_gone"],
+        "first_error": str(report["failed"][0]) if report["failed"] else None,
+        "ops_per_s": report["deleted"] / wall if wall else 0.0,
+        "p50_ms": None,
+        "p95_ms": None,
+        "p99_ms": None,
+    }
+
+
+def suite_meta(iterations: int, levels: List[int], latency_ms: float, repeat: int) -> Dict[str, Any]:
+    """Run settings and environment, stored with the results"""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "requests": requests.__version__,
+        "codec": PetStoreAPIClient(record_latency=False, capture_exchanges=False).codec.name,
+        "iterations": iterations,
+        "repeat": repeat,
+        "concurrency_levels": levels,
+        "server_latency_ms": latency_ms,
+    }
+
+
+def run_suite(iterations: int, levels: List[int], latency_ms: float, repeat: int) -> Dict[str, Any]:
+    # Same generated pets (and so the same payload sizes) on every run
+    random.seed(0)
+    stub = StubProcess(latency_ms)
+    try:
+        workload = Workload(stub.base_url, iterations)
+        workload.seed()
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, func in OPERATIONS.items():
+            count = iterations // HEAVY_DIVISOR if "[" in name else iterations
+            for concurrency in levels:
+                key = f"{name}@c{concurrency}"
+                results[key] = best_of(repeat, lambda: measure(func, workload, max(count, concurrency),
+                                                               concurrency))
+                _print_result(key, results[key])
+        for concurrency in levels:
+            key = f"cleanup[{iterations} pets]@c{concurrency}"
+            results[key] = best_of(repeat, lambda: measure_cleanup(stub.base_url, iterations, concurrency))
+            _print_result(key, results[key])
+    finally:
+        stub.stop()
+
+    return {
+        "meta": suite_meta(iterations, levels, latency_ms, repeat),
+        "results": results,
+    }
+
+
+# ==================== REPORTING ====================
+
+def _fmt(value, suffix="ms"):
+    return f"{value:>8.2f}{suffix}" if value is not None else f"{'-':>{8 + len(suffix)}}"
+
+
+def _print_result(key: str, result: Dict[str, Any]):
+    line = (f"{key:<42} {result['ops_per_s']:>10,.0f} ops/s  p50 {_fmt(result['p50_ms'])}  "
+            f"p95 {_fmt(result['p95_ms'])}  p99 {_fmt(result['p99_ms'])}")
+    if result["errors"]:
+        line += f"  errors={result['errors']} ({result['first_error']})"
+    print(line)
+
+
+# Settings that change what is measured; results are only comparable when they match
+COMPARABLE_META = ("iterations", "repeat", "concurrency_levels", "codec", "server_latency_ms")
+
+
+def meta_mismatches(meta: Dict[str, Any], baseline_meta: Dict[str, Any]) -> List[str]:
+    """Comparable settings that differ between a run and a baseline"""
+    return [f"{name}: {meta.get(name)!r} (baseline {baseline_meta.get(name)!r})"
+            for name in COMPARABLE_META if meta.get(name) != baseline_meta.get(name)]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions against a baseline
+
+    Args:
+        results: Current suite output
+        baseline: Earlier suite output
+        tolerance: Allowed relative slowdown, e.g. 0.2 = 20% fewer ops/s or 20% higher p95
+
+    Returns:
+        One message per regressed operation
+
+    Raises:
+        ValueError: The baseline was run with other settings (see COMPARABLE_META)
+    """
+    mismatches = meta_mismatches(results["meta"], baseline.get("meta", {}))
+    if mismatches:
+        raise ValueError("Baseline was run with other settings: " + "; ".join(mismatches))
+    regressions = []
+    for key, current in results["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{key}: {current['errors']} errors (baseline {previous['errors']})")
+        if previous["ops_per_s"] and current["ops_per_s"] < previous["ops_per_s"] * (1 - tolerance):
+            regressions.append(f"{key}: {current['ops_per_s']:,.0f} ops/s vs baseline "
+                               f"{previous['ops_per_s']:,.0f} ops/s")
+        if previous["p95_ms"] and current["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {current['p95_ms']:.2f}ms vs baseline {previous['p95_ms']:.2f}ms")
+    return regressions
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PetStoreAPIClient throughput benchmark")
+    parser.add_argument("--iterations", type=int, default=500, help="Operations per measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds per measurement, best one is kept")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial server latency")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help="Compare with a stored baseline (default: %(const)s)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help="Store the results as the new baseline (default: %(const)s)")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative regression before failing (default 0.2)")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; nothing to compare against "
+              f"(store one with --save-baseline)")
+        args.baseline = None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Fail before the run rather than after it
+        mismatches = meta_mismatches(suite_meta(args.iterations, levels, args.latency_ms, args.repeat),
+                                     baseline.get("meta", {}))
+        if mismatches:
+            print(f"Baseline {args.baseline} was run with other settings:")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            sys.exit(2)
+
+    print("=" * 100)
+    print(f"PetStoreAPIClient throughput - {args.iterations} operations x best of {args.repeat}, "
+          f"concurrency {levels}")
+    print("=" * 100)
+    results = run_suite(args.iterations, levels, args.latency_ms, args.repeat)
+
+    if args.output:
+        _write_json(args.output, results)
+    if args.save_baseline:
+        _write_json(args.save_baseline, results)
+        print(f"Baseline saved to {args.save_baseline}")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        print("-" * 100)
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: installed JSON codecs on realistic pet payloads
+Usage:
+    python benchmarks/bench_json_codec.py            # 10,000 pets
+    python benchmarks/bench_json_codec.py 50000      # custom list size
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_codec import CODECS
+from utils.test_data import BulkPetGenerator, TestDataGenerator
+
+
+def build_pets(count):
+    """findByStatus-like list plus the single pets the CRUD tests send"""
+    pets = []
+    for batch in BulkPetGenerator(seed=1, chunk_size=10000).iter_batches(count):
+        pets.extend(batch.to_dicts())
+    singles = [TestDataGenerator.generate_valid_pet(1000 + i) for i in range(1000)]
+    return pets, singles
+
+
+def bench(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    pets, singles = build_pets(count)
+    codecs = {name: codec_class() for name, codec_class in CODECS.items() if codec_class is not None}
+    body = codecs["json"].encode(pets)
+    single_bodies = [codecs["json"].encode(pet) for pet in singles]
+
+    print("=" * 90)
+    print(f"JSON codec benchmark - {len(singles):,} single pets, findByStatus list of {count:,} "
+          f"pets ({len(body) / 1024:,.0f} KiB)")
+    print("=" * 90)
+    print(f"{'Codec':<10} {'encode pet':>14} {'decode pet':>14} {'encode list':>14} "
+          f"{'decode list':>14} {'typed decode':>14}")
+
+    results = {}
+    for name, codec in codecs.items():
+        timings = [
+            bench(lambda: [codec.encode(pet) for pet in singles]) / len(singles) * 1e6,
+            bench(lambda: [codec.decode(b) for b in single_bodies]) / len(singles) * 1e6,
+            bench(lambda: codec.encode(pets)) * 1000,
+            bench(lambda: codec.decode(body)) * 1000,
+            bench(lambda: codec.decode(body, List[Dict[str, Any]])) * 1000,
+        ]
+        results[name] = timings
+        print(f"{name:<10} {timings[0]:>11.2f} us {timings[1]:>11.2f} us {timings[2]:>11.1f} ms "
+              f"{timings[3]:>11.1f} ms {timings[4]:>11.1f} ms")
+
+    print("-" * 90)
+    baseline = results["json"]
+    for name, timings in results.items():
+        if name == "json":
+            continue
+        speedups = ", ".join(f"{b / t:.1f}x" for b, t in zip(baseline, timings))
+        print(f"{name} vs json: {speedups}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from locust import HttpUser, task, between, events
+import itertools
+import logging
+import os
+import random
+import sys
+
+# Make utils importable when locust is started from another directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.api_client import PetStoreAPIClient
+from utils.test_data import TestDataGenerator
+
+
+# Pet IDs are unique per process: a random 64-bit-safe base plus a counter,
+# so workers in distributed mode never touch each other's pets
+_ID_BASE = random.SystemRandom().randrange(10**12, 10**15, 10**6)
+_ID_COUNTER = itertools.count()
+
+
+def next_pet_id() -> int:
+    return _ID_BASE + next(_ID_COUNTER)
+
+
+class PetstoreCRUDUser(HttpUser):
+    """
+    Load test user driving the Petstore pet lifecycle through PetStoreAPIClient
+
+    Mirrors test_complete_crud_flow (create -> read -> update -> delete) plus
+    findByStatus reads. Every user only reads, updates and deletes the pets
+    it created itself, so concurrent users never interfere.
+    """
+
+    wait_time = between(1, 3)
+
+    # Override with --host, e.g. --host http://127.0.0.1:8080 for utils/petstore_stub.py
+    host = "https://petstore.swagger.io"
+    base_path = os.environ.get("PETSTORE_BASE_PATH", "/v2")
+
+    # Upper bound on live pets per user, older ones are deleted first
+    max_owned_pets = 5
+
+    def on_start(self):
+        """Wrap the Locust session in the same client the functional suite uses"""
+        self.api = PetStoreAPIClient(
+            session=self.client,
+            base_url=f"{self.host.rstrip('/')}{self.base_path}",
+            # Locust collects its own statistics
+            record_latency=False,
+            capture_exchanges=False
+        )
+        self.owned_pets = {}
+
+    def on_stop(self):
+        """Delete every pet this user still owns"""
+        for pet_id in list(self.owned_pets):
+            self._delete(pet_id)
+
+    # ==================== STEPS ====================
+
+    def _create(self):
+        pet_data = TestDataGenerator.generate_valid_pet(next_pet_id())
+        with self.client.rename_request("POST /pet [create]"):
+            response = self.api.create_pet(pet_data)
+        if response.status_code == 200:
+            self.owned_pets[pet_data['id']] = pet_data
+            return pet_data
+        return None
+
+    def _delete(self, pet_id):
+        with self.client.rename_request("DELETE /pet/{petId}"):
+            self.api.delete_pet(pet_id)
+        self.owned_pets.pop(pet_id, None)
+
+    def _owned_pet(self):
+        if not self.owned_pets:
+            return self._create()
+        return self.owned_pets[random.choice(list(self.owned_pets))]
+
+    # ==================== TASKS ====================
+
+    @task(3)
+    def create_pet(self):
+        """Create a pet, retiring the oldest one when the user owns too many"""
+        if len(self.owned_pets) >= self.max_owned_pets:
+            self._delete(next(iter(self.owned_pets)))
+        self._create()
+
+    @task(5)
+    def get_own_pet(self):
+        """Read back one of this user's pets"""
+        pet_data = self._owned_pet()
+        if pet_data is None:
+            return
+        with self.client.rename_request("GET /pet/{petId}"):
+            self.api.get_pet(pet_data['id'])
+
+    @task(2)
+    def update_own_pet(self):
+        """Rename one of this user's pets and change its status"""
+        pet_data = self._owned_pet()
+        if pet_data is None:
+            return
+        pet_data['name'] = f"LoadTestPet{pet_data['id']}"
+        pet_data['status'] = random.choice(["available", "pending", "sold"])
+        with self.client.rename_request("PUT /pet [update]"):
+            self.api.update_pet(pet_data)
+
+    @task(1)
+    def update_own_pet_with_form(self):
+        """Update one of this user's pets through the form endpoint"""
+        pet_data = self._owned_pet()
+        if pet_data is None:
+            return
+        pet_data['status'] = "pending"
+        with self.client.rename_request("POST /pet/{petId} [form]"):
+            self.api.update_pet_with_form(pet_data['id'], status="pending")
+
+    @task(4)
+    def find_pets_by_status(self):
+        """Find pets by a random status"""
+        status = random.choice(["available", "pending", "sold"])
+        with self.client.rename_request(f"GET /pet/findByStatus?status={status}"):
+            self.api.find_pets_by_status(status)
+
+    @task(1)
+    def complete_crud_flow(self):
+        """Same lifecycle as test_complete_crud_flow, with one request name per step"""
+        pet_id = next_pet_id()
+        pet_data = TestDataGenerator.generate_valid_pet(pet_id)
+
+        with self.client.rename_request("CRUD flow 1. create"):
+            if self.api.create_pet(pet_data).status_code != 200:
+                return
+        with self.client.rename_request("CRUD flow 2. read"):
+            self.api.get_pet(pet_id)
+
+        pet_data['name'] = "UpdatedInCRUDFlow"
+        pet_data['status'] = "sold"
+        with self.client.rename_request("CRUD flow 3. update"):
+            self.api.update_pet(pet_data)
+        with self.client.rename_request("CRUD flow 4. delete"):
+            self.api.delete_pet(pet_id)
+
+        # A 404 is the expected outcome here, so judge the response ourselves
+        with self.client.get(
+            f"{self.api.BASE_URL}/pet/{pet_id}",
+            catch_response=True,
+            name="CRUD flow 5. verify deletion"
+        ) as response:
+            if response.status_code == 404:
+                response.success()
+            else:
+                response.failure(f"Pet still exists after delete: {response.status_code}")
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    """
+    Called when test starts
+    """
+    logging.info("="*50)
+    logging.info("Petstore CRUD Load Test Started")
+    logging.info("="*50)
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    """
+    Called when test stops
+    """
+    logging.info("="*50)
+    logging.info("Petstore CRUD Load Test Completed")
+    logging.info("="*50)
+
+
+# Configuration for running standalone
+if __name__ == "__main__":
+    os.system("locust -f locustfile.py --host=https://petstore.swagger.io")
@@ -1,4 +1,15 @@
 import pytest
+import sys
+import os
+
+# Add parent directory to path so the utils plugins can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.api_client import PetStoreAPIClient
+from utils.resource_tracker import PetResourceTracker
+
+pytest_plugins = ["utils.latency_plugin", "utils.exchange_plugin", "utils.cassette_plugin",
+                  "utils.concurrency_plugin", "utils.rate_limit_plugin", "pytester"]
 
 
 def pytest_configure(config):
@@ -12,3 +23,30 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "crud: mark test as CRUD operation test"
     )
+
+
+@pytest.fixture(scope="session")
+def pet_tracker(request):
+    """Track pets created during the session and delete them concurrently at teardown"""
+    tracker = PetResourceTracker()
+    yield tracker
+    
+    # Runs after every test, including failed ones; not test traffic, so kept out of the latency report
+    cleanup_client = PetStoreAPIClient(record_latency=False)
+    request.config._pet_cleanup_report = tracker.cleanup(cleanup_client.delete_pet)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report the deferred pet cleanup"""
+    report = getattr(config, "_pet_cleanup_report", None)
+    if not report or not report["tracked"]:
+        return
+    terminalreporter.section("Pet cleanup")
+    terminalreporter.write_line(
+        f"Deleted {report['deleted']} pets ({report['already_gone']} already gone, "
+        f"{len(report['failed'])} failed) in {report['wall_time_s'] * 1000:.0f}ms wall time "
+        f"with {report['workers']} workers; summed per-request time "
+        f"{report['request_time_s'] * 1000:.0f}ms"
+    )
+    for pet_id, reason in report["failed"]:
+        terminalreporter.write_line(f"Could not delete pet {pet_id}: {reason}", red=True)
@@ -0,0 +1,836 @@
+import pytest
+import sys
+import os
+import json
+import subprocess
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import jsonschema
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import consistency, json_codec, rate_limiter
+from utils.api_client import PetStoreAPIClient, _iter_json_array
+from utils.cassette import CassetteAdapter
+from utils.consistency import CONSISTENCY, ConsistencyRecorder, ConsistencyTimeoutError, poll_until
+from utils.exchange_log import ExchangeLog
+from utils.hedging import HedgingPolicy
+from utils.json_codec import CODECS, get_codec
+from utils.rate_limiter import RateGovernor
+from utils.petstore_stub import PetstoreStubServer
+from utils.response_cache import ResponseCache
+from utils.schema_validator import INT64_MAX, INT64_MIN, PET_VALIDATOR, SWAGGER_DEFINITIONS
+from utils.test_data import BulkPetGenerator, TestDataGenerator
+
+
+def make_response(status_code: int = 200, body: bytes = b"{}", headers: dict = None) -> requests.Response:
+    """Response as returned by requests, without a server"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.request = requests.Request("GET", "http://petstore.local/v2/pet/1").prepare()
+    return response
+
+
+class StubSession(requests.Session):
+    """Session answering with queued responses instead of sending requests"""
+    
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.sent_headers = []
+        self.on_request = None
+    
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        if self.on_request is not None:
+            self.on_request()
+        return self.responses.pop(0)
+
+
+def split(text: str, size: int):
+    """Body bytes in chunks of `size`, as response.iter_content yields them"""
+    data = text.encode()
+    return iter([data[i:i + size] for i in range(0, len(data), size)])
+
+
+class TestBulkPetGenerator:
+    """Reproducibility and ID ranges of the seeded bulk generator"""
+    
+    MIX = {"available": 0.5, "pending": 0.3, "sold": 0.2}
+    
+    def test_same_seed_gives_identical_pets(self):
+        """Positive Test: two generators with the same seed and config produce the same bodies"""
+        first = BulkPetGenerator(seed=42, status_mix=self.MIX, chunk_size=50)
+        second = BulkPetGenerator(seed=42, status_mix=self.MIX, chunk_size=50)
+        
+        assert list(first.iter_json_bodies(180)) == list(second.iter_json_bodies(180))
+    
+    def test_other_seed_gives_other_pets(self):
+        """Positive Test: the seed changes the drawn columns, not the IDs"""
+        first = BulkPetGenerator(seed=1, status_mix=self.MIX, chunk_size=50).generate_batch(50)
+        second = BulkPetGenerator(seed=2, status_mix=self.MIX, chunk_size=50).generate_batch(50)
+        
+        assert first.ids.tolist() == second.ids.tolist()
+        assert first.to_dicts() != second.to_dicts()
+    
+    def test_chunk_does_not_depend_on_iteration_order(self):
+        """Positive Test: a chunk generated alone, out of order, equals the one from iter_batches"""
+        generator = BulkPetGenerator(seed=7, status_mix=self.MIX, chunk_size=50)
+        iterated = [batch.to_dicts() for batch in generator.iter_batches(200)]
+        
+        for chunk_index in (3, 0, 2, 1):
+            assert generator.generate_batch(50, chunk_index).to_dicts() == iterated[chunk_index]
+        # Consuming more or fewer chunks does not change the earlier ones
+        assert [batch.to_dicts() for batch in generator.iter_batches(100)] == iterated[:2]
+    
+    def test_ids_are_unique_across_chunks(self):
+        """Positive Test: sequential ID ranges never overlap, including a short last chunk"""
+        generator = BulkPetGenerator(seed=0, chunk_size=64, id_start=5000)
+        ids = [pet_id for batch in generator.iter_batches(1000) for pet_id in batch.ids.tolist()]
+        
+        assert ids == list(range(5000, 6000))
+    
+    def test_json_bodies_match_json_dumps(self):
+        """Positive Test: the body template equals compact json.dumps of to_dicts()"""
+        batch = BulkPetGenerator(seed=3, status_mix=self.MIX, chunk_size=20).generate_batch(20)
+        
+        assert batch.to_json_bodies() == [json.dumps(pet, separators=(",", ":")).encode()
+                                          for pet in batch.to_dicts()]
+    
+    @pytest.mark.parametrize("count", [-1, 51])
+    def test_count_outside_chunk_is_rejected(self, count):
+        """Negative Test: a batch larger than chunk_size would reuse the next chunk's IDs"""
+        generator = BulkPetGenerator(chunk_size=50)
+        with pytest.raises(ValueError):
+            generator.generate_batch(count, 0)
+
+
+def valid_pet() -> dict:
+    return {"id": 1, "category": {"id": 1, "name": "Dogs"}, "name": "Rex",
+            "photoUrls": ["https://example.com/rex.jpg"], "tags": [{"id": 1, "name": "t"}],
+            "status": "available"}
+
+
+def jsonschema_errors(pet) -> set:
+    """(path, message) pairs jsonschema reports, int64 bounds spelled out as minimum/maximum"""
+    definitions = json.loads(json.dumps(SWAGGER_DEFINITIONS))
+    for definition in definitions.values():
+        for prop in definition["properties"].values():
+            if prop.get("format") == "int64":
+                prop.update(minimum=INT64_MIN, maximum=INT64_MAX)
+    validator = jsonschema.Draft4Validator({"$ref": "#/definitions/Pet", "definitions": definitions})
+    errors = set()
+    for error in validator.iter_errors(pet):
+        path = "$" + "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in error.absolute_path)
+        errors.add((path, error.message))
+    return errors
+
+
+class TestCompiledSchemaValidator:
+    """The generated Pet validator against hand-written cases and jsonschema"""
+    
+    INVALID_PETS = {
+        "missing name": lambda pet: pet.pop("name"),
+        "missing photoUrls and name": lambda pet: (pet.pop("name"), pet.pop("photoUrls")),
+        "pet not an object": None,
+        "id is a string": lambda pet: pet.update(id="1"),
+        "id is a bool": lambda pet: pet.update(id=True),
+        "id above int64": lambda pet: pet.update(id=INT64_MAX + 1),
+        "id below int64": lambda pet: pet.update(id=INT64_MIN - 1),
+        "category not an object": lambda pet: pet.update(category=["Dogs"]),
+        "category id is a string": lambda pet: pet["category"].update(id="x"),
+        "category name is a number": lambda pet: pet["category"].update(name=5),
+        "tags not an array": lambda pet: pet.update(tags={"id": 1}),
+        "tag not an object": lambda pet: pet["tags"].append("t"),
+        "second tag id out of range": lambda pet: pet["tags"].append({"id": INT64_MAX + 1}),
+        "photoUrl not a string": lambda pet: pet["photoUrls"].append(None),
+        "unknown status": lambda pet: pet.update(status="adopted"),
+        "status not a string": lambda pet: pet.update(status=1),
+        "several violations": lambda pet: (pet.pop("name"), pet.update(status="x"), pet["tags"][0].update(id="y")),
+    }
+    
+    @staticmethod
+    def make_invalid(case):
+        change = TestCompiledSchemaValidator.INVALID_PETS[case]
+        if change is None:
+            return ["not", "a", "pet"]
+        pet = valid_pet()
+        change(pet)
+        return pet
+    
+    def test_valid_pet(self):
+        """Positive Test: a complete pet and one with only required fields are valid"""
+        assert PET_VALIDATOR.is_valid(valid_pet())
+        assert PET_VALIDATOR.validate({"name": "Rex", "photoUrls": []}) == []
+        assert PET_VALIDATOR.is_valid(dict(valid_pet(), id=INT64_MAX, tags=[]))
+    
+    @pytest.mark.parametrize("case", sorted(INVALID_PETS))
+    def test_invalid_pet_is_rejected(self, case):
+        """Negative Test: the fast predicate and the error collector agree"""
+        pet = self.make_invalid(case)
+        
+        assert not PET_VALIDATOR.is_valid(pet)
+        assert PET_VALIDATOR.validate(pet, index=3)
+        assert all(violation.index == 3 for violation in PET_VALIDATOR.validate(pet, index=3))
+    
+    @pytest.mark.parametrize("case", sorted(INVALID_PETS))
+    def test_violations_match_jsonschema(self, case):
+        """Negative Test: paths and messages are the ones jsonschema reports"""
+        pet = self.make_invalid(case)
+        violations = {(violation.path, violation.message) for violation in PET_VALIDATOR.validate(pet)}
+        
+        assert violations == jsonschema_errors(pet)
+    
+    def test_messages(self):
+        """Negative Test: required, nested type, enum and int64 messages"""
+        pet = valid_pet()
+        del pet["photoUrls"]
+        pet["category"]["id"] = "x"
+        pet["tags"].append({"id": INT64_MAX + 1})
+        pet["status"] = "adopted"
+        
+        assert sorted(PET_VALIDATOR.validate(pet)) == sorted([
+            (0, "$", "'photoUrls' is a required property"),
+            (0, "$.category.id", "'x' is not of type 'integer'"),
+            (0, "$.tags[1].id", f"{INT64_MAX + 1} is greater than the maximum of {INT64_MAX}"),
+            (0, "$.status", "'adopted' is not one of ['available', 'pending', 'sold']"),
+        ])
+    
+    def test_validate_many_reports_indexes(self):
+        """Negative Test: validate_many returns violations of the invalid items only, with their index"""
+        pets = [valid_pet() for _ in range(5)]
+        pets[1]["status"] = "x"
+        pets[4]["tags"][0]["id"] = "y"
+        
+        assert [(violation.index, violation.path) for violation in PET_VALIDATOR.validate_many(pets)] == [
+            (1, "$.status"), (4, "$.tags[0].id")
+        ]
+
+
+class TestStreamingJSONArray:
+    """
+    Offline tests of the findByStatus streaming parser (_iter_json_array)
+    Every body is fed in all chunk sizes, so tokens are split at every offset
+    """
+    
+    BODY = '[{"id": 123, "name": "Ünïcode dog", "tags": [{"id": 1}]}, 4567, "x,]", null, [1, 2]]  \n'
+    
+    @pytest.mark.parametrize("size", range(1, 24))
+    def test_split_chunks_match_json_loads(self, size):
+        """Positive Test: decoded elements are identical for every chunk size"""
+        assert list(_iter_json_array(split(self.BODY, size))) == [
+            {"id": 123, "name": "Ünïcode dog", "tags": [{"id": 1}]}, 4567, "x,]", None, [1, 2]
+        ]
+    
+    NUMBERS = '[1.5, -2e10, 0.25E-3, 3E+2, -0.0, 12345678901234567890,{"weight":7.75e1}]'
+    
+    @pytest.mark.parametrize("size", range(1, 24))
+    def test_split_numbers_match_json_loads(self, size):
+        """Positive Test: floats and exponents cut at every offset decode like json.loads"""
+        assert list(_iter_json_array(split(self.NUMBERS, size))) == json.loads(self.NUMBERS)
+    
+    @pytest.mark.parametrize("body", ["[1.]", "[1e]", "[-]", "[1.5e+]"])
+    @pytest.mark.parametrize("size", [1, 2, 64])
+    def test_incomplete_number_is_rejected(self, body, size):
+        """Negative Test: a number missing its fraction or exponent digits raises ValueError"""
+        with pytest.raises(ValueError):
+            list(_iter_json_array(split(body, size)))
+    
+    @pytest.mark.parametrize("size", [1, 2, 5])
+    def test_empty_array(self, size):
+        """Positive Test: an empty array yields nothing"""
+        assert list(_iter_json_array(split(" [ ] ", size))) == []
+    
+    @pytest.mark.parametrize("body", ["[1,]", "[1, ]", "[,1]", "[1,,2]"])
+    @pytest.mark.parametrize("size", [1, 3, 64])
+    def test_misplaced_comma_is_rejected(self, body, size):
+        """Negative Test: commas response.json() rejects raise ValueError"""
+        with pytest.raises(ValueError):
+            list(_iter_json_array(split(body, size)))
+    
+    @pytest.mark.parametrize("body", ["[1] 2", "[1]]", "[1]x", "[] {}"])
+    @pytest.mark.parametrize("size", [1, 3, 64])
+    def test_trailing_data_is_rejected(self, body, size):
+        """Negative Test: anything but whitespace after ']' raises ValueError"""
+        with pytest.raises(ValueError):
+            list(_iter_json_array(split(body, size)))
+    
+    @pytest.mark.parametrize("body", ["", "[1, 2", '{"id": 1}', "[12"])
+    def test_truncated_or_non_array_body_is_rejected(self, body):
+        """Negative Test: bodies that are not one complete array raise ValueError"""
+        with pytest.raises(ValueError):
+            list(_iter_json_array(split(body, 2)))
+
+
+# Every codec, skipped when its library is not installed
+INSTALLED_CODECS = [pytest.param(name, marks=pytest.mark.skipif(codec_class is None, reason=f"{name} not installed"))
+                    for name, codec_class in CODECS.items()]
+
+
+class TestJSONCodec:
+    """Round trips and typed decoding of every installed codec"""
+    
+    @pytest.mark.parametrize("name", INSTALLED_CODECS)
+    def test_round_trip(self, name):
+        """Positive Test: encode then decode returns the pet unchanged, non-ASCII text included"""
+        codec = get_codec(name)
+        pet = dict(TestDataGenerator.generate_valid_pet(), name="Pamuk 🐈 Çiçek")
+        encoded = codec.encode(pet)
+        
+        assert isinstance(encoded, bytes)
+        assert codec.decode(encoded) == pet
+        assert json.loads(encoded) == pet  # Plain JSON other codecs can read
+    
+    @pytest.mark.parametrize("name", INSTALLED_CODECS)
+    def test_decode_list_of_pets(self, name):
+        """Positive Test: a findByStatus body decodes as List[Dict[str, Any]]"""
+        pets = [TestDataGenerator.generate_valid_pet() for _ in range(3)]
+        
+        assert get_codec(name).decode(json.dumps(pets).encode(), List[Dict[str, Any]]) == pets
+    
+    @pytest.mark.parametrize("name", INSTALLED_CODECS)
+    @pytest.mark.parametrize("body, expected_type", [
+        (b'{"id": 1}', List[Dict[str, Any]]),
+        (b'[1, 2]', dict),
+        (b'{"id": ', None),
+    ])
+    def test_unexpected_body(self, name, body, expected_type):
+        """Negative Test: invalid JSON or the wrong outer type raises ValueError"""
+        with pytest.raises(ValueError):
+            get_codec(name).decode(body, expected_type)
+    
+    @pytest.mark.parametrize("name", INSTALLED_CODECS)
+    def test_integer_beyond_64_bits(self, name):
+        """Positive Test: ids out of int64 range (negative tests) still encode"""
+        assert json.loads(get_codec(name).encode({"id": 2 ** 70})) == {"id": 2 ** 70}
+    
+    def test_unknown_or_missing_codec(self, monkeypatch):
+        """Negative Test: get_codec() rejects unknown names and libraries that are not installed"""
+        with pytest.raises(ValueError, match="Unknown JSON codec 'yaml'"):
+            get_codec("yaml")
+        monkeypatch.setitem(CODECS, "orjson", None)
+        with pytest.raises(ValueError, match="not installed"):
+            get_codec("orjson")
+    
+    def test_invalid_env_codec_falls_back_with_warning(self, monkeypatch):
+        """Negative Test: a bad PETSTORE_JSON_CODEC warns and uses the fastest installed codec"""
+        monkeypatch.setenv("PETSTORE_JSON_CODEC", "yaml")
+        monkeypatch.setattr(json_codec, "_DEFAULT", None)
+        
+        with pytest.warns(RuntimeWarning, match="Unknown JSON codec 'yaml'"):
+            codec = PetStoreAPIClient(record_latency=False).codec
+        assert codec.name == next(name for name, codec_class in CODECS.items() if codec_class is not None)
+    
+    def test_invalid_env_codec_does_not_break_import(self):
+        """Negative Test: the client module imports although PETSTORE_JSON_CODEC is invalid"""
+        result = subprocess.run([sys.executable, "-c", "import utils.api_client"],
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                env=dict(os.environ, PETSTORE_JSON_CODEC="yaml"), capture_output=True, text=True)
+        
+        assert result.returncode == 0, result.stderr
+
+
+class TestResponseCache:
+    """Offline tests of ResponseCache keys, invalidation and in-flight reads"""
+    
+    def test_fresh_hit(self):
+        """Positive Test: a stored 200 is served until its TTL expires"""
+        cache = ResponseCache()
+        response = make_response(body=b'{"id": 1}')
+        cache.store("get_pet", 1, response, cache.generation())
+        
+        assert cache.lookup("get_pet", 1) == (response, {})
+        assert cache.stats()["hits"] == 1
+    
+    def test_keys_are_normalized(self):
+        """Positive Test: int and str pet IDs share one entry, for lookup and invalidation"""
+        cache = ResponseCache()
+        response = make_response()
+        cache.store("get_pet", 123, response)
+        
+        assert cache.lookup("get_pet", "123")[0] is response
+        cache.invalidate_pet("123")
+        assert cache.lookup("get_pet", 123) == (None, {})
+    
+    def test_read_in_flight_during_write_is_not_stored(self):
+        """Negative Test: a GET racing invalidate_pet must not cache its pre-write body"""
+        cache = ResponseCache()
+        generation = cache.generation()  # GET sent
+        cache.invalidate_pet(7)          # write lands while the GET is in flight
+        stale = make_response(body=b'{"id": 7, "status": "available"}')
+        
+        assert cache.store("get_pet", 7, stale, generation) is stale
+        assert cache.lookup("get_pet", 7) == (None, {})
+        assert cache.stats()["stale_stores"] == 1
+    
+    def test_endpoint_invalidation_blocks_in_flight_listing(self):
+        """Negative Test: a write invalidates findByStatus reads in flight for every status"""
+        cache = ResponseCache()
+        generation = cache.generation()
+        cache.invalidate_pet(7)
+        cache.store("find_pets_by_status", "sold", make_response(body=b"[]"), generation)
+        
+        assert cache.lookup("find_pets_by_status", "sold") == (None, {})
+    
+    def test_invalidation_of_other_key_does_not_block_store(self):
+        """Positive Test: writes to other pets leave an in-flight get_pet cacheable"""
+        cache = ResponseCache()
+        generation = cache.generation()
+        cache.invalidate("get_pet", 8)
+        response = make_response()
+        cache.store("get_pet", 7, response, generation)
+        
+        assert cache.lookup("get_pet", 7)[0] is response
+    
+    def test_request_sent_after_invalidation_is_stored(self):
+        """Positive Test: a GET sent after the write caches normally"""
+        cache = ResponseCache()
+        cache.invalidate_pet(7)
+        response = make_response()
+        cache.store("get_pet", 7, response, cache.generation())
+        
+        assert cache.lookup("get_pet", 7)[0] is response
+    
+    def test_stale_entry_is_revalidated(self):
+        """Positive Test: an expired entry with an ETag is refreshed by a 304"""
+        cache = ResponseCache(ttls={"get_pet": 0})
+        response = make_response(headers={"ETag": '"v1"'})
+        cache.store("get_pet", 1, response)
+        
+        assert cache.lookup("get_pet", 1) == (None, {"If-None-Match": '"v1"'})
+        assert cache.store("get_pet", 1, make_response(304, b"")) is response
+        assert cache.stats()["revalidations"] == 1
+    
+    def test_not_modified_without_cached_body_is_not_returned(self):
+        """Negative Test: a 304 for an entry evicted meanwhile yields None, never an empty 304"""
+        cache = ResponseCache(ttls={"get_pet": 0}, max_entries=1)
+        cache.store("get_pet", 1, make_response(headers={"ETag": '"v1"'}))
+        assert cache.lookup("get_pet", 1)[1] == {"If-None-Match": '"v1"'}
+        generation = cache.generation()
+        cache.store("get_pet", 2, make_response())  # evicts pet 1
+        
+        assert cache.store("get_pet", 1, make_response(304, b""), generation) is None
+    
+    def test_not_modified_racing_a_write_is_not_returned(self):
+        """Negative Test: a 304 for an entry invalidated while it was in flight yields None"""
+        cache = ResponseCache(ttls={"get_pet": 0})
+        cache.store("get_pet", 1, make_response(headers={"ETag": '"v1"'}))
+        generation = cache.generation()
+        cache.invalidate_pet(1)
+        
+        assert cache.store("get_pet", 1, make_response(304, b""), generation) is None
+        assert cache.stats()["stale_stores"] == 1
+    
+    def test_client_refetches_when_revalidated_body_is_gone(self):
+        """Positive Test: get_pet answers a bodiless 304 with an unconditional GET"""
+        cache = ResponseCache(ttls={"get_pet": 0})
+        cache.store("get_pet", 1, make_response(headers={"ETag": '"v1"'}), base_url="http://petstore.local/v2")
+        session = StubSession([make_response(304, b""), make_response(body=b'{"id": 1}')])
+        client = PetStoreAPIClient(cache=cache, session=session, base_url="http://petstore.local/v2",
+                                   record_latency=False, capture_exchanges=False)
+        # Evicted while the conditional GET is in flight
+        session.on_request = cache.clear
+        
+        response = client.get_pet(1)
+        assert response.status_code == 200 and response.content == b'{"id": 1}'
+        assert [headers.get("If-None-Match") for headers in session.sent_headers] == ['"v1"', None]
+    
+    def test_invalidation_marks_are_dropped_when_no_read_is_in_flight(self):
+        """Positive Test: invalidating many pets does not grow the cache's bookkeeping"""
+        cache = ResponseCache(max_entries=8)
+        for pet_id in range(100):
+            cache.invalidate_pet(pet_id)
+        generation = cache.generation()
+        for pet_id in range(100, 200):
+            cache.invalidate_pet(pet_id)
+        assert len(cache._invalidated_at) == 100  # needed while the read is in flight
+        cache.store("get_pet", 1, make_response(), generation)
+        
+        assert cache._invalidated_at == {} and cache._in_flight == {}
+    
+    def test_old_invalidation_marks_are_pruned_while_reads_overlap(self):
+        """Positive Test: marks no read in flight is older than are dropped"""
+        cache = ResponseCache(max_entries=8)
+        oldest = cache.generation()
+        for pet_id in range(20):
+            cache.invalidate_pet(pet_id)
+        newer = cache.generation()
+        cache.store("get_pet", 1, make_response(), oldest)
+        cache.invalidate_pet(99)
+        cache.abandon(cache.generation())
+        
+        assert list(cache._invalidated_at) == [("", "get_pet", "99")]
+        assert cache.store("get_pet", 99, make_response(), newer) is not None
+        assert cache.lookup("get_pet", 99) == (None, {})
+    
+    def test_keys_are_scoped_by_base_url(self):
+        """Positive Test: clients of different deployments sharing a cache never see each other's entries"""
+        cache = ResponseCache()
+        staging = make_response(body=b'{"id": 1, "name": "staging"}')
+        cache.store("get_pet", 1, staging, base_url="http://staging/v2")
+        
+        assert cache.lookup("get_pet", 1, "http://production/v2") == (None, {})
+        cache.invalidate_pet(1, "http://production/v2")
+        assert cache.lookup("get_pet", 1, "http://staging/v2")[0] is staging
+    
+    def test_lru_eviction(self):
+        """Positive Test: the least recently used entry is evicted first"""
+        cache = ResponseCache(max_entries=2)
+        for pet_id in (1, 2):
+            cache.store("get_pet", pet_id, make_response())
+        cache.lookup("get_pet", 1)
+        cache.store("get_pet", 3, make_response())
+        
+        assert cache.lookup("get_pet", 2) == (None, {})
+        assert cache.lookup("get_pet", 1)[0] is not None
+        assert cache.stats()["evictions"] == 1
+
+
+class ScriptedSend:
+    """send() for HedgingPolicy: the n-th attempt waits delay_s, then answers with a status or raises"""
+    
+    def __init__(self, *attempts):
+        self.attempts = list(attempts)
+        self.calls = []
+        self.closed = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, **kwargs):
+        with self._lock:
+            index = len(self.calls)
+            self.calls.append(kwargs)
+        delay_s, outcome = self.attempts[index]
+        time.sleep(delay_s)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        response = make_response(outcome)
+        response.elapsed = timedelta(seconds=delay_s)
+        response.close = lambda: self.closed.append(index)
+        return response
+
+
+class TestHedgingPolicy:
+    """Hedges, retries and their shared budget with scripted attempts (no server)"""
+    
+    ENDPOINT = "GET /pet/{petId}"
+    
+    def test_fast_primary_is_not_hedged(self):
+        """Positive Test: an answer before the hedge delay sends nothing else, with the attempt timeout"""
+        send = ScriptedSend((0.0, 200))
+        with HedgingPolicy(initial_delay_ms=500, attempt_timeout_s=2.5) as policy:
+            response = policy.execute(send, self.ENDPOINT)
+        
+        assert response.status_code == 200
+        assert send.calls == [{"stream": True, "timeout": 2.5}]
+        assert policy.stats()["hedges_sent"] == 0
+    
+    def test_first_slow_request_is_hedged(self):
+        """Positive Test: the very first slow primary gets a hedge; the loser is closed and observed"""
+        send = ScriptedSend((0.3, 200), (0.0, 203))
+        with HedgingPolicy(initial_delay_ms=20, min_samples=2, budget_ratio=0.5) as policy:
+            response = policy.execute(send, self.ENDPOINT)
+            
+            deadline = time.monotonic() + 5
+            while not send.closed and time.monotonic() < deadline:
+                time.sleep(0.01)
+        
+        assert response.status_code == 203
+        assert policy.stats()["hedges_won"] == 1
+        assert send.closed == [0]
+        # The slow primary counts towards the delay even though it lost
+        assert policy.hedge_delay_ms(self.ENDPOINT) >= 250
+    
+    def test_zero_budget_disables_hedging(self):
+        """Negative Test: budget_ratio=0.0 waits for the primary instead of hedging"""
+        send = ScriptedSend((0.05, 200))
+        with HedgingPolicy(initial_delay_ms=10, budget_ratio=0.0) as policy:
+            response = policy.execute(send, self.ENDPOINT)
+        
+        assert response.status_code == 200 and len(send.calls) == 1
+        assert policy.stats()["budget_denials"] == 1
+    
+    def test_connection_error_is_retried(self):
+        """Positive Test: a connection error is retried once the budget allows it"""
+        send = ScriptedSend((0.0, requests.exceptions.ConnectionError()), (0.0, 200))
+        with HedgingPolicy(backoff_base_s=0.0) as policy:
+            response = policy.execute(send, self.ENDPOINT)
+        
+        assert response.status_code == 200
+        assert policy.stats()["retries"] == 1
+    
+    def test_retries_stop_at_the_budget(self):
+        """Negative Test: past the one-token minimum, extra requests stay within budget_ratio x primaries"""
+        error = requests.exceptions.ConnectionError()
+        send = ScriptedSend((0.0, error), (0.0, error), (0.0, 200))
+        with HedgingPolicy(max_retries=2, backoff_base_s=0.0, budget_ratio=0.5) as policy:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                policy.execute(send, self.ENDPOINT)
+        
+        assert len(send.calls) == 2
+        assert policy.stats()["retries"] == 1 and policy.stats()["budget_denials"] == 1
+    
+    def test_shutdown_stops_the_executor(self):
+        """Negative Test: a policy used as a context manager accepts no attempts after exit"""
+        with HedgingPolicy() as policy:
+            pass
+        
+        with pytest.raises(RuntimeError):
+            policy.execute(ScriptedSend((0.0, 200)), self.ENDPOINT)
+
+
+class TestRateGovernor:
+    """Offline tests of the congestion signals fed to RateGovernor"""
+    
+    def make_governor(self) -> RateGovernor:
+        return RateGovernor(initial_rate=100, initial_concurrency=8, cooldown_s=0)
+    
+    @pytest.mark.parametrize("error", [requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError])
+    def test_request_exception_is_congestion(self, error):
+        """Positive Test: timeouts and connection errors halve both limits"""
+        governor = self.make_governor()
+        with pytest.raises(error):
+            with governor.slot():
+                raise error()
+        
+        assert governor.stats()["decreases"] == 1
+        assert governor.concurrency_limit == 4
+        assert governor.bucket.burst == 4
+    
+    def test_expected_status_is_not_congestion(self):
+        """Positive Test: a provoked 500 leaves the limits alone, an unexpected one cuts them"""
+        governor = self.make_governor()
+        response = make_response(500)
+        response.elapsed = timedelta(milliseconds=1)
+        
+        governor.observe(response, frozenset({500}))
+        assert governor.stats()["congestion_events"] == 0
+        governor.observe(response)
+        assert governor.stats()["congestion_events"] == 1
+    
+    def test_latency_target_is_per_endpoint(self):
+        """Positive Test: a slow listing is compared with earlier listings, not with single-pet reads"""
+        governor = self.make_governor()
+        
+        def observe(url, elapsed_ms):
+            response = make_response()
+            response.request = requests.Request("GET", url).prepare()
+            response.elapsed = timedelta(milliseconds=elapsed_ms)
+            governor.observe(response)
+            return governor.stats()["congestion_events"]
+        
+        assert observe("http://petstore.local/v2/pet/1", 2) == 0
+        assert observe("http://petstore.local/v2/pet/findByStatus?status=available", 300) == 0
+        assert observe("http://petstore.local/v2/pet/findByStatus?status=sold", 800) == 0
+        # 3 x the fastest listing (300ms) is the target
+        assert observe("http://petstore.local/v2/pet/findByStatus?status=pending", 1000) == 1
+        # The 50ms floor still applies to the fast endpoint
+        assert observe("http://petstore.local/v2/pet/2", 40) == 1
+        assert observe("http://petstore.local/v2/pet/3", 60) == 2
+    
+    def test_activated_governor_is_the_client_default(self, monkeypatch):
+        """Positive Test: clients created while a governor is active use it unless given their own"""
+        governor, own = self.make_governor(), self.make_governor()
+        monkeypatch.setattr(rate_limiter, "_ACTIVE", None)
+        assert PetStoreAPIClient(record_latency=False).rate_governor is None
+        
+        rate_limiter.activate(governor)
+        assert PetStoreAPIClient(record_latency=False).rate_governor is governor
+        assert PetStoreAPIClient(record_latency=False, rate_governor=own).rate_governor is own
+
+
+class FakeClock:
+    """Stands in for the time module in utils.consistency: sleeping advances the clock"""
+    
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps = []
+    
+    def perf_counter(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class TestPollUntil:
+    """Backoff, deadline and time-to-consistency of poll_until, on a fake clock"""
+    
+    READ_LATENCY_S = 0.05
+    
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock(now=1.0)
+        monkeypatch.setattr(consistency, "time", clock)
+        return clock
+    
+    def poll(self, clock, consistent_from_read, recorder, **kwargs):
+        """Reads take READ_LATENCY_S; the state is visible from the given read on (None: never)"""
+        reads = []
+        
+        def fetch():
+            reads.append(clock.now)
+            clock.now += self.READ_LATENCY_S
+            return make_response()
+        
+        def check(response):
+            return None if consistent_from_read is not None and len(reads) >= consistent_from_read else "stale"
+        
+        return reads, poll_until(fetch, check, "pet exists", recorder=recorder, **kwargs)
+    
+    def test_backoff_grows_up_to_the_cap(self, clock):
+        """Positive Test: pauses double from initial_delay_s and stop growing at max_delay_s"""
+        recorder = ConsistencyRecorder()
+        self.poll(clock, 7, recorder, initial_delay_s=0.1, max_delay_s=0.5)
+        
+        assert clock.sleeps == [0.1, 0.2, 0.4, 0.5, 0.5, 0.5]
+        assert recorder.summary()["pet exists"]["reads_per_wait"] == 7
+    
+    def test_time_to_consistency_excludes_read_latency(self, clock):
+        """Positive Test: measured from the write's completion to the send time of the consistent read"""
+        recorder = ConsistencyRecorder()
+        written_at = clock.now - 0.03
+        reads, _ = self.poll(clock, 2, recorder, initial_delay_s=0.1, since=written_at)
+        
+        # 30ms before the wait + first read (50ms) + pause (100ms); the second read's latency is not lag
+        assert reads[1] - written_at == pytest.approx(0.18)
+        assert recorder.summary()["pet exists"]["max"] == pytest.approx(180)
+    
+    def test_first_read_consistent(self, clock):
+        """Positive Test: without a write time the sample starts at the call, so an immediate hit is 0ms"""
+        recorder = ConsistencyRecorder()
+        self.poll(clock, 1, recorder)
+        
+        assert clock.sleeps == []
+        assert recorder.summary()["pet exists"]["max"] == 0
+    
+    def test_timeout(self, clock):
+        """Negative Test: the last pause is cut at the deadline, then the wait fails and counts as a timeout"""
+        recorder = ConsistencyRecorder()
+        message = r"pet exists: not observed after 4 reads in 1s \(last read: stale\)"
+        with pytest.raises(ConsistencyTimeoutError, match=message):
+            self.poll(clock, None, recorder, timeout_s=1.0, initial_delay_s=0.2, max_delay_s=2.0)
+        
+        # Reads end at 1.05, 1.3, 1.75: the third pause (0.8s) is cut to the 0.25s left
+        assert clock.sleeps == [0.2, 0.4, 0.25]
+        summary = recorder.summary()["pet exists"]
+        assert (summary["waits"], summary["timeouts"], summary["max"]) == (1, 1, None)
+    
+    def test_client_measures_from_its_write(self, monkeypatch):
+        """Positive Test: wait_for_pet counts the time since the client's create, not since the call"""
+        samples = []
+        monkeypatch.setattr(CONSISTENCY, "record", lambda condition, elapsed_ms, attempts, converged:
+                            samples.append((condition, elapsed_ms)))
+        pet = TestDataGenerator.generate_valid_pet()
+        with PetstoreStubServer() as server:
+            client = PetStoreAPIClient(base_url=server.base_url, record_latency=False, capture_exchanges=False)
+            client.create_pet(pet)
+            time.sleep(0.05)
+            client.wait_for_pet(pet["id"])
+            client.wait_for_pet(pet["id"])
+        
+        [(condition, after_write), (_, without_write)] = samples
+        assert condition == "pet exists"
+        assert after_write >= 50
+        # No new write: the second wait is measured from its own call
+        assert without_write < 50
+
+
+class TestExchangeLog:
+    """Offline tests of matching responses to their captured exchanges"""
+    
+    def test_label_finds_captured_exchange(self):
+        """Positive Test: label() titles the exchange captured by the response hook"""
+        log = ExchangeLog()
+        response = make_response()
+        log.response_hook(response)
+        log.label(response, "Get Pet")
+        
+        assert [exchange.title for exchange in log.exchanges()] == ["Get Pet"]
+    
+    def test_label_never_matches_a_collected_response(self):
+        """Negative Test: a new response reusing a collected one's id() gets its own exchange"""
+        log = ExchangeLog()
+        for _ in range(50):
+            log.response_hook(make_response())  # collected right away, ids are recycled
+        uncaptured = make_response(body=b'{"id": 2}')
+        log.label(uncaptured, "Uncaptured")
+        
+        titled = [exchange for exchange in log.exchanges() if exchange.title]
+        assert len(titled) == 1 and titled[0].body == b'{"id": 2}'
+
+
+class TestCassetteRecording:
+    """Cassette recording against the in-process stand-in Petstore (no network)"""
+    
+    @pytest.fixture
+    def stub(self):
+        with PetstoreStubServer() as server:
+            yield server
+    
+    def make_client(self, stub, adapter) -> PetStoreAPIClient:
+        return PetStoreAPIClient(base_url=stub.base_url, cassette=adapter,
+                                 record_latency=False, capture_exchanges=False)
+    
+    def test_interrupted_recording_still_replays(self, stub, tmp_path):
+        """Positive Test: exchanges recorded before a crash replay although eject() never ran"""
+        path = str(tmp_path / "petstore")
+        recorder = CassetteAdapter(path, "record")
+        pet = TestDataGenerator.generate_valid_pet()
+        client = self.make_client(stub, recorder)
+        client.create_pet(pet)
+        recorded = client.get_pet(pet["id"])
+        # No eject(): the run died here
+        
+        replayed = self.make_client(stub, CassetteAdapter(path, "replay")).get_pet(pet["id"])
+        assert replayed.status_code == 200
+        assert replayed.content == recorded.content
+    
+    def test_streamed_response_is_recorded_as_read(self, stub, tmp_path):
+        """Positive Test: recording does not buffer a streamed body before the caller reads it"""
+        path = str(tmp_path / "petstore")
+        recorder = CassetteAdapter(path, "record")
+        client = self.make_client(stub, recorder)
+        for index in range(30):
+            pet = TestDataGenerator.generate_valid_pet()
+            pet["id"], pet["status"] = 880000 + index, "pending"
+            client.create_pet(pet)
+        creates = recorder.stats["recorded"]
+        
+        pets = client.iter_pets_by_status("pending", chunk_size=64)
+        first = next(pets)
+        assert recorder.stats["recorded"] == creates  # body not read to the end yet
+        streamed = [first] + list(pets)
+        assert recorder.stats["recorded"] == creates + 1
+        recorder.eject()
+        
+        replayer = CassetteAdapter(path, "replay")
+        assert list(self.make_client(stub, replayer).iter_pets_by_status("pending")) == streamed
+    
+    def test_abandoned_stream_is_recorded_truncated(self, stub, tmp_path):
+        """Positive Test: a stream closed early records the part that was read"""
+        path = str(tmp_path / "petstore")
+        recorder = CassetteAdapter(path, "record")
+        client = self.make_client(stub, recorder)
+        for index in range(30):
+            pet = TestDataGenerator.generate_valid_pet()
+            pet["id"], pet["status"] = 890000 + index, "sold"
+            client.create_pet(pet)
+        
+        pets = client.iter_pets_by_status("sold", chunk_size=64)
+        first = next(pets)
+        pets.close()
+        recorder.eject()
+        
+        with open(recorder.data_path, "rb") as data:
+            recording = data.read()
+        assert recording.count(b'"truncated":true') == 1
+        replayed = self.make_client(stub, CassetteAdapter(path, "replay")).iter_pets_by_status("sold")
+        assert next(replayed) == first
@@ -0,0 +1,182 @@
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import concurrency_plugin
+
+
+# Every inner test appends (name, start, end, on main thread) to this file
+RECORDING_TESTS = '''
+import json
+import threading
+import time
+import warnings
+
+import pytest
+
+EVENTS = {events!r}
+
+
+def record(name, duration=0.15):
+    started = time.monotonic()
+    time.sleep(duration)
+    with open(EVENTS, "a") as events:
+        events.write(json.dumps([name, started, time.monotonic(),
+                                 threading.current_thread() is threading.main_thread()]) + "\\n")
+'''
+
+
+class TestConcurrentScheduling:
+    """Runs of the concurrency plugin on generated test modules (pytester, in process)"""
+    
+    def run(self, pytester, body: str, *args):
+        events = pytester.path / "events.jsonl"
+        pytester.makepyfile(test_inner=RECORDING_TESTS.format(events=str(events)) + body)
+        result = pytester.runpytest("-p", "utils.concurrency_plugin", "-p", "no:cacheprovider", *args)
+        recorded = {}
+        if events.exists():
+            for line in events.read_text().splitlines():
+                name, started, ended, main = json.loads(line)
+                recorded[name] = (started, ended, main)
+        return result, recorded
+    
+    @staticmethod
+    def overlap(first, second) -> bool:
+        return first[0] < second[1] and second[0] < first[1]
+    
+    def test_independent_tests_overlap(self, pytester):
+        """Positive Test: tests without shared keys run on worker threads at the same time"""
+        body = "\n\nclass TestGroup:\n" + "".join(
+            f"    def test_{index}(self):\n        record('t{index}')\n" for index in range(6)
+        )
+        result, events = self.run(pytester, body, "--concurrency=4")
+        
+        result.assert_outcomes(passed=6)
+        inner = [events[f"t{index}"] for index in range(1, 5)]
+        assert not any(main for _, _, main in inner)
+        assert any(self.overlap(a, b) for a in inner for b in inner if a is not b)
+        # First and last test run on the main thread, alone
+        assert events["t0"][2] and events["t5"][2]
+    
+    def test_shared_resource_key_serializes_in_order(self, pytester):
+        """Positive Test: tests sharing a key never overlap and keep their collection order"""
+        body = '''
+
+class TestGroup:
+    def test_first(self):
+        record("first", 0)
+
+    @pytest.mark.resources("pet:1")
+    def test_a(self):
+        record("a")
+
+    @pytest.mark.resources("pet:1", "pet:2")
+    def test_b(self):
+        record("b")
+
+    @pytest.mark.resources("pet:2")
+    def test_c(self):
+        record("c")
+
+    def test_free(self):
+        record("free")
+
+    def test_last(self):
+        record("last", 0)
+'''
+        result, events = self.run(pytester, body, "--concurrency=4")
+        
+        result.assert_outcomes(passed=6)
+        assert events["a"][1] <= events["b"][0]
+        assert events["b"][1] <= events["c"][0]
+        # A test without keys is not held back by them
+        assert self.overlap(events["free"], events["a"])
+    
+    def test_caplog_and_filterwarnings_tests_run_on_main_thread(self, pytester):
+        """Positive Test: tests needing per-test global state run alone and keep working"""
+        body = '''
+import logging
+
+
+class TestGroup:
+    def test_0(self):
+        record("t0", 0)
+
+    def test_1(self):
+        record("t1")
+
+    def test_caplog(self, caplog):
+        record("caplog")
+        logging.getLogger("inner").warning("only mine")
+        assert [r.getMessage() for r in caplog.records] == ["only mine"]
+
+    def test_2(self):
+        record("t2")
+
+    @pytest.mark.filterwarnings("error")
+    def test_warning_is_error(self):
+        record("filterwarnings", 0)
+        with pytest.raises(UserWarning):
+            warnings.warn("turned into an error", UserWarning)
+
+    def test_3(self):
+        record("t3")
+
+    def test_4(self):
+        record("t4", 0)
+'''
+        result, events = self.run(pytester, body, "--concurrency=4")
+        
+        result.assert_outcomes(passed=7)
+        assert events["caplog"][2] and events["filterwarnings"][2]
+        for name in ("t1", "t2", "t3"):
+            assert not self.overlap(events["caplog"], events[name])
+    
+    def test_summary_reports_wall_and_summed_time(self, pytester):
+        """Positive Test: the summary shows wall time and summed test time, no saving"""
+        body = "\n\nclass TestGroup:\n" + "".join(
+            f"    def test_{index}(self):\n        record('t{index}', 0.05)\n" for index in range(5)
+        )
+        result, _ = self.run(pytester, body, "--concurrency=3")
+        
+        result.stdout.fnmatch_lines(["*3 tests in *ms wall time on 3 threads; summed per-test time *ms"])
+        assert "saved" not in result.stdout.str()
+    
+    def test_failure_is_reported_per_test(self, pytester):
+        """Negative Test: a failing concurrent test fails alone with its own output"""
+        body = '''
+
+class TestGroup:
+    def test_0(self):
+        record("t0", 0)
+
+    def test_fails(self):
+        print("output of the failing test")
+        record("fails")
+        assert False
+
+    def test_passes(self):
+        print("output of the passing test")
+        record("passes")
+
+    def test_3(self):
+        record("t3", 0)
+'''
+        result, _ = self.run(pytester, body, "--concurrency=2")
+        
+        result.assert_outcomes(passed=3, failed=1)
+        output = result.stdout.str()
+        assert "output of the failing test" in output
+        assert "output of the passing test" not in output
+    
+    def test_other_pytest_version_is_refused(self, pytester, monkeypatch):
+        """Negative Test: --concurrency > 1 is a usage error on an unverified pytest"""
+        monkeypatch.setattr(concurrency_plugin, "SUPPORTED_PYTEST", "0.0.0")
+        result, _ = self.run(pytester, "\n\ndef test_a():\n    pass\n", "--concurrency=2")
+        
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(["*only supported on pytest 0.0.0*"])
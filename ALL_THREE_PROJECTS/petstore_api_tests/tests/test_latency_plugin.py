@@ -0,0 +1,136 @@
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.api_client import PetStoreAPIClient
+from utils.cassette import CassetteAdapter
+from utils.latency import LatencyRecorder
+from utils.latency_plugin import parse_budget
+from utils.petstore_stub import PetstoreStubServer
+from utils.test_data import TestDataGenerator
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inner test recording one sample of the given latency without a server
+RECORDING_TEST = '''
+from utils.latency import RECORDER
+
+
+def test_slow_read():
+    RECORDER.record("GET", "http://petstore.local/v2/pet/1", 200, {elapsed_ms})
+'''
+
+
+class TestParseBudget:
+    """Parsing of --latency-budget / latency_budgets specs"""
+    
+    @pytest.mark.parametrize("spec, expected", [
+        ("GET /pet/{petId}:p95=800", ("GET /pet/{petId}", "p95", 800.0)),
+        ("  POST /pet : p99 = 1500.5 ", ("POST /pet", "p99", 1500.5)),
+        ("DELETE /pet/{petId}:max=2000", ("DELETE /pet/{petId}", "max", 2000.0)),
+        ("GET /pet/findByStatus:mean=300", ("GET /pet/findByStatus", "mean", 300.0)),
+    ])
+    def test_valid_budget(self, spec, expected):
+        """Positive Test: endpoint, statistic and limit are extracted"""
+        assert parse_budget(spec) == expected
+    
+    @pytest.mark.parametrize("spec", [
+        "",
+        "GET /pet/{petId}",
+        "get /pet/{petId}:p95=800",
+        "GET /pet/{petId}:p95=",
+        "GET /pet/{petId}:p95=-1",
+        "GET /pet/{petId}:median=800",
+        "GET:p95=800",
+    ])
+    def test_invalid_budget(self, spec):
+        """Negative Test: malformed specs are rejected with the expected format"""
+        with pytest.raises(ValueError, match="METHOD /path:p95=MILLISECONDS"):
+            parse_budget(spec)
+
+
+class TestLatencyPlugin:
+    """Sessions run with the latency plugin (pytester, in a subprocess so the shared recorder is left alone)"""
+    
+    @pytest.fixture(autouse=True)
+    def project_on_path(self, monkeypatch):
+        monkeypatch.setenv("PYTHONPATH", PROJECT_DIR)
+    
+    def run(self, pytester, *args):
+        return pytester.runpytest_subprocess("-p", "utils.latency_plugin", "-p", "no:cacheprovider", *args)
+    
+    def test_exceeded_budget_fails_the_session(self, pytester):
+        """Negative Test: passing tests still fail the session when a budget is exceeded"""
+        pytester.makepyfile(test_inner=RECORDING_TEST.format(elapsed_ms=900))
+        result = self.run(pytester, "--latency-budget", "GET /pet/{petId}:p95=800")
+        
+        result.assert_outcomes(passed=1)
+        assert result.ret == 1
+        result.stdout.fnmatch_lines(["*LATENCY BUDGET EXCEEDED: GET /pet/{petId} p95=900.0ms exceeds budget 800ms*"])
+    
+    def test_budget_within_limit_passes(self, pytester):
+        """Positive Test: a budget that holds leaves the exit status alone"""
+        pytester.makepyfile(test_inner=RECORDING_TEST.format(elapsed_ms=100))
+        pytester.makeini("[pytest]\nlatency_budgets =\n    GET /pet/{petId}:p95=800\n")
+        result = self.run(pytester)
+        
+        assert result.ret == 0
+        assert "LATENCY BUDGET EXCEEDED" not in result.stdout.str()
+    
+    def test_invalid_budget_is_a_usage_error(self, pytester):
+        """Negative Test: a typo in a budget fails before any test runs"""
+        pytester.makepyfile(test_inner=RECORDING_TEST.format(elapsed_ms=100))
+        result = self.run(pytester, "--latency-budget", "GET /pet/{petId}:p95")
+        
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(["*Invalid latency budget*"])
+    
+    def test_session_cleanup_is_not_recorded(self, pytester, monkeypatch):
+        """Positive Test: the pet_tracker DELETEs at session teardown stay out of the report"""
+        pytester.makepyfile(test_inner='''
+from utils.api_client import PetStoreAPIClient
+from utils.test_data import TestDataGenerator
+
+
+def test_create(pet_tracker):
+    assert PetStoreAPIClient(tracker=pet_tracker).create_pet(TestDataGenerator.generate_valid_pet()).status_code == 200
+''')
+        report = pytester.path / "latency.json"
+        with PetstoreStubServer() as server:
+            monkeypatch.setenv("PETSTORE_BASE_URL", server.base_url)
+            result = pytester.runpytest_subprocess("-p", "tests.conftest", "-p", "no:cacheprovider",
+                                                   f"--latency-report={report}")
+        
+        result.assert_outcomes(passed=1)
+        result.stdout.fnmatch_lines(["*Deleted 1 pets*"])
+        endpoints = json.loads(report.read_text())["endpoints"]
+        assert list(endpoints) == ["POST /pet"]
+
+
+class TestReplayedResponses:
+    """Cassette replays are answered without network and are not latency samples"""
+    
+    def test_replayed_response_is_not_recorded(self, tmp_path):
+        """Positive Test: the same GET is recorded live and skipped when replayed"""
+        path = str(tmp_path / "petstore")
+        pet = TestDataGenerator.generate_valid_pet()
+        
+        def recorded_endpoints(base_url, adapter):
+            recorder = LatencyRecorder()
+            client = PetStoreAPIClient(base_url=base_url, cassette=adapter,
+                                       record_latency=False, capture_exchanges=False)
+            client.session.hooks["response"].append(recorder.response_hook)
+            client.create_pet(pet)
+            assert client.get_pet(pet["id"]).status_code == 200
+            return list(recorder.summary())
+        
+        with PetstoreStubServer() as server:
+            recording = CassetteAdapter(path, "record")
+            assert recorded_endpoints(server.base_url, recording) == ["GET /pet/{petId}", "POST /pet"]
+            recording.eject()
+            
+            assert recorded_endpoints(server.base_url, CassetteAdapter(path, "replay")) == []
@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+from typing import Any, Dict, List
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -8,6 +9,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.api_client import PetStoreAPIClient, APITestHelper
 from utils.test_data import TestDataGenerator, PetSchema
 
+# Fixed pet IDs used below; tests touching the same pet never run concurrently
+TEST_PET_ID = TestDataGenerator.get_test_pet_id()
+
 
 class TestPetStoreCRUD:
     """
@@ -16,14 +20,16 @@ class TestPetStoreCRUD:
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, pet_tracker):
         """Setup API client before each test"""
-        self.api_client = PetStoreAPIClient()
+        # Pets created through the client are deleted in one batch at session end
+        self.api_client = PetStoreAPIClient(tracker=pet_tracker)
         self.helper = APITestHelper()
         self.test_pet_id = TestDataGenerator.get_test_pet_id()
     
     # ==================== CREATE (POST) - POSITIVE TESTS ====================
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID}")
     def test_create_pet_with_valid_data(self):
         """
         Positive Test: Create a new pet with all valid required fields
@@ -54,6 +60,7 @@ class TestPetStoreCRUD:
         
         print("✓ Pet created successfully")
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 1}")
     def test_create_pet_with_minimal_data(self):
         """
         Positive Test: Create pet with only required fields
@@ -77,9 +84,6 @@ class TestPetStoreCRUD:
         assert 'name' in response_data
         
         print("✓ Minimal pet created successfully")
-        
-        # Cleanup
-        self.api_client.delete_pet(pet_id)
     
     # ==================== CREATE (POST) - NEGATIVE TESTS ====================
     
@@ -93,7 +97,9 @@ class TestPetStoreCRUD:
         print("="*60)
         
         invalid_pet = TestDataGenerator.generate_invalid_pet_missing_required_fields()
-        response = self.api_client.create_pet(invalid_pet)
+        # Provoked errors must not throttle other tests sharing a rate governor
+        with self.api_client.expecting(400, 405, 500):
+            response = self.api_client.create_pet(invalid_pet)
         
         self.helper.print_response(response, "Invalid Pet Creation Response")
         
@@ -113,7 +119,9 @@ class TestPetStoreCRUD:
         print("="*60)
         
         invalid_pet = TestDataGenerator.generate_invalid_pet_wrong_types()
-        response = self.api_client.create_pet(invalid_pet)
+        # Provoked errors must not throttle other tests sharing a rate governor
+        with self.api_client.expecting(400, 500):
+            response = self.api_client.create_pet(invalid_pet)
         
         self.helper.print_response(response, "Wrong Type Pet Creation Response")
         
@@ -132,7 +140,9 @@ class TestPetStoreCRUD:
         print("TEST: Create Pet with Empty Body")
         print("="*60)
         
-        response = self.api_client.create_pet({})
+        # Provoked errors must not throttle other tests sharing a rate governor
+        with self.api_client.expecting(400, 405, 500):
+            response = self.api_client.create_pet({})
         
         self.helper.print_response(response, "Empty Body Response")
         
@@ -143,6 +153,7 @@ class TestPetStoreCRUD:
     
     # ==================== READ (GET) - POSITIVE TESTS ====================
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 2}")
     def test_get_existing_pet(self):
         """
         Positive Test: Get an existing pet by ID
@@ -157,8 +168,8 @@ class TestPetStoreCRUD:
         create_response = self.api_client.create_pet(pet_data)
         assert create_response.status_code == 200
         
-        # Now retrieve it
-        response = self.api_client.get_pet(self.test_pet_id + 2)
+        # Now retrieve it, polling until the replicated read sees the write
+        response = self.api_client.wait_for_pet(self.test_pet_id + 2)
         
         self.helper.print_response(response, "Get Pet Response")
         
@@ -172,9 +183,6 @@ class TestPetStoreCRUD:
         assert PetSchema.validate_pet_structure(response_data)
         
         print("✓ Pet retrieved successfully")
-        
-        # Cleanup
-        self.api_client.delete_pet(self.test_pet_id + 2)
     
     def test_find_pets_by_status_available(self):
         """
@@ -190,10 +198,10 @@ class TestPetStoreCRUD:
         self.helper.print_response(response, "Find by Status Response")
         
         assert response.status_code == 200
-        assert isinstance(response.json(), list)
+        # Decoded once with the client's codec; raises unless the body is a JSON list
+        pets = self.api_client.decode(response, List[Dict[str, Any]])
         
         # Verify all returned pets have status 'available'
-        pets = response.json()
         if pets:
             for pet in pets[:5]:  # Check first 5
                 if 'status' in pet:
@@ -202,8 +210,31 @@ class TestPetStoreCRUD:
         
         print(f"✓ Found {len(pets)} available pets")
     
+    def test_find_pets_by_status_streaming(self):
+        """
+        Positive Test: Stream pets by status 'sold' and stop early
+        Expected: Pets are yielded one at a time, all with status 'sold'
+        """
+        print("\n" + "="*60)
+        print("TEST: Find Pets by Status - Streaming")
+        print("="*60)
+        
+        pets = []
+        for pet in self.api_client.iter_pets_by_status("sold"):
+            pets.append(pet)
+            if len(pets) == 20:
+                break  # Remaining body is never downloaded
+        
+        for pet in pets:
+            if 'status' in pet:
+                assert pet['status'] == 'sold', \
+                    f"Found pet with status {pet['status']}"
+        
+        print(f"✓ Streamed {len(pets)} sold pets")
+    
     # ==================== READ (GET) - NEGATIVE TESTS ====================
     
+    @pytest.mark.resources("pet:9999999999")
     def test_get_non_existent_pet(self):
         """
         Negative Test: Get pet with non-existent ID
@@ -265,6 +296,7 @@ class TestPetStoreCRUD:
     
     # ==================== UPDATE (PUT) - POSITIVE TESTS ====================
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 3}")
     def test_update_existing_pet(self):
         """
         Positive Test: Update an existing pet
@@ -294,11 +326,14 @@ class TestPetStoreCRUD:
         assert response_data['name'] == "UpdatedPetName"
         assert response_data['status'] == "sold"
         
-        print("✓ Pet updated successfully")
+        # Read back until the update is visible
+        read_response = self.api_client.wait_for_pet(
+            self.test_pet_id + 3, name="UpdatedPetName", status="sold")
+        assert read_response.json()['name'] == "UpdatedPetName"
         
-        # Cleanup
-        self.api_client.delete_pet(self.test_pet_id + 3)
+        print("✓ Pet updated successfully")
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 4}")
     def test_update_pet_status_only(self):
         """
         Positive Test: Update only pet status
@@ -322,12 +357,10 @@ class TestPetStoreCRUD:
         assert response.json()['status'] == "pending"
         
         print("✓ Pet status updated successfully")
-        
-        # Cleanup
-        self.api_client.delete_pet(self.test_pet_id + 4)
     
     # ==================== UPDATE (PUT) - NEGATIVE TESTS ====================
     
+    @pytest.mark.resources("pet:9999999998")
     def test_update_non_existent_pet(self):
         """
         Negative Test: Update pet that doesn't exist
@@ -348,12 +381,12 @@ class TestPetStoreCRUD:
         
         if response.status_code == 200:
             print("⚠ API creates new pet on update (unexpected but documented)")
-            # Cleanup if created
-            self.api_client.delete_pet(9999999998)
+            # The created pet is tracked and deleted at session teardown
         else:
             assert response.status_code == 404
             print("✓ Non-existent pet update properly rejected")
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 5}")
     def test_update_pet_with_invalid_status(self):
         """
         Negative Test: Update pet with invalid status value
@@ -375,12 +408,10 @@ class TestPetStoreCRUD:
         
         # Document behavior
         print(f"API returned status: {response.status_code}")
-        
-        # Cleanup
-        self.api_client.delete_pet(self.test_pet_id + 5)
     
     # ==================== DELETE - POSITIVE TESTS ====================
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 6}")
     def test_delete_existing_pet(self):
         """
         Positive Test: Delete an existing pet
@@ -403,14 +434,15 @@ class TestPetStoreCRUD:
         assert response.status_code == 200, \
             f"Expected status 200, got {response.status_code}"
         
-        # Verify pet is deleted
-        get_response = self.api_client.get_pet(self.test_pet_id + 6)
+        # Verify pet is deleted (raises if it is still readable after the deadline)
+        get_response = self.api_client.wait_for_pet_deleted(self.test_pet_id + 6)
         assert get_response.status_code == 404, "Pet should not exist after deletion"
         
         print("✓ Pet deleted successfully")
     
     # ==================== DELETE - NEGATIVE TESTS ====================
     
+    @pytest.mark.resources("pet:9999999997")
     def test_delete_non_existent_pet(self):
         """
         Negative Test: Delete pet that doesn't exist
@@ -431,6 +463,7 @@ class TestPetStoreCRUD:
         
         print("✓ Delete of non-existent pet handled")
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 7}")
     def test_delete_already_deleted_pet(self):
         """
         Negative Test: Delete the same pet twice
@@ -458,6 +491,7 @@ class TestPetStoreCRUD:
     
     # ==================== COMPLETE CRUD FLOW TEST ====================
     
+    @pytest.mark.resources(f"pet:{TEST_PET_ID + 100}")
     def test_complete_crud_flow(self):
         """
         Integration Test: Complete CRUD flow
@@ -478,7 +512,7 @@ class TestPetStoreCRUD:
         
         # READ
         print("\n2. READ Phase")
-        read_resp = self.api_client.get_pet(test_id)
+        read_resp = self.api_client.wait_for_pet(test_id)
         assert read_resp.status_code == 200
         assert read_resp.json()['id'] == test_id
         print(f"   ✓ Retrieved pet: {read_resp.json()['name']}")
@@ -500,7 +534,7 @@ class TestPetStoreCRUD:
         
         # VERIFY DELETE
         print("\n5. VERIFY DELETION")
-        verify_resp = self.api_client.get_pet(test_id)
+        verify_resp = self.api_client.wait_for_pet_deleted(test_id)
         assert verify_resp.status_code == 404
         print(f"   ✓ Verified pet no longer exists")
         
@@ -0,0 +1,69 @@
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.petstore_stub import PetstoreStubServer
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inner test whose client is created without a rate governor of its own
+GOVERNED_TEST = '''
+from utils.api_client import PetStoreAPIClient
+from utils.rate_limiter import RateGovernor
+from utils.test_data import TestDataGenerator
+
+
+def test_client_is_governed(pet_tracker):
+    client = PetStoreAPIClient(tracker=pet_tracker)
+    assert client.rate_governor is RateGovernor.shared()
+    for _ in range(5):
+        assert client.create_pet(TestDataGenerator.generate_valid_pet()).status_code == 200
+'''
+
+
+class TestRateLimitPlugin:
+    """Sessions run with --rate-limit (pytester, in a subprocess so the shared governor is left alone)"""
+    
+    @pytest.fixture(autouse=True)
+    def project_on_path(self, monkeypatch):
+        monkeypatch.setenv("PYTHONPATH", PROJECT_DIR)
+    
+    def run(self, pytester, *args):
+        return pytester.runpytest_subprocess("-p", "tests.conftest", "-p", "no:cacheprovider", *args)
+    
+    def test_every_client_shares_the_governor(self, pytester, monkeypatch):
+        """Positive Test: test traffic and the session cleanup go through the shared governor"""
+        pytester.makepyfile(test_inner=GOVERNED_TEST)
+        with PetstoreStubServer() as server:
+            monkeypatch.setenv("PETSTORE_BASE_URL", server.base_url)
+            result = self.run(pytester, "--rate-limit=50")
+        
+        result.assert_outcomes(passed=1)
+        # 5 creates + 5 cleanup deletes
+        result.stdout.fnmatch_lines(["*Rate limiting*", "10 requests, final rate *"])
+    
+    def test_without_option_clients_are_not_governed(self, pytester):
+        """Positive Test: the plugin is off unless --rate-limit is given"""
+        pytester.makepyfile(test_inner='''
+from utils.api_client import PetStoreAPIClient
+
+
+def test_client_is_not_governed():
+    assert PetStoreAPIClient().rate_governor is None
+''')
+        result = self.run(pytester)
+        
+        result.assert_outcomes(passed=1)
+        assert "Rate limiting" not in result.stdout.str()
+    
+    @pytest.mark.parametrize("rate", ["0", "-5", "fast"])
+    def test_invalid_rate_is_a_usage_error(self, pytester, rate):
+        """Negative Test: a rate that is not a positive number fails before any test runs"""
+        pytester.makepyfile(test_inner="def test_nothing():\n    pass\n")
+        result = self.run(pytester, f"--rate-limit={rate}")
+        
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(["*--rate-limit*"])
@@ -0,0 +1,175 @@
+import pytest
+import sys
+import os
+import threading
+import time
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.api_client import PetStoreAPIClient
+from utils.petstore_stub import PetstoreStubServer
+from utils.resource_tracker import PetResourceTracker
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def response(status_code: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def tracker_with(*pet_ids) -> PetResourceTracker:
+    tracker = PetResourceTracker()
+    for pet_id in pet_ids:
+        tracker.register(pet_id)
+    return tracker
+
+
+class TestPetResourceTracker:
+    """Registration and concurrent cleanup with a scripted delete (no server)"""
+    
+    def test_register_and_unregister(self):
+        """Positive Test: each pet is tracked once; None ids are ignored"""
+        tracker = tracker_with(3, 1, 3, None, 2)
+        tracker.unregister(2)
+        tracker.unregister(99)
+        
+        assert tracker.pending() == [1, 3]
+        assert len(tracker) == 2
+    
+    def test_deletes_run_concurrently(self):
+        """Positive Test: max_workers deletes are in flight at once and every pet is deleted"""
+        tracker = tracker_with(*range(8))
+        in_flight = threading.Barrier(4, timeout=5)
+        
+        def delete(pet_id):
+            in_flight.wait()  # Raises BrokenBarrierError unless 4 deletes overlap
+            time.sleep(0.02)
+            return response(200)
+        
+        report = tracker.cleanup(delete, max_workers=4)
+        assert (report["tracked"], report["deleted"], report["workers"]) == (8, 8, 4)
+        assert report["failed"] == []
+        # Two rounds of four overlapping 20ms deletes: the summed request time exceeds the wall time
+        assert report["request_time_s"] > report["wall_time_s"] > 0
+        assert tracker.pending() == []
+    
+    def test_outcomes_are_collected_per_pet(self):
+        """Negative Test: 404s count as already gone; HTTP errors and exceptions are reported with their pet"""
+        outcomes = {
+            1: response(200),
+            2: response(404),
+            3: response(500),
+            4: requests.exceptions.ConnectionError("connection reset"),
+            5: ValueError(),
+        }
+        tracker = tracker_with(*outcomes)
+        
+        def delete(pet_id):
+            if isinstance(outcomes[pet_id], Exception):
+                raise outcomes[pet_id]
+            return outcomes[pet_id]
+        
+        report = tracker.cleanup(delete)
+        assert (report["deleted"], report["already_gone"]) == (1, 1)
+        assert sorted(report["failed"]) == [(3, "HTTP 500"), (4, "connection reset"), (5, "ValueError")]
+        # Pets that could not be deleted are still tracked
+        assert tracker.pending() == [3, 4, 5]
+    
+    def test_failed_delete_does_not_abort_the_batch(self):
+        """Negative Test: with one worker, a delete failing first still leaves the rest to run"""
+        tracker = tracker_with(1, 2, 3, 4)
+        deleted = []
+        
+        def delete(pet_id):
+            if pet_id == 1:
+                raise requests.exceptions.ReadTimeout("read timed out")
+            deleted.append(pet_id)
+            return response(200)
+        
+        report = tracker.cleanup(delete, max_workers=1)
+        assert deleted == [2, 3, 4]
+        assert report["deleted"] == 3 and report["failed"] == [(1, "read timed out")]
+    
+    def test_nothing_tracked(self):
+        """Positive Test: an empty tracker sends no request and starts no workers"""
+        report = PetResourceTracker().cleanup(lambda pet_id: pytest.fail("nothing to delete"))
+        
+        assert (report["tracked"], report["deleted"], report["workers"]) == (0, 0, 0)
+
+
+class TestPetTrackerFixture:
+    """The session-scoped pet_tracker fixture (pytester, in a subprocess against the stand-in Petstore)"""
+    
+    PET_IDS = (9100001, 9100002, 9100003)
+    
+    @pytest.fixture(autouse=True)
+    def project_on_path(self, monkeypatch):
+        monkeypatch.setenv("PYTHONPATH", PROJECT_DIR)
+    
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        with PetstoreStubServer() as server:
+            monkeypatch.setenv("PETSTORE_BASE_URL", server.base_url)
+            yield server
+    
+    def run(self, pytester):
+        return pytester.runpytest_subprocess("-p", "tests.conftest", "-p", "no:cacheprovider")
+    
+    def test_failed_test_is_cleaned_up_despite_a_failed_delete(self, pytester, stub):
+        """Negative Test: pets of a failed test are deleted at session end; one failed DELETE is reported"""
+        pytester.makepyfile(test_inner=f'''
+import requests
+
+from utils.api_client import PetStoreAPIClient
+from utils.test_data import TestDataGenerator
+
+original_delete = PetStoreAPIClient.delete_pet
+
+
+def flaky_delete(self, pet_id, api_key=None):
+    if pet_id == {self.PET_IDS[0]}:
+        raise requests.exceptions.ConnectionError("connection reset")
+    return original_delete(self, pet_id, api_key)
+
+
+PetStoreAPIClient.delete_pet = flaky_delete
+
+
+def test_creates_then_fails(pet_tracker):
+    client = PetStoreAPIClient(tracker=pet_tracker)
+    for pet_id in {self.PET_IDS}:
+        client.create_pet(dict(TestDataGenerator.generate_valid_pet(), id=pet_id))
+    assert False, "failed before its own cleanup"
+''')
+        result = self.run(pytester)
+        
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines([
+            "*Deleted 2 pets (0 already gone, 1 failed)*with 3 workers*",
+            f"Could not delete pet {self.PET_IDS[0]}: connection reset",
+        ])
+        client = PetStoreAPIClient(base_url=stub.base_url, record_latency=False, capture_exchanges=False)
+        assert [client.get_pet(pet_id).status_code for pet_id in self.PET_IDS] == [200, 404, 404]
+    
+    def test_pets_deleted_by_tests_are_not_deleted_again(self, pytester, stub):
+        """Positive Test: a pet the test deleted itself is unregistered; the section is skipped when nothing is left"""
+        pytester.makepyfile(test_inner=f'''
+from utils.api_client import PetStoreAPIClient
+from utils.test_data import TestDataGenerator
+
+
+def test_create_and_delete(pet_tracker):
+    client = PetStoreAPIClient(tracker=pet_tracker)
+    client.create_pet(dict(TestDataGenerator.generate_valid_pet(), id={self.PET_IDS[0]}))
+    assert client.delete_pet({self.PET_IDS[0]}).status_code == 200
+    assert len(pet_tracker) == 0
+''')
+        result = self.run(pytester)
+        
+        result.assert_outcomes(passed=1)
+        assert "Pet cleanup" not in result.stdout.str()
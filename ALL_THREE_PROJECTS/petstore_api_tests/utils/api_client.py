@@ -1,19 +1,190 @@
 import requests
 import json
-from typing import Dict, Any, Optional
+import codecs
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Any, FrozenSet, Iterator, Optional
+
+from utils import cassette as cassette_transport
+from utils import rate_limiter
+from utils.cassette import CassetteAdapter
+from utils.consistency import poll_until
+from utils.exchange_log import EXCHANGES
+from utils.hedging import HedgingPolicy
+from utils.json_codec import JSONCodec, default_codec
+from utils.latency import RECORDER, template_path
+from utils.rate_limiter import RateGovernor
+from utils.resource_tracker import PetResourceTracker
+from utils.response_cache import ResponseCache
+from utils.schema_validator import PET_VALIDATOR
 
 
 class PetStoreAPIClient:
     """API Client for PetStore Swagger API"""
     
-    BASE_URL = "https://petstore.swagger.io/v2"
+    # Point the suite at another deployment (e.g. utils/petstore_stub.py) via PETSTORE_BASE_URL
+    BASE_URL = os.environ.get("PETSTORE_BASE_URL", "https://petstore.swagger.io/v2")
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None,
+                 base_url: Optional[str] = None, record_latency: bool = True,
+                 rate_governor: Optional[RateGovernor] = None,
+                 hedging: Optional[HedgingPolicy] = None,
+                 tracker: Optional[PetResourceTracker] = None,
+                 capture_exchanges: bool = True,
+                 codec: Optional[JSONCodec] = None,
+                 cassette: Optional[CassetteAdapter] = None):
+        """
+        Args:
+            cache: Optional response cache for get_pet and find_pets_by_status;
+                   writes through this client invalidate the affected entries
+            session: Session to send requests with (e.g. a Locust HttpSession)
+            base_url: Overrides BASE_URL for this client
+            record_latency: Feed every exchange to the latency report
+            rate_governor: Optional adaptive rate limiter; pass RateGovernor.shared()
+                           to throttle all clients in the process together. Defaults
+                           to the one activated by the rate limit plugin (--rate-limit)
+            hedging: Optional hedging/retry policy for get_pet and find_pets_by_status
+            tracker: Registers created pets for deferred cleanup at session end
+            capture_exchanges: Keep recent exchanges for failure reports
+            codec: JSON codec for request bodies and decode(); defaults to the
+                   fastest installed one (orjson, msgspec, then stdlib json)
+            cassette: Record/replay transport; defaults to the one activated by
+                      the cassette plugin (--cassette), if any
+        """
+        self.session = session if session is not None else requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        cassette = cassette if cassette is not None else cassette_transport.active()
+        if cassette is not None:
+            cassette.mount(self.session)
+        if record_latency:
+            # Every exchange feeds the per-endpoint latency report (see latency_plugin)
+            self.session.hooks['response'].append(RECORDER.response_hook)
+        if capture_exchanges:
+            # Rendered into the report only when a test fails (see exchange_plugin)
+            self.session.hooks['response'].append(EXCHANGES.response_hook)
+        self.cache = cache
+        self.rate_governor = rate_governor if rate_governor is not None else rate_limiter.active()
+        self.hedging = hedging
+        self.tracker = tracker
+        self.codec = codec if codec is not None else default_codec()
+        self._record_latency = record_latency
+        self._capture_exchanges = capture_exchanges
+        self._expected = threading.local()
+        # time.perf_counter() when the last write to each pet completed (see wait_for_pet)
+        self._written_at: Dict[Any, float] = {}
+    
+    @contextmanager
+    def expecting(self, *status_codes: int) -> Iterator["PetStoreAPIClient"]:
+        """
+        Mark error statuses the calling thread provokes on purpose (negative tests)
+        
+        The rate governor does not treat them as congestion, so an intentional
+        500 does not throttle every other client sharing the governor.
+        """
+        previous = self._expected_statuses()
+        self._expected.status_codes = previous | frozenset(status_codes)
+        try:
+            yield self
+        finally:
+            self._expected.status_codes = previous
+    
+    def _expected_statuses(self) -> FrozenSet[int]:
+        return getattr(self._expected, "status_codes", frozenset())
+    
+    def _request(self, method: str, url: str, expected_statuses: Optional[FrozenSet[int]] = None,
+                 **kwargs) -> requests.Response:
+        """Send a request, through the rate governor when one is configured"""
+        if self.rate_governor is None:
+            return self.session.request(method, url, **kwargs)
+        
+        if expected_statuses is None:
+            expected_statuses = self._expected_statuses()
+        with self.rate_governor.slot() as governor:
+            response = self.session.request(method, url, **kwargs)
+            governor.observe(response, expected_statuses)
+        return response
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """Idempotent GET, hedged and retried when a hedging policy is configured"""
+        if self.hedging is None:
+            return self._request('GET', url, **kwargs)
+        # Hedged attempts run on other threads; they carry the caller's expected statuses along
+        response = self.hedging.execute(partial(self._request, 'GET', url,
+                                                expected_statuses=self._expected_statuses(), **kwargs),
+                                        f"GET {template_path(url)}")
+        # Attempts are streamed so the loser can be dropped unread; the winner's
+        # body is read now, so capture it for failure reports and the bytes column
+        if self._capture_exchanges:
+            EXCHANGES.complete(response)
+        if self._record_latency:
+            RECORDER.complete(response)
+        return response
+    
+    def _cached_get(self, endpoint: str, key: Any, url: str, **kwargs) -> requests.Response:
+        """GET through the response cache (plain GET when caching is disabled)"""
+        if self.cache is None:
+            return self._get(url, **kwargs)
+        
+        cached, conditional_headers = self.cache.lookup(endpoint, key, self.BASE_URL)
+        if cached is not None:
+            return cached
+        response = self._cached_fetch(endpoint, key, url, conditional_headers, **kwargs)
+        if response is None:
+            # 304 for an entry evicted or invalidated meanwhile: no body to answer with
+            response = self._cached_fetch(endpoint, key, url, {}, **kwargs)
+        return response
+    
+    def _cached_fetch(self, endpoint: str, key: Any, url: str, headers: Dict[str, str],
+                      **kwargs) -> Optional[requests.Response]:
+        """Send the GET and hand the response to the cache (None: see ResponseCache.store)"""
+        # Taken before the request: a write landing while it is in flight keeps it out of the cache
+        generation = self.cache.generation()
+        try:
+            response = self._get(url, headers=headers, **kwargs)
+        except BaseException:
+            self.cache.abandon(generation)
+            raise
+        return self.cache.store(endpoint, key, response, generation, self.BASE_URL)
+    
+    def _send_json(self, method: str, url: str, body: Any) -> requests.Response:
+        """Send a JSON body encoded with the client's codec"""
+        return self._request(method, url, data=self.codec.encode(body))
+    
+    def decode(self, response: requests.Response, expected_type: Optional[Any] = None) -> Any:
+        """
+        Decode a JSON response body with the client's codec
+        
+        Args:
+            response: Response to decode
+            expected_type: Optional expected type, e.g. dict or List[Dict[str, Any]]
+            
+        Returns:
+            Decoded body
+            
+        Raises:
+            ValueError: Body is not valid JSON or not of the expected type
+        """
+        return self.codec.decode(response.content, expected_type)
+    
+    def _pet_written(self, pet_id: Any):
+        """Note when a write to pet_id completed and drop cached reads it made stale"""
+        self._written_at[pet_id] = time.perf_counter()
+        if self.cache is not None:
+            self.cache.invalidate_pet(pet_id, self.BASE_URL)
+    
+    def _track_pet(self, pet_data: Dict[str, Any], response: requests.Response):
+        """Register a pet stored by the server for deferred cleanup"""
+        if self.tracker is not None and response.status_code == 200:
+            self.tracker.register(pet_data.get('id'))
     
     # ==================== PET ENDPOINTS ====================
     
@@ -28,7 +199,9 @@ class PetStoreAPIClient:
             Response object
         """
         url = f"{self.BASE_URL}/pet"
-        response = self.session.post(url, json=pet_data)
+        response = self._send_json('POST', url, pet_data)
+        self._pet_written(pet_data.get('id'))
+        self._track_pet(pet_data, response)
         return response
     
     def get_pet(self, pet_id: int) -> requests.Response:
@@ -42,7 +215,7 @@ class PetStoreAPIClient:
             Response object
         """
         url = f"{self.BASE_URL}/pet/{pet_id}"
-        response = self.session.get(url)
+        response = self._cached_get('get_pet', pet_id, url)
         return response
     
     def update_pet(self, pet_data: Dict[str, Any]) -> requests.Response:
@@ -56,7 +229,10 @@ class PetStoreAPIClient:
             Response object
         """
         url = f"{self.BASE_URL}/pet"
-        response = self.session.put(url, json=pet_data)
+        response = self._send_json('PUT', url, pet_data)
+        self._pet_written(pet_data.get('id'))
+        # Updating an unknown pet creates it on the public Petstore
+        self._track_pet(pet_data, response)
         return response
     
     def delete_pet(self, pet_id: int, api_key: Optional[str] = None) -> requests.Response:
@@ -74,7 +250,10 @@ class PetStoreAPIClient:
         headers = {}
         if api_key:
             headers['api_key'] = api_key
-        response = self.session.delete(url, headers=headers)
+        response = self._request('DELETE', url, headers=headers)
+        self._pet_written(pet_id)
+        if self.tracker is not None and response.status_code in (200, 404):
+            self.tracker.unregister(pet_id)
         return response
     
     def find_pets_by_status(self, status: str) -> requests.Response:
@@ -88,9 +267,100 @@ class PetStoreAPIClient:
             Response object
         """
         url = f"{self.BASE_URL}/pet/findByStatus"
-        response = self.session.get(url, params={'status': status})
+        response = self._cached_get('find_pets_by_status', status, url, params={'status': status})
         return response
     
+    def wait_for_pet(self, pet_id: int, timeout_s: float = 10.0, **expected: Any) -> requests.Response:
+        """
+        Poll GET /pet/{petId} until the pet exists (and has the expected fields)
+        
+        Use after a write instead of a fixed sleep: replicas of the public
+        Petstore may briefly serve stale data. Reads back off exponentially,
+        bypass the response cache, and the time from this client's last
+        write to the pet until the first read showing the expected state was
+        sent is recorded as a time-to-consistency metric.
+        
+        Args:
+            pet_id: Pet ID
+            timeout_s: Deadline for the whole wait
+            **expected: Field values to wait for, e.g. name="Rex", status="sold"
+            
+        Returns:
+            The first response showing the expected state
+            
+        Raises:
+            ConsistencyTimeoutError: Not observed before the deadline
+        """
+        url = f"{self.BASE_URL}/pet/{pet_id}"
+        
+        def check(response: requests.Response) -> Optional[str]:
+            if response.status_code != 200:
+                return f"status {response.status_code}"
+            pet = self.decode(response, dict)
+            stale = {field: pet.get(field) for field, value in expected.items() if pet.get(field) != value}
+            return f"stale fields {stale}" if stale else None
+        
+        condition = f"pet {', '.join(sorted(expected))} updated" if expected else "pet exists"
+        return poll_until(lambda: self._get(url), check, condition, timeout_s=timeout_s,
+                          since=self._written_at.pop(pet_id, None))
+    
+    def wait_for_pet_deleted(self, pet_id: int, timeout_s: float = 10.0) -> requests.Response:
+        """
+        Poll GET /pet/{petId} until it returns 404
+        
+        Args:
+            pet_id: Pet ID
+            timeout_s: Deadline for the whole wait
+            
+        Returns:
+            The 404 response
+            
+        Raises:
+            ConsistencyTimeoutError: Pet still readable at the deadline
+        """
+        url = f"{self.BASE_URL}/pet/{pet_id}"
+        
+        def check(response: requests.Response) -> Optional[str]:
+            return None if response.status_code == 404 else f"status {response.status_code}"
+        
+        return poll_until(lambda: self._get(url), check, "pet deleted", timeout_s=timeout_s,
+                          since=self._written_at.pop(pet_id, None))
+    
+    def iter_pets_by_status(self, status: str, validate: bool = False,
+                            chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+        """
+        Stream pets by status (GET /pet/findByStatus) one at a time
+        
+        The JSON array is parsed incrementally from the response stream, so
+        peak memory stays bounded by chunk_size plus one pet no matter how
+        large the result is. Breaking out of the loop closes the connection
+        without downloading the rest of the body.
+        
+        Args:
+            status: Status value (available, pending, sold)
+            validate: Check each pet against the swagger Pet definition
+            chunk_size: Number of bytes read from the socket at a time
+            
+        Yields:
+            Pet dictionaries in response order
+            
+        Raises:
+            requests.HTTPError: Response status is not 2xx
+            ValueError: Body is not a JSON array, or a pet fails validation
+        """
+        url = f"{self.BASE_URL}/pet/findByStatus"
+        response = self._request('GET', url, params={'status': status}, stream=True)
+        try:
+            response.raise_for_status()
+            for index, pet in enumerate(_iter_json_array(response.iter_content(chunk_size))):
+                if validate:
+                    violations = PET_VALIDATOR.validate(pet, index)
+                    if violations:
+                        raise ValueError(f"Invalid pet in findByStatus response: {violations}")
+                yield pet
+        finally:
+            response.close()
+    
     def update_pet_with_form(self, pet_id: int, name: str = None, status: str = None) -> requests.Response:
         """
         Update pet with form data (POST /pet/{petId})
@@ -111,10 +381,101 @@ class PetStoreAPIClient:
             data['status'] = status
         
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        response = self.session.post(url, data=data, headers=headers)
+        response = self._request('POST', url, data=data, headers=headers)
+        self._pet_written(pet_id)
         return response
 
 
+# Characters that can follow a valid number prefix inside a longer number
+_NUMBER_CONTINUATION = ".eE+-"
+
+
+def _iter_json_array(chunks: Iterator[bytes]) -> Iterator[Any]:
+    """
+    Incrementally decode the elements of a top-level JSON array from byte chunks
+    
+    As strict as response.json(): a trailing comma or anything but whitespace
+    after the closing bracket raises ValueError.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    whitespace = " \t\n\r"
+    buffer = ""
+    position = 0
+    exhausted = False
+    started = False
+    
+    def fill() -> bool:
+        nonlocal buffer, position, exhausted
+        for chunk in chunks:
+            if chunk:
+                # Drop consumed text before appending, keeping the buffer small
+                buffer = buffer[position:] + utf8.decode(chunk)
+                position = 0
+                return True
+        buffer = buffer[position:] + utf8.decode(b"", final=True)
+        position = 0
+        exhausted = True
+        return False
+    
+    while True:
+        while position < len(buffer) and buffer[position] in whitespace:
+            position += 1
+        if position >= len(buffer):
+            if exhausted:
+                raise ValueError("Unexpected end of JSON array")
+            fill()
+            continue
+        
+        char = buffer[position]
+        if not started:
+            if char != "[":
+                raise ValueError(f"Expected JSON array, got {char!r}")
+            started = True
+            position += 1
+            expect_value = True
+            trailing_comma = False
+            continue
+        if char == "]":
+            if trailing_comma:
+                raise ValueError("Unexpected ']' after ',' in JSON array")
+            position += 1
+            while True:
+                rest = buffer[position:].lstrip(whitespace)
+                if rest:
+                    raise ValueError(f"Unexpected data after JSON array: {rest[:20]!r}")
+                if exhausted:
+                    return
+                position = len(buffer)
+                fill()
+        if char == ",":
+            if expect_value:
+                raise ValueError("Unexpected ',' in JSON array")
+            position += 1
+            expect_value = True
+            trailing_comma = True
+            continue
+        if not expect_value:
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+        
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            fill()
+            continue
+        # A number cut at a chunk boundary decodes as its prefix: "12" of "123",
+        # "1" of "1.5" or "-2" of "-2e10"; read on until it is terminated
+        if not exhausted and (end >= len(buffer) or buffer[end] in _NUMBER_CONTINUATION):
+            fill()
+            continue
+        position = end
+        expect_value = False
+        trailing_comma = False
+        yield value
+
+
 class APITestHelper:
     """Helper methods for API testing"""
     
@@ -139,7 +500,17 @@ class APITestHelper:
     
     @staticmethod
     def print_response(response: requests.Response, title: str = "Response"):
-        """Pretty print response for debugging"""
+        """
+        Record response for debugging
+        
+        The exchange is kept in the ring buffer and only printed into the
+        report if the test fails; with --verbose-exchanges it is printed
+        immediately, as before.
+        """
+        EXCHANGES.label(response, title)
+        if not EXCHANGES.verbose:
+            return
+        
         print(f"\n{'='*60}")
         print(f"{title}")
         print(f"{'='*60}")
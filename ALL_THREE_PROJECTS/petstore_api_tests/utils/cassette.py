@@ -0,0 +1,331 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import threading
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+MODES = ("record", "replay", "passthrough")
+
+# urllib3 already decoded the body, so these no longer describe what is stored
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """A request had no recorded response in replay mode"""
+
+
+def request_key(method: str, url: str, body: Any) -> str:
+    """
+    Cassette key of a request: method, path with sorted query, normalized body digest
+
+    JSON bodies are re-serialized with sorted keys and form bodies are sorted,
+    so key order and whitespace do not affect matching. The host is not part
+    of the key; a cassette recorded against one deployment replays against any.
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    if parts.query:
+        path += "?" + urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {path} {_body_digest(body)}"
+
+
+def _body_digest(body: Any) -> str:
+    if not body:
+        return "-"
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        normalized = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        try:
+            pairs = parse_qsl(body.decode("utf-8"), keep_blank_values=True, strict_parsing=True)
+            normalized = urlencode(sorted(pairs)).encode("utf-8")
+        except (UnicodeDecodeError, ValueError):
+            normalized = body
+    return hashlib.sha1(normalized).hexdigest()[:16]
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    requests transport adapter that records and replays HTTP exchanges
+
+    Modes:
+        record:      Send requests to the server and append every exchange
+        replay:      Answer from the cassette only; unmatched requests raise
+                     CassetteMissError and are listed in unmatched
+        passthrough: Send requests to the server, cassette untouched
+
+    A cassette is two files: <path>.data holds each exchange as one JSON
+    header line followed by the raw body, and <path>.index.json maps request
+    keys (see request_key) to [offset, length, scope] entries. Replay loads
+    only the index, on the first request, and reads bodies from a memory map
+    when they are matched, so start-up does not depend on cassette size.
+
+    The data file is flushed after every exchange and each header carries
+    its key and scope. The index is written (atomically) when the cassette
+    is ejected; if a recording was interrupted before that, replay rebuilds
+    the index from the data file, so no recorded exchange is lost.
+
+    Streamed responses (stream=True) are recorded as the caller reads them,
+    without buffering the body up front. A stream closed before its end is
+    recorded with the part that was read and flagged as truncated.
+
+    Identical requests are answered in recorded order; once exhausted the
+    last response repeats. When a scope is set (the pytest plugin uses the
+    test node id), entries recorded in the same scope are preferred, so a
+    subset of the suite replays the responses its tests originally got.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", **kwargs):
+        """
+        Args:
+            path: Cassette path without extension, e.g. "cassettes/petstore"
+            mode: "record", "replay" or "passthrough"
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use one of: {', '.join(MODES)}")
+        super().__init__(**kwargs)
+        self.path = path
+        self.mode = mode
+        self.scope: Optional[str] = None
+        self.unmatched: List[Tuple[Optional[str], str]] = []
+        self.stats = {"recorded": 0, "replayed": 0, "passed_through": 0, "unmatched": 0}
+
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, List[list]]] = None
+        self._cursors: Dict[Tuple[str, Optional[str]], int] = {}
+        self._data_file = None
+        self._data_map: Optional[mmap.mmap] = None
+        self._offset = 0
+
+    @property
+    def data_path(self) -> str:
+        return f"{self.path}.data"
+
+    @property
+    def index_path(self) -> str:
+        return f"{self.path}.index.json"
+
+    def mount(self, session: requests.Session):
+        """Route all of a session's http(s) traffic through this adapter"""
+        session.mount("http://", self)
+        session.mount("https://", self)
+
+    # ==================== TRANSPORT ====================
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == "replay":
+            return self._replay(request)
+        response = super().send(request, **kwargs)
+        if self.mode == "record":
+            if kwargs.get("stream"):
+                # Reading the body here would defeat streaming; record it as it is read
+                response.raw = _RecordingStream(response.raw, partial(self._record, request, response, self.scope))
+            else:
+                self._record(request, response, self.scope, response.content)
+        else:
+            with self._lock:
+                self.stats["passed_through"] += 1
+        return response
+
+    # ==================== RECORD ====================
+
+    def _record(self, request: requests.PreparedRequest, response: requests.Response,
+                scope: Optional[str], body: bytes, truncated: bool = False):
+        key = request_key(request.method, request.url, request.body)
+        recorded = {
+            "key": key,
+            "scope": scope,
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items()
+                        if name.lower() not in _DROPPED_HEADERS},
+            "length": len(body),
+        }
+        if truncated:
+            recorded["truncated"] = True
+        header = json.dumps(recorded, separators=(",", ":")).encode("utf-8") + b"\n"
+
+        with self._lock:
+            if self._data_file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.data_path)), exist_ok=True)
+                self._data_file = open(self.data_path, "wb")
+                self._index = {}
+            self._data_file.write(header)
+            self._data_file.write(body)
+            # An interrupted run keeps everything up to here (see _rebuild_index)
+            self._data_file.flush()
+            self._index.setdefault(key, []).append([self._offset, len(header) + len(body), scope])
+            self._offset += len(header) + len(body)
+            self.stats["recorded"] += 1
+
+    # ==================== REPLAY ====================
+
+    def _load(self):
+        if self._index is not None:
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                self._index = json.load(f)["entries"]
+        except FileNotFoundError:
+            if not os.path.exists(self.data_path):
+                raise CassetteMissError(
+                    f"Cassette {self.index_path} not found; record it first with --cassette-mode=record"
+                ) from None
+            # The recording was interrupted before eject() wrote the index
+            self._index = self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[str, List[list]]:
+        """Index entries from the headers in the data file; an incomplete last exchange is skipped"""
+        index: Dict[str, List[list]] = {}
+        with open(self.data_path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    break
+                recorded = json.loads(header)
+                length = len(header) + recorded["length"]
+                f.seek(recorded["length"], os.SEEK_CUR)
+                if f.tell() > os.fstat(f.fileno()).st_size:
+                    break
+                index.setdefault(recorded["key"], []).append([offset, length, recorded["scope"]])
+                offset += length
+        return index
+
+    def _read(self, offset: int, length: int) -> bytes:
+        if self._data_map is None:
+            with open(self.data_path, "rb") as f:
+                self._data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map[offset:offset + length]
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            self._load()
+            entries = self._index.get(key)
+            if not entries:
+                self.stats["unmatched"] += 1
+                self.unmatched.append((self.scope, key))
+                raise CassetteMissError(self._describe_miss(request, key))
+
+            scoped = [entry for entry in entries if entry[2] == self.scope]
+            candidates, cursor_key = (scoped, (key, self.scope)) if scoped else (entries, (key, None))
+            position = self._cursors.get(cursor_key, 0)
+            self._cursors[cursor_key] = position + 1
+            offset, length, _ = candidates[min(position, len(candidates) - 1)]
+            record = self._read(offset, length)
+            self.stats["replayed"] += 1
+
+        header, body = record.split(b"\n", 1)
+        return self._build_response(request, json.loads(header), body)
+
+    def _describe_miss(self, request: requests.PreparedRequest, key: str) -> str:
+        method_and_path = key.rsplit(" ", 1)[0]
+        similar = [other for other in self._index if other.rsplit(" ", 1)[0] == method_and_path]
+        message = f"No recorded response for {request.method} {request.url} (key '{key}') in {self.path}"
+        if similar:
+            message += f"; recorded with other bodies: {', '.join(similar[:5])}"
+        return message
+
+    def _build_response(self, request: requests.PreparedRequest,
+                        recorded: Dict[str, Any], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.headers["Content-Length"] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        # Answered without network; the latency report leaves it out
+        response.replayed = True
+        return response
+
+    # ==================== LIFECYCLE ====================
+
+    def eject(self):
+        """Write the index of a recording and release the cassette files"""
+        with self._lock:
+            if self._data_file is not None:
+                self._data_file.close()
+                self._data_file = None
+                # Atomic: a reader never sees a half-written index
+                temporary_path = f"{self.index_path}.tmp"
+                with open(temporary_path, "w") as f:
+                    json.dump({"version": 1, "entries": self._index}, f, separators=(",", ":"))
+                os.replace(temporary_path, self.index_path)
+            if self._data_map is not None:
+                self._data_map.close()
+                self._data_map = None
+
+
+class _RecordingStream:
+    """
+    Wraps a streamed urllib3 response and records the body once it was read
+
+    requests reads streamed bodies through stream() (iter_content) or read();
+    both pass every decoded chunk through here. The exchange is recorded when
+    the body is exhausted, or with the part read so far when it is closed early.
+    """
+
+    def __init__(self, raw, record):
+        self._raw = raw
+        self._record = record
+        self._chunks: List[bytes] = []
+        self._recorded = False
+
+    def stream(self, *args, **kwargs):
+        for chunk in self._raw.stream(*args, **kwargs):
+            self._chunks.append(chunk)
+            yield chunk
+        self._finish(truncated=False)
+
+    def read(self, *args, **kwargs):
+        chunk = self._raw.read(*args, **kwargs)
+        if chunk:
+            self._chunks.append(chunk)
+        else:
+            self._finish(truncated=False)
+        return chunk
+
+    def close(self):
+        self._finish(truncated=True)
+        self._raw.close()
+
+    def _finish(self, truncated: bool):
+        if not self._recorded:
+            self._recorded = True
+            self._record(b"".join(self._chunks), truncated)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+_ACTIVE: Optional[CassetteAdapter] = None
+
+
+def activate(adapter: Optional[CassetteAdapter]):
+    """Make every PetStoreAPIClient created from now on use adapter (None disables)"""
+    global _ACTIVE
+    _ACTIVE = adapter
+
+
+def active() -> Optional[CassetteAdapter]:
+    return _ACTIVE
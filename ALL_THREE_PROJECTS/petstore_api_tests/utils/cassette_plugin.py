@@ -0,0 +1,85 @@
+"""
+Pytest plugin: record Petstore exchanges once and replay them without network
+
+Every PetStoreAPIClient created during the session routes its requests
+through a utils.cassette.CassetteAdapter. Each test is used as the cassette
+scope and re-seeds `random` from its node id, so the randomly generated pets
+are identical between recording and replay.
+
+Options:
+    --cassette=PATH          Cassette path without extension (enables the plugin)
+    --cassette-mode=MODE     record, replay (default) or passthrough
+
+Example:
+    pytest tests/ --cassette=cassettes/petstore --cassette-mode=record
+    pytest tests/ --cassette=cassettes/petstore
+"""
+
+import random
+
+import pytest
+
+from utils import cassette
+from utils.cassette import CassetteAdapter, MODES
+
+
+def pytest_addoption(parser):
+    """Add cassette options"""
+    group = parser.getgroup("cassette", "Petstore record/replay")
+    group.addoption(
+        "--cassette",
+        action="store",
+        default=None,
+        help="Cassette path without extension, e.g. cassettes/petstore"
+    )
+    group.addoption(
+        "--cassette-mode",
+        action="store",
+        default="replay",
+        choices=MODES,
+        help="record: call the API and save exchanges; replay: answer from the cassette; "
+             "passthrough: call the API, cassette untouched"
+    )
+
+
+def pytest_configure(config):
+    """Activate the cassette for every client created in this session"""
+    path = config.getoption("--cassette")
+    if not path:
+        return
+    adapter = CassetteAdapter(path, config.getoption("--cassette-mode"))
+    config._cassette = adapter
+    cassette.activate(adapter)
+
+
+def pytest_unconfigure(config):
+    adapter = getattr(config, "_cassette", None)
+    if adapter is not None:
+        adapter.eject()
+        cassette.activate(None)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Scope exchanges to the test and make its generated data reproducible"""
+    adapter = getattr(item.config, "_cassette", None)
+    if adapter is None:
+        return
+    adapter.scope = item.nodeid
+    if adapter.mode != "passthrough":
+        random.seed(item.nodeid)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Summarize cassette usage and list unmatched requests"""
+    adapter = getattr(config, "_cassette", None)
+    if adapter is None:
+        return
+    stats = adapter.stats
+    terminalreporter.section(f"Cassette ({adapter.mode}: {adapter.path})")
+    terminalreporter.write_line(
+        f"{stats['recorded']} recorded, {stats['replayed']} replayed, "
+        f"{stats['passed_through']} passed through, {stats['unmatched']} unmatched"
+    )
+    for scope, key in adapter.unmatched:
+        terminalreporter.write_line(f"Unmatched: {key}  (in {scope or 'session'})", red=True)
@@ -0,0 +1,381 @@
+"""
+Pytest plugin: run I/O-bound API tests concurrently in one process
+
+Consecutive tests of the same class (or module) are run on a thread pool,
+so tests waiting on the network overlap. Tests declare the resources they
+touch with @pytest.mark.resources("pet:999999", ...); tests sharing a key
+never overlap and keep their collection order, independent tests do.
+
+The first and last test of each group run on the main thread as usual, so
+class/module/session fixtures are set up and torn down exactly as in a
+serial run. Every test still gets its own setup/call/teardown reports,
+captured output and exchange log; reports are emitted on the main thread
+as tests complete.
+
+Options:
+    --concurrency=N   Number of tests in flight at once (default 1 = serial)
+
+Record/replay cassettes re-seed the shared random generator per test, so
+the run falls back to serial while --cassette records or replays.
+
+Limitations (concurrent tests only; serial runs are plain pytest):
+  * Worker threads drive pytest internals (SetupState, the request's
+    fixture definitions, the capture manager's global capture), so
+    --concurrency > 1 refuses to run on any pytest but SUPPORTED_PYTEST.
+  * Concurrent tests run setup/call/teardown through runtestprotocol, not
+    through pytest_runtest_protocol. Wrappers of that hook are bypassed:
+    the warnings plugin (warnings are not captured or turned into errors
+    by filterwarnings) and third-party ones such as timeouts or reruns.
+  * The logging plugin installs its handlers process-wide, so log sections
+    and caplog would mix records of overlapping tests.
+  Tests requesting caplog, recwarn, capsys/capfd or monkeypatch, or marked
+  filterwarnings, are therefore always run on the main thread, alone.
+"""
+
+import copy
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import pytest
+from _pytest.capture import CaptureResult
+from _pytest.runner import SetupState, runtestprotocol
+
+from utils.exchange_log import EXCHANGES
+
+
+# The only pytest release whose internals the worker threads are verified against
+SUPPORTED_PYTEST = "8.3.4"
+
+# Fixtures relying on process-wide state that pytest swaps per test
+MAIN_THREAD_FIXTURES = frozenset({"caplog", "recwarn", "capsys", "capsysbinary", "capfd", "capfdbinary",
+                                  "monkeypatch"})
+
+
+def pytest_addoption(parser):
+    """Add concurrency options"""
+    group = parser.getgroup("concurrency", "Concurrent test execution")
+    group.addoption(
+        "--concurrency",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of I/O-bound tests run at once within a class (default 1 = serial)"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "resources(*keys): resources a test touches; tests sharing a key never run concurrently"
+    )
+    if config.getoption("--concurrency") > 1 and pytest.__version__ != SUPPORTED_PYTEST:
+        raise pytest.UsageError(
+            f"--concurrency relies on pytest internals and is only supported on pytest {SUPPORTED_PYTEST} "
+            f"(installed: {pytest.__version__}); run with --concurrency=1"
+        )
+
+
+def resource_keys(item: pytest.Item) -> FrozenSet[str]:
+    """Union of the keys of all resources markers on an item"""
+    keys = set()
+    for marker in item.iter_markers("resources"):
+        keys.update(str(key) for key in marker.args)
+    return frozenset(keys)
+
+
+def runs_serially(item: pytest.Item) -> bool:
+    """Whether an item needs pytest's per-test global state and must run alone on the main thread"""
+    if MAIN_THREAD_FIXTURES.intersection(getattr(item, "fixturenames", ())):
+        return True
+    return item.get_closest_marker("filterwarnings") is not None
+
+
+# ==================== PER-THREAD PYTEST STATE ====================
+
+class _ThreadLocalSetupState:
+    """Stands in for session._setupstate; worker threads get their own stack"""
+
+    def __init__(self, main: SetupState):
+        self.main = main
+        self._local = threading.local()
+
+    def activate(self, state: Optional[SetupState]):
+        self._local.state = state
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, "state", None) or self.main, name)
+
+
+def _isolate_function_fixtures(item: pytest.Item):
+    """
+    Give an item private copies of its function-scoped fixture definitions
+
+    pytest caches a fixture's value and finalizers on its FixtureDef, which
+    all tests share; two overlapping tests would otherwise receive each
+    other's function-scoped fixture values.
+    """
+    arg2fixturedefs = item._request._arg2fixturedefs
+    for name, fixturedefs in list(arg2fixturedefs.items()):
+        private = []
+        for fixturedef in fixturedefs:
+            if fixturedef.scope == "function":
+                fixturedef = copy.copy(fixturedef)
+                fixturedef.cached_result = None
+                fixturedef._finalizers = []
+            private.append(fixturedef)
+        arg2fixturedefs[name] = private
+
+
+class _ThreadCapture:
+    """
+    Replacement for the capture manager's global capture while tests overlap
+
+    pytest captures output by swapping sys.stdout/sys.stderr process-wide,
+    which cannot separate two threads. Here the streams are routed to
+    per-thread buffers, so each test's report keeps only its own output.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self._local = threading.local()
+
+    def _buffers(self) -> List[List[str]]:
+        if not hasattr(self._local, "buffers"):
+            self._local.buffers = [[], []]
+            self._local.active = False
+        return self._local.buffers
+
+    def write(self, index: int, text: str) -> bool:
+        """Buffer text written by a capturing thread; False if not capturing"""
+        if not getattr(self._local, "active", False):
+            return False
+        self._buffers()[index].append(text)
+        return True
+
+    def start_capturing(self):
+        self._buffers()
+        self._local.active = True
+
+    resume_capturing = start_capturing
+
+    def suspend_capturing(self, in_: bool = False):
+        self._buffers()
+        self._local.active = False
+
+    def is_started(self) -> bool:
+        return getattr(self._local, "active", False)
+
+    def readouterr(self):
+        buffers = self._buffers()
+        out, err = "".join(buffers[0]), "".join(buffers[1])
+        self._local.buffers = [[], []]
+        return CaptureResult(out, err)
+
+    def pop_outerr_to_orig(self):
+        self.original.pop_outerr_to_orig()
+
+    def stop_capturing(self):
+        self.original.stop_capturing()
+
+
+class _RoutedStream:
+    """sys.stdout/sys.stderr proxy writing into the current thread's capture buffer"""
+
+    def __init__(self, target, capture: _ThreadCapture, index: int):
+        self._target = target
+        self._capture = capture
+        self._index = index
+
+    def write(self, text: str) -> int:
+        if not self._capture.write(self._index, text):
+            self._target.write(text)
+        return len(text)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+# ==================== SCHEDULER ====================
+
+class ConcurrentRunner:
+    """Runs session.items with overlapping tests inside each class/module"""
+
+    def __init__(self, session: pytest.Session, workers: int):
+        self.session = session
+        self.workers = workers
+        self.concurrent_tests = 0
+        self.test_time_s = 0.0
+        self.wall_time_s = 0.0
+        self._setup_lock = threading.Lock()
+        self._merge_lock = threading.Lock()
+        self._setupstate: Optional[_ThreadLocalSetupState] = None
+
+    def run(self):
+        items = self.session.items
+        groups: List[List[pytest.Item]] = []
+        for item in items:
+            # A test that must run alone is a group of its own, which runs serially
+            if runs_serially(item):
+                groups.append([item])
+            elif groups and groups[-1][0].parent is item.parent and not runs_serially(groups[-1][0]):
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+
+        self._setupstate = _ThreadLocalSetupState(self.session._setupstate)
+        self.session._setupstate = self._setupstate
+        try:
+            position = 0
+            for group in groups:
+                position += len(group)
+                nextitem = items[position] if position < len(items) else None
+                if len(group) < 3:
+                    for index, item in enumerate(group):
+                        self._run_serial(item, group[index + 1] if index + 1 < len(group) else nextitem)
+                    continue
+                # First and last run serially: they set up and tear down the shared scopes
+                self._run_serial(group[0], group[1])
+                self._run_concurrent(group[1:-1], keeper=group[-1])
+                self._run_serial(group[-1], nextitem)
+        finally:
+            self.session._setupstate = self._setupstate.main
+
+    def _check_stop(self):
+        if self.session.shouldfail:
+            raise self.session.Failed(self.session.shouldfail)
+        if self.session.shouldstop:
+            raise self.session.Interrupted(self.session.shouldstop)
+
+    def _run_serial(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+        self._check_stop()
+
+    def _run_concurrent(self, items: List[pytest.Item], keeper: pytest.Item):
+        capman = self.session.config.pluginmanager.getplugin("capturemanager")
+        capture = None
+        if capman is not None and capman.is_globally_capturing():
+            capture = _ThreadCapture(capman._global_capturing)
+            capman._global_capturing = capture
+            stdout, stderr = sys.stdout, sys.stderr
+            sys.stdout = _RoutedStream(stdout, capture, 0)
+            sys.stderr = _RoutedStream(stderr, capture, 1)
+
+        started = time.perf_counter()
+        try:
+            self._schedule(items, keeper)
+        finally:
+            self.wall_time_s += time.perf_counter() - started
+            if capture is not None:
+                sys.stdout, sys.stderr = stdout, stderr
+                capman._global_capturing = capture.original
+        self._check_stop()
+
+    def _schedule(self, items: List[pytest.Item], keeper: pytest.Item):
+        pending = list(items)
+        running: Dict[Any, pytest.Item] = {}
+        held = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pytest-concurrent") as executor:
+            while pending or running:
+                # Start every test whose resources are free and not claimed by an
+                # earlier waiting test, so conflicting tests keep their order
+                claimed = set()
+                for item in list(pending):
+                    if len(running) >= self.workers:
+                        break
+                    keys = resource_keys(item)
+                    if keys & held or keys & claimed:
+                        claimed |= keys
+                        continue
+                    pending.remove(item)
+                    held |= keys
+                    running[executor.submit(self._run_item, item, keeper)] = item
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = running.pop(future)
+                    held -= resource_keys(item)
+                    self._log_reports(item, future.result())
+                if self.session.shouldfail or self.session.shouldstop:
+                    pending.clear()
+
+    def _run_item(self, item: pytest.Item, keeper: pytest.Item) -> List[pytest.TestReport]:
+        """Run one test's protocol on a worker thread"""
+        main = self._setupstate.main
+        state = SetupState()
+        # Collectors are already set up by the group's first test
+        state.stack = {node: ([], exc) for node, (_, exc) in main.stack.items()}
+        self._setupstate.activate(state)
+        _isolate_function_fixtures(item)
+        started = time.perf_counter()
+        try:
+            with EXCHANGES.scope(item.nodeid):
+                # Tearing down towards the group's last test pops only this test
+                return runtestprotocol(item, log=False, nextitem=keeper)
+        finally:
+            self._setupstate.activate(None)
+            with self._merge_lock:
+                self.concurrent_tests += 1
+                self.test_time_s += time.perf_counter() - started
+                # Finalizers of shared scopes first requested by this test
+                for node, (finalizers, _) in state.stack.items():
+                    if node in main.stack:
+                        main.stack[node][0].extend(finalizers)
+
+    def _log_reports(self, item: pytest.Item, reports: List[pytest.TestReport]):
+        ihook = item.ihook
+        ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for report in reports:
+            ihook.pytest_runtest_logreport(report=report)
+        ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        """Fixture setup is cheap; serializing it keeps shared fixture caches race-free"""
+        with self._setup_lock:
+            yield
+
+
+# ==================== HOOKS ====================
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """Replace the serial test loop when --concurrency > 1"""
+    config = session.config
+    workers = config.getoption("--concurrency")
+    if workers <= 1 or config.option.collectonly or config.getoption("usepdb", False):
+        return None
+    cassette = getattr(config, "_cassette", None)
+    if cassette is not None and cassette.mode != "passthrough":
+        return None
+
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        raise session.Interrupted(
+            "%d error%s during collection" % (session.testsfailed, "s" if session.testsfailed != 1 else "")
+        )
+
+    runner = ConcurrentRunner(session, workers)
+    config._concurrent_runner = runner
+    config.pluginmanager.register(runner, "concurrent-runner")
+    try:
+        runner.run()
+    finally:
+        config.pluginmanager.unregister(runner)
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report the wall time of the overlapping tests next to their summed durations"""
+    runner = getattr(config, "_concurrent_runner", None)
+    if runner is None or not runner.concurrent_tests:
+        return
+    # Tests that overlap run slower than alone, so the summed time is not
+    # what a serial run would take and no saving is derived from it
+    terminalreporter.section("Concurrent execution")
+    terminalreporter.write_line(
+        f"{runner.concurrent_tests} tests in {runner.wall_time_s * 1000:.0f}ms wall time "
+        f"on {runner.workers} threads; summed per-test time {runner.test_time_s * 1000:.0f}ms"
+    )
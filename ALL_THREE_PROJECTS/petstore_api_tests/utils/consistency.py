@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from utils.latency import percentile
+
+
+class ConsistencyTimeoutError(AssertionError):
+    """The expected state was not observed before the deadline"""
+
+
+class ConsistencyRecorder:
+    """
+    Collects time-to-consistency samples per condition (thread-safe)
+
+    Each sample is the time from the write's completion until the read that
+    observed the expected state was sent, i.e. an upper bound of the
+    replication lag the test saw (read latencies are not included).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._attempts: Dict[str, int] = {}
+        self._timeouts: Dict[str, int] = {}
+
+    def record(self, condition: str, elapsed_ms: float, attempts: int, converged: bool):
+        with self._lock:
+            self._attempts[condition] = self._attempts.get(condition, 0) + attempts
+            self._samples.setdefault(condition, [])
+            if converged:
+                self._samples[condition].append(elapsed_ms)
+            else:
+                self._timeouts[condition] = self._timeouts.get(condition, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._attempts.clear()
+            self._timeouts.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per condition: waits, timeouts, reads per wait and time-to-consistency percentiles"""
+        with self._lock:
+            result = {}
+            for condition in sorted(self._samples):
+                values = sorted(self._samples[condition])
+                timeouts = self._timeouts.get(condition, 0)
+                waits = len(values) + timeouts
+                result[condition] = {
+                    "waits": waits,
+                    "timeouts": timeouts,
+                    "reads_per_wait": self._attempts[condition] / waits,
+                    "p50": percentile(values, 50) if values else None,
+                    "p95": percentile(values, 95) if values else None,
+                    "max": values[-1] if values else None,
+                }
+            return result
+
+
+# Process-wide recorder reported by the latency plugin
+CONSISTENCY = ConsistencyRecorder()
+
+
+def poll_until(fetch: Callable[[], requests.Response],
+               check: Callable[[requests.Response], Optional[str]],
+               condition: str, timeout_s: float = 10.0, initial_delay_s: float = 0.1,
+               max_delay_s: float = 2.0, multiplier: float = 2.0,
+               recorder: ConsistencyRecorder = CONSISTENCY,
+               since: Optional[float] = None) -> requests.Response:
+    """
+    Read until the expected state is observed, backing off exponentially
+
+    Args:
+        fetch: Performs one read
+        check: Returns None when the response shows the expected state,
+               otherwise a short description of what was seen instead
+        condition: Metric name, e.g. "pet exists"
+        timeout_s: Deadline for the whole wait
+        initial_delay_s: Pause after the first unsuccessful read
+        max_delay_s: Upper bound for the pause between reads
+        multiplier: Growth factor of the pause
+        recorder: Receives the time-to-consistency sample
+        since: time.perf_counter() when the write completed; defaults to now
+
+    Returns:
+        The first response showing the expected state
+
+    Raises:
+        ConsistencyTimeoutError: The state was not observed before the deadline
+    """
+    started = time.perf_counter()
+    since = started if since is None else min(since, started)
+    deadline = started + timeout_s
+    delay = initial_delay_s
+    attempts = 0
+    while True:
+        sent = time.perf_counter()
+        response = fetch()
+        attempts += 1
+        mismatch = check(response)
+        if mismatch is None:
+            # The state was visible when this read was sent; its latency is not lag
+            recorder.record(condition, (sent - since) * 1000, attempts, converged=True)
+            return response
+        now = time.perf_counter()
+        if now >= deadline:
+            recorder.record(condition, (now - since) * 1000, attempts, converged=False)
+            raise ConsistencyTimeoutError(
+                f"{condition}: not observed after {attempts} reads in {timeout_s:g}s (last read: {mismatch})"
+            )
+        # Never sleep past the deadline; the last read happens right at it
+        time.sleep(min(delay, deadline - now))
+        delay = min(delay * multiplier, max_delay_s)
@@ -0,0 +1,177 @@
+import contextlib
+import contextvars
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+import requests
+
+
+class Exchange:
+    """One captured request/response pair; formatting happens only in render()"""
+
+    __slots__ = ("title", "timestamp", "method", "url", "request_body", "status_code",
+                 "elapsed_ms", "headers", "body", "body_size", "exchange_id")
+
+    def __init__(self, response: requests.Response, max_body_bytes: int, streamed: bool, exchange_id: int):
+        request = response.request
+        self.title: Optional[str] = None
+        self.timestamp = time.time()
+        self.method = request.method
+        self.url = request.url
+        request_body = request.body
+        if isinstance(request_body, str):
+            request_body = request_body.encode()
+        self.request_body = request_body[:max_body_bytes] if request_body else b""
+        self.status_code = response.status_code
+        self.elapsed_ms = response.elapsed.total_seconds() * 1000
+        self.headers = response.headers
+        if streamed:
+            # Reading the body would defeat streaming
+            self.body = None
+            self.body_size = None
+        else:
+            content = response.content or b""
+            self.body = content[:max_body_bytes]
+            self.body_size = len(content)
+        # id(response) would be reused once the response is garbage collected;
+        # the log's counter never repeats, and the response carries it along
+        self.exchange_id = exchange_id
+        response._exchange_id = exchange_id
+
+    def render(self) -> str:
+        """Format the exchange the way APITestHelper.print_response used to"""
+        lines = [
+            "=" * 60,
+            self.title or f"{self.method} {self.url}",
+            "=" * 60,
+            f"Request: {self.method} {self.url}",
+        ]
+        if self.request_body:
+            lines.append(f"Request Body: {_format_body(self.request_body, None)}")
+        lines += [
+            f"Status Code: {self.status_code}",
+            f"Response Time: {self.elapsed_ms:.2f}ms",
+            f"Headers: {dict(self.headers)}",
+        ]
+        if self.body is None:
+            lines.append("Body: <streamed, not captured>")
+        else:
+            lines.append(f"Body: {_format_body(self.body, self.body_size)}")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+
+def _format_body(body: bytes, full_size: Optional[int]) -> str:
+    truncated = full_size is not None and full_size > len(body)
+    if not truncated:
+        try:
+            return json.dumps(json.loads(body), indent=2)
+        except ValueError:
+            pass
+    text = body.decode("utf-8", errors="replace")
+    if truncated:
+        text += f"\n... [truncated, {full_size} bytes total]"
+    return text
+
+
+class ExchangeLog:
+    """
+    Bounded ring buffer of recent request/response exchanges
+
+    Recording keeps references and a size-capped copy of the body; JSON
+    re-indenting and header formatting are deferred to render(), which the
+    pytest plugin only calls for failed tests. In verbose mode
+    APITestHelper.print_response keeps printing every response eagerly.
+
+    Tests running concurrently each get their own buffer via scope(); the
+    scope is a context variable, so it follows work copied into other
+    threads with contextvars.copy_context() (see HedgingPolicy).
+    """
+
+    def __init__(self, max_exchanges: int = 20, max_body_bytes: int = 4096):
+        self.max_body_bytes = max_body_bytes
+        self.verbose = False
+        self._max_exchanges = max_exchanges
+        self._buffers: Dict[Optional[str], Deque[Exchange]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._scope: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+            "exchange_scope", default=None)
+
+    @property
+    def _exchanges(self) -> Deque[Exchange]:
+        """Buffer of the current scope"""
+        scope = self._scope.get()
+        with self._lock:
+            buffer = self._buffers.get(scope)
+            if buffer is None:
+                buffer = self._buffers[scope] = deque(maxlen=self._max_exchanges)
+            return buffer
+
+    @contextlib.contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """Capture into a separate buffer (e.g. one per concurrently running test)"""
+        token = self._scope.set(name)
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+            with self._lock:
+                self._buffers.pop(name, None)
+
+    def response_hook(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        """requests response hook; register with session.hooks['response']"""
+        streamed = bool(kwargs.get("stream"))
+        self._exchanges.append(Exchange(response, self.max_body_bytes, streamed, next(self._ids)))
+        return response
+
+    def _find(self, response: requests.Response) -> Optional[Exchange]:
+        exchange_id = getattr(response, "_exchange_id", None)
+        if exchange_id is None:
+            return None
+        for exchange in reversed(self._exchanges):
+            if exchange.exchange_id == exchange_id:
+                return exchange
+        return None
+
+    def label(self, response: requests.Response, title: str):
+        """Attach a title to the captured exchange of a response"""
+        exchange = self._find(response)
+        if exchange is None:
+            # Response did not go through a capturing session; capture it now
+            exchange = Exchange(response, self.max_body_bytes, streamed=False, exchange_id=next(self._ids))
+            self._exchanges.append(exchange)
+        exchange.title = title
+
+    def complete(self, response: requests.Response):
+        """Capture the body of a streamed response that was read in full afterwards (hedged GETs)"""
+        exchange = self._find(response)
+        if exchange is not None and exchange.body is None:
+            content = response.content or b""
+            exchange.body = content[:self.max_body_bytes]
+            exchange.body_size = len(content)
+
+    def resize(self, max_exchanges: int):
+        """Change the buffer size, keeping the most recent exchanges"""
+        with self._lock:
+            self._max_exchanges = max_exchanges
+            self._buffers = {scope: deque(buffer, maxlen=max_exchanges)
+                             for scope, buffer in self._buffers.items()}
+
+    def clear(self):
+        self._exchanges.clear()
+
+    def exchanges(self) -> List[Exchange]:
+        return list(self._exchanges)
+
+    def render(self) -> str:
+        """Format all buffered exchanges, oldest first"""
+        return "\n\n".join(exchange.render() for exchange in self.exchanges())
+
+
+# Process-wide log shared by every PetStoreAPIClient
+EXCHANGES = ExchangeLog()
@@ -0,0 +1,65 @@
+"""
+Pytest plugin: show recent API exchanges only for failed tests
+
+Every request made through PetStoreAPIClient is kept in a small ring buffer
+(utils.exchange_log.EXCHANGES). The buffer is cleared before each test and
+rendered into the report of tests that fail, so passing tests pay neither
+the formatting cost nor the log volume.
+
+Options:
+    --verbose-exchanges      Print every response eagerly (previous behavior)
+    --exchange-buffer=N      Number of exchanges kept per test (default 20)
+    --exchange-body-bytes=N  Bytes of each body kept (default 4096)
+"""
+
+import pytest
+
+from utils.exchange_log import EXCHANGES
+
+
+def pytest_addoption(parser):
+    """Add exchange capture options"""
+    group = parser.getgroup("exchanges", "Petstore API exchange capture")
+    group.addoption(
+        "--verbose-exchanges",
+        action="store_true",
+        default=False,
+        help="Print every API response as it happens instead of only on failure"
+    )
+    group.addoption(
+        "--exchange-buffer",
+        action="store",
+        type=int,
+        default=20,
+        help="Number of recent API exchanges kept per test"
+    )
+    group.addoption(
+        "--exchange-body-bytes",
+        action="store",
+        type=int,
+        default=4096,
+        help="Maximum bytes of each request/response body kept"
+    )
+
+
+def pytest_configure(config):
+    """Size the shared exchange log"""
+    EXCHANGES.verbose = config.getoption("--verbose-exchanges")
+    EXCHANGES.max_body_bytes = config.getoption("--exchange-body-bytes")
+    EXCHANGES.resize(config.getoption("--exchange-buffer"))
+
+
+def pytest_runtest_setup(item):
+    """Start every test with an empty buffer"""
+    EXCHANGES.clear()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach the buffered exchanges to the report of a failed test"""
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed and not EXCHANGES.verbose:
+        rendered = EXCHANGES.render()
+        if rendered:
+            report.sections.append((f"Recent API exchanges ({report.when})", rendered))
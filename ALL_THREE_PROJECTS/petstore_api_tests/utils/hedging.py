@@ -0,0 +1,227 @@
+import contextvars
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional
+
+import requests
+
+from utils.latency import percentile
+
+
+RETRYABLE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class HedgingPolicy:
+    """
+    Hedged requests and jittered retries for idempotent GETs
+
+    The primary request is sent at once. If it has not answered after the
+    hedge delay (a percentile of recently observed latencies for the same
+    endpoint), an identical hedge request is sent and whichever answers first
+    wins; the loser's connection is closed as soon as its headers arrive, so
+    its body is never downloaded. Connection errors and timeouts are retried
+    with full-jitter exponential backoff.
+
+    The hedge delay is a percentile of every attempt that answered,
+    including primaries that lost to their hedge, so slow primaries are not
+    left out of the window. Every attempt is sent with attempt_timeout_s.
+
+    Hedges and retries share one budget: extra requests never exceed
+    budget_ratio x primary requests (at most 1.0, i.e. never more than
+    double the load), with a minimum of one so the first slow request can
+    be hedged. Use the policy as a context manager, or call shutdown(), to
+    stop its threads.
+    """
+
+    def __init__(self, hedge_percentile: float = 95.0, initial_delay_ms: float = 500.0,
+                 min_delay_ms: float = 10.0, window_size: int = 200, min_samples: int = 20,
+                 max_retries: int = 2, backoff_base_s: float = 0.1, backoff_cap_s: float = 2.0,
+                 budget_ratio: float = 0.5, attempt_timeout_s: float = 10.0, max_workers: int = 16):
+        """
+        Args:
+            hedge_percentile: Latency percentile after which a hedge is sent
+            initial_delay_ms: Hedge delay used until min_samples latencies were seen
+            min_delay_ms: Lower bound for the hedge delay
+            window_size: Number of recent latencies kept per endpoint
+            min_samples: Samples needed before the percentile is trusted
+            max_retries: Retries after connection errors / timeouts
+            backoff_base_s: First retry backoff ceiling (doubles per attempt)
+            backoff_cap_s: Maximum backoff ceiling
+            budget_ratio: Maximum extra requests (hedges + retries) per primary request;
+                          0.0 disables hedges and retries
+            attempt_timeout_s: requests timeout of every primary, hedge and retry
+            max_workers: Threads available for in-flight primaries and hedges
+        """
+        if not 0.0 <= budget_ratio <= 1.0:
+            raise ValueError("budget_ratio must be between 0.0 and 1.0")
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_cap_s = backoff_cap_s
+        self.budget_ratio = budget_ratio
+        self.attempt_timeout_s = attempt_timeout_s
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        # Policies dropped without shutdown() still stop their threads
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False, cancel_futures=True)
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        self.primaries = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.retries = 0
+        self.budget_denials = 0
+
+    # ==================== BUDGET ====================
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            extra = self.hedges_sent + self.retries
+            # At least one token, or the first hedge/retry would always be denied
+            allowance = max(1.0, self.budget_ratio * self.primaries) if self.budget_ratio > 0 else 0.0
+            if extra + 1 <= allowance:
+                return True
+            self.budget_denials += 1
+            return False
+
+    # ==================== LATENCY WINDOW ====================
+
+    def hedge_delay_ms(self, endpoint: str) -> float:
+        """Current hedge delay for an endpoint"""
+        with self._lock:
+            window = self._latencies.get(endpoint)
+            if not window or len(window) < self.min_samples:
+                return self.initial_delay_ms
+            values = sorted(window)
+        return max(self.min_delay_ms, percentile(values, self.hedge_percentile))
+
+    def _observe(self, endpoint: str, response: requests.Response):
+        with self._lock:
+            window = self._latencies.setdefault(endpoint, deque(maxlen=self.window_size))
+            window.append(response.elapsed.total_seconds() * 1000)
+
+    # ==================== EXECUTION ====================
+
+    def execute(self, send: Callable[..., requests.Response], endpoint: str) -> requests.Response:
+        """
+        Run an idempotent request with hedging and retries
+
+        Args:
+            send: Sends the request; called with stream=True so a losing
+                  attempt can be dropped without reading its body
+            endpoint: Key for the latency window, e.g. "GET /pet/{petId}"
+
+        Returns:
+            The winning response with its body read. Response hooks saw every
+            attempt as streamed; callers recording bodies re-record the winner
+            (see PetStoreAPIClient._get)
+        """
+        with self._lock:
+            self.primaries += 1
+
+        attempt = 0
+        while True:
+            try:
+                response = self._hedged(send, endpoint)
+                # Read the winner's body here; the loser is closed unread
+                _ = response.content
+                return response
+            except RETRYABLE_EXCEPTIONS:
+                if attempt >= self.max_retries or not self._take_budget():
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                ceiling = min(self.backoff_cap_s, self.backoff_base_s * 2 ** (attempt - 1))
+                time.sleep(random.uniform(0, ceiling))
+
+    def _submit(self, send: Callable[..., requests.Response]) -> Future:
+        # Run attempts in the caller's context so per-test state (e.g. the
+        # exchange log scope) follows them into the pool threads
+        return self._executor.submit(contextvars.copy_context().run, send, stream=True,
+                                     timeout=self.attempt_timeout_s)
+
+    def _hedged(self, send: Callable[..., requests.Response], endpoint: str) -> requests.Response:
+        primary = self._submit(send)
+        try:
+            response = primary.result(timeout=self.hedge_delay_ms(endpoint) / 1000)
+            self._observe(endpoint, response)
+            return response
+        except TimeoutError:
+            pass
+
+        if not self._take_budget():
+            response = primary.result()
+            self._observe(endpoint, response)
+            return response
+
+        hedge = self._submit(send)
+        with self._lock:
+            self.hedges_sent += 1
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                winner = future.result()
+                if future is hedge:
+                    with self._lock:
+                        self.hedges_won += 1
+                for loser in pending:
+                    # Not started yet: never sent. Otherwise closed once its headers arrive,
+                    # and its latency still counts towards the hedge delay
+                    if not loser.cancel():
+                        loser.add_done_callback(partial(self._drop_loser, endpoint))
+                # Another attempt in `done` finished at the same moment
+                for other in done - {future}:
+                    self._drop_loser(endpoint, other)
+                self._observe(endpoint, winner)
+                return winner
+        raise error
+
+    def _drop_loser(self, endpoint: str, future: Future):
+        """Close a losing attempt without downloading its body, recording its latency"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response = future.result()
+        self._observe(endpoint, response)
+        response.close()
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "primaries": self.primaries,
+                "hedges_sent": self.hedges_sent,
+                "hedges_won": self.hedges_won,
+                "hedge_win_rate": self.hedges_won / self.hedges_sent if self.hedges_sent else 0.0,
+                "retries": self.retries,
+                "budget_denials": self.budget_denials,
+                "extra_load_ratio": (self.hedges_sent + self.retries) / self.primaries
+                if self.primaries else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop the attempt threads; attempts not started yet are cancelled"""
+        self._finalizer()
+
+    def __enter__(self) -> "HedgingPolicy":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,146 @@
+import json
+import os
+import typing
+import warnings
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional fast path
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional fast path
+    msgspec = None
+
+
+class JSONCodec:
+    """Stdlib JSON codec; the fast codecs below share its interface"""
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data: bytes, expected_type: Optional[Any] = None) -> Any:
+        """
+        Parse JSON, optionally checking the result against expected_type
+
+        Args:
+            data: Raw JSON bytes
+            expected_type: e.g. dict, list or List[Dict[str, Any]]; only the
+                           outer type is checked by the stdlib/orjson codecs
+
+        Raises:
+            ValueError: Invalid JSON or unexpected type
+        """
+        value = self._loads(data)
+        _check_outer_type(value, expected_type)
+        return value
+
+    def _loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """orjson: Rust-backed, encodes straight to bytes"""
+
+    name = "orjson"
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # orjson rejects integers beyond 64 bits and non-str keys
+            return super().encode(obj)
+
+    def _loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """msgspec: fast codec that validates full typed structures while decoding"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoders = {}
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return self._encoder.encode(obj)
+        except (TypeError, OverflowError):
+            return super().encode(obj)
+
+    def decode(self, data: bytes, expected_type: Optional[Any] = None) -> Any:
+        decoder = self._decoders.get(expected_type)
+        if decoder is None:
+            decoder = msgspec.json.Decoder(expected_type if expected_type is not None else Any)
+            self._decoders[expected_type] = decoder
+        try:
+            return decoder.decode(data)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            raise ValueError(str(e)) from e
+
+
+def _check_outer_type(value: Any, expected_type: Optional[Any]):
+    if expected_type is None or expected_type is Any:
+        return
+    outer = typing.get_origin(expected_type) or expected_type
+    if isinstance(outer, type) and not isinstance(value, outer):
+        raise ValueError(f"Expected JSON {outer.__name__}, got {type(value).__name__}")
+
+
+CODECS = {
+    "orjson": OrjsonCodec if orjson is not None else None,
+    "msgspec": MsgspecCodec if msgspec is not None else None,
+    "json": JSONCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Return a codec by name, or the fastest installed one
+
+    Args:
+        name: "orjson", "msgspec" or "json"; defaults to PETSTORE_JSON_CODEC,
+              then the first installed of orjson, msgspec, json
+
+    Raises:
+        ValueError: Unknown codec, or the requested library is not installed
+    """
+    name = name or os.environ.get("PETSTORE_JSON_CODEC")
+    if name:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec '{name}'. Use one of: {', '.join(CODECS)}")
+        if CODECS[name] is None:
+            raise ValueError(f"JSON codec '{name}' is not installed (pip install {name})")
+        return CODECS[name]()
+    for codec_class in CODECS.values():
+        if codec_class is not None:
+            return codec_class()
+
+
+_DEFAULT: Optional[JSONCodec] = None
+
+
+def default_codec() -> JSONCodec:
+    """
+    Codec used by PetStoreAPIClient unless another one is passed in
+
+    Resolved on first use, not at import. An unknown or uninstalled
+    PETSTORE_JSON_CODEC falls back to the fastest installed codec with a
+    RuntimeWarning instead of breaking every client.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        try:
+            _DEFAULT = get_codec()
+        except ValueError as e:
+            fallback = get_codec(next(name for name, codec_class in CODECS.items() if codec_class is not None))
+            warnings.warn(f"{e}; using {fallback.name} instead", RuntimeWarning, stacklevel=2)
+            _DEFAULT = fallback
+    return _DEFAULT
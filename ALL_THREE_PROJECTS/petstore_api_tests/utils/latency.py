@@ -0,0 +1,149 @@
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+
+# Concrete request paths are folded into their swagger templates so that
+# every pet ID lands in the same bucket
+PATH_TEMPLATES = [
+    (re.compile(r"^/pet/findByStatus$"), "/pet/findByStatus"),
+    (re.compile(r"^/pet/findByTags$"), "/pet/findByTags"),
+    (re.compile(r"^/pet/[^/]+/uploadImage$"), "/pet/{petId}/uploadImage"),
+    (re.compile(r"^/pet/[^/]+$"), "/pet/{petId}"),
+    (re.compile(r"^/store/order/[^/]+$"), "/store/order/{orderId}"),
+    (re.compile(r"^/user/(?!login$|logout$|createWith)[^/]+$"), "/user/{username}"),
+]
+
+PERCENTILES = (50, 95, 99)
+
+# Upper bounds (ms) of the exported histogram buckets; the last bucket is open
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def template_path(url: str, base_path: str = "/v2") -> str:
+    """Map a request URL to its swagger path template, e.g. /pet/123 -> /pet/{petId}"""
+    path = urlsplit(url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):] or "/"
+    for pattern, template in PATH_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return path
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _content_length(response: requests.Response) -> Optional[int]:
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _replayed(response: requests.Response) -> bool:
+    """Answered from a cassette (utils.cassette): its elapsed time measures nothing"""
+    return getattr(response, "replayed", False)
+
+
+class LatencyRecorder:
+    """
+    Thread-safe recorder of every request made through PetStoreAPIClient
+
+    Samples are grouped per endpoint ("METHOD /templated/path") so that
+    p50/p95/p99 can be reported and checked against budgets at session end.
+    Responses replayed from a cassette are not recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._statuses: Dict[str, Dict[int, int]] = {}
+        self._bytes: Dict[str, int] = {}
+
+    def record(self, method: str, url: str, status_code: int, elapsed_ms: float,
+               size_bytes: Optional[int] = None):
+        """Record one exchange"""
+        endpoint = f"{method.upper()} {template_path(url)}"
+        with self._lock:
+            self._samples.setdefault(endpoint, []).append(elapsed_ms)
+            statuses = self._statuses.setdefault(endpoint, {})
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + (size_bytes or 0)
+
+    def response_hook(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        """requests response hook; register with session.hooks['response']"""
+        if _replayed(response):
+            return response
+        if kwargs.get("stream"):
+            # Reading the body here would defeat streaming, use the header instead
+            size_bytes = _content_length(response)
+        else:
+            size_bytes = len(response.content)
+        self.record(
+            response.request.method,
+            response.request.url,
+            response.status_code,
+            response.elapsed.total_seconds() * 1000,
+            size_bytes
+        )
+        return response
+
+    def complete(self, response: requests.Response):
+        """Correct the byte count of a streamed response that was read in full afterwards (hedged GETs)"""
+        if _replayed(response):
+            return
+        endpoint = f"{response.request.method.upper()} {template_path(response.request.url)}"
+        with self._lock:
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + len(response.content) - (_content_length(response) or 0)
+
+    def reset(self):
+        """Drop all samples"""
+        with self._lock:
+            self._samples.clear()
+            self._statuses.clear()
+            self._bytes.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint count, percentiles, max, status codes, bytes and histogram"""
+        with self._lock:
+            snapshot = {endpoint: sorted(values) for endpoint, values in self._samples.items()}
+            statuses = {endpoint: dict(codes) for endpoint, codes in self._statuses.items()}
+            sizes = dict(self._bytes)
+
+        summary = {}
+        for endpoint, values in sorted(snapshot.items()):
+            stats: Dict[str, Any] = {"count": len(values)}
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = round(percentile(values, pct), 2)
+            stats["max"] = round(values[-1], 2)
+            stats["mean"] = round(sum(values) / len(values), 2)
+            stats["bytes"] = sizes.get(endpoint, 0)
+            stats["status_codes"] = {str(code): count for code, count in sorted(statuses[endpoint].items())}
+            stats["histogram"] = self._histogram(values)
+            summary[endpoint] = stats
+        return summary
+
+    @staticmethod
+    def _histogram(sorted_values: List[float]) -> Dict[str, int]:
+        buckets: Dict[str, int] = {}
+        index = 0
+        for bound in HISTOGRAM_BOUNDS_MS:
+            count = 0
+            while index < len(sorted_values) and sorted_values[index] <= bound:
+                count += 1
+                index += 1
+            buckets[f"<={bound}ms"] = count
+        buckets[f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] = len(sorted_values) - index
+        return buckets
+
+
+# Process-wide recorder shared by every PetStoreAPIClient
+RECORDER = LatencyRecorder()
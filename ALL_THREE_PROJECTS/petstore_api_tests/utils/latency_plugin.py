@@ -0,0 +1,152 @@
+"""
+Pytest plugin: per-endpoint latency percentiles for the Petstore suite
+
+Every request made through PetStoreAPIClient is recorded (method, templated
+path, status, elapsed, bytes), except responses replayed from a cassette and
+the pet_tracker cleanup at session teardown, which is not test traffic. At session end p50/p95/p99 per endpoint are
+printed, optionally exported, and checked against per-endpoint budgets.
+Time-to-consistency of read-after-write waits (utils.consistency) is
+reported alongside.
+
+Options:
+    --latency-report=PATH      Write the per-endpoint summary as JSON
+    --latency-history=PATH     Append the summary as one JSON line (time series)
+    --latency-budget=SPEC      Fail the session when a budget is exceeded, e.g.
+                               "GET /pet/{petId}:p95=800" (repeatable)
+
+Budgets can also be listed in the ini file under `latency_budgets`.
+"""
+
+import json
+import os
+import re
+import time
+from typing import List, Tuple
+
+import pytest
+
+from utils.consistency import CONSISTENCY
+from utils.latency import PERCENTILES, RECORDER
+
+
+BUDGET_PATTERN = re.compile(r"^\s*(?P<endpoint>[A-Z]+ \S+)\s*:\s*(?P<stat>p\d+|max|mean)\s*=\s*(?P<ms>\d+(\.\d+)?)\s*$")
+
+
+def parse_budget(spec: str) -> Tuple[str, str, float]:
+    """Parse "GET /pet/{petId}:p95=800" into (endpoint, stat, limit_ms)"""
+    match = BUDGET_PATTERN.match(spec)
+    if not match:
+        raise ValueError(
+            f"Invalid latency budget '{spec}'. Expected 'METHOD /path:p95=MILLISECONDS'"
+        )
+    return match.group("endpoint"), match.group("stat"), float(match.group("ms"))
+
+
+def pytest_addoption(parser):
+    """Add latency reporting options"""
+    group = parser.getgroup("latency", "Petstore API latency tracking")
+    group.addoption(
+        "--latency-report",
+        action="store",
+        default=None,
+        help="Write per-endpoint latency percentiles to this JSON file"
+    )
+    group.addoption(
+        "--latency-history",
+        action="store",
+        default=None,
+        help="Append per-endpoint latency percentiles to this JSON lines file"
+    )
+    group.addoption(
+        "--latency-budget",
+        action="append",
+        default=[],
+        help="Per-endpoint budget, e.g. 'GET /pet/{petId}:p95=800' (repeatable)"
+    )
+    parser.addini(
+        "latency_budgets",
+        type="linelist",
+        default=[],
+        help="Per-endpoint latency budgets, one 'METHOD /path:p95=MILLISECONDS' per line"
+    )
+
+
+def pytest_configure(config):
+    """Validate budgets early so typos fail before any request is made"""
+    specs = list(config.getini("latency_budgets")) + list(config.getoption("--latency-budget"))
+    try:
+        config._latency_budgets = [parse_budget(spec) for spec in specs]
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    RECORDER.reset()
+    CONSISTENCY.reset()
+
+
+def _check_budgets(config, summary) -> List[str]:
+    violations = []
+    for endpoint, stat, limit_ms in config._latency_budgets:
+        if endpoint not in summary:
+            continue
+        actual = summary[endpoint].get(stat)
+        if actual is not None and actual > limit_ms:
+            violations.append(f"{endpoint} {stat}={actual:.1f}ms exceeds budget {limit_ms:g}ms")
+    return violations
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Export the summary and fail the session on budget violations"""
+    config = session.config
+    summary = RECORDER.summary()
+    config._latency_summary = summary
+    config._latency_violations = _check_budgets(config, summary)
+
+    payload = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "endpoints": summary,
+        "budget_violations": config._latency_violations,
+        "consistency": CONSISTENCY.summary(),
+    }
+    report_path = config.getoption("--latency-report")
+    if report_path:
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            json.dump(payload, report_file, indent=2)
+    history_path = config.getoption("--latency-history")
+    if history_path:
+        os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+        with open(history_path, "a", encoding="utf-8") as history_file:
+            history_file.write(json.dumps(payload) + "\n")
+
+    if config._latency_violations and session.exitstatus == 0:
+        session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print the per-endpoint latency table"""
+    summary = getattr(config, "_latency_summary", None)
+    if not summary:
+        return
+    terminalreporter.section("Petstore API latency")
+    header = f"{'Endpoint':<34} {'count':>6}" + "".join(f" {'p' + str(p):>9}" for p in PERCENTILES)
+    terminalreporter.write_line(header + f" {'max':>9} {'bytes':>10}")
+    for endpoint, stats in summary.items():
+        line = f"{endpoint:<34} {stats['count']:>6}"
+        line += "".join(f" {stats['p' + str(p)]:>7.1f}ms" for p in PERCENTILES)
+        terminalreporter.write_line(line + f" {stats['max']:>7.1f}ms {stats['bytes']:>10}")
+    for violation in config._latency_violations:
+        terminalreporter.write_line(f"LATENCY BUDGET EXCEEDED: {violation}", red=True)
+
+    consistency = CONSISTENCY.summary()
+    if consistency:
+        terminalreporter.section("Read-after-write consistency")
+        terminalreporter.write_line(
+            f"{'Condition':<34} {'waits':>6} {'reads':>6} {'p50':>9} {'p95':>9} {'max':>9} {'timeouts':>9}"
+        )
+        for condition, stats in consistency.items():
+            times = "".join(
+                f" {stats[key]:>7.1f}ms" if stats[key] is not None else f" {'-':>9}"
+                for key in ("p50", "p95", "max")
+            )
+            terminalreporter.write_line(
+                f"{condition:<34} {stats['waits']:>6} {stats['reads_per_wait']:>6.1f}{times} {stats['timeouts']:>9}"
+            )
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Swagger Petstore /pet endpoints
+
+Mimics the responses of https://petstore.swagger.io/v2 closely enough for the
+functional suite, the Locust scenario and the benchmarks to run without
+network access.
+
+Usage:
+    python -m utils.petstore_stub                  # http://127.0.0.1:8080/v2
+    python -m utils.petstore_stub --port 9000 --latency-ms 20
+    PETSTORE_BASE_URL=http://127.0.0.1:8080/v2 pytest tests/ -v
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+PET_PATH = re.compile(r"^/v2/pet/(?P<pet_id>[^/]+)$")
+
+
+class PetStore:
+    """Thread-safe in-memory pet storage"""
+
+    def __init__(self):
+        self._pets: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pet_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._pets.get(pet_id)
+
+    def put(self, pet: Dict[str, Any]):
+        with self._lock:
+            self._pets[pet["id"]] = pet
+
+    def delete(self, pet_id: int) -> bool:
+        with self._lock:
+            return self._pets.pop(pet_id, None) is not None
+
+    def find_by_status(self, status: str):
+        with self._lock:
+            return [pet for pet in self._pets.values() if pet.get("status") == status]
+
+    def update_fields(self, pet_id: int, fields: Dict[str, str]) -> bool:
+        with self._lock:
+            pet = self._pets.get(pet_id)
+            if pet is None:
+                return False
+            pet.update(fields)
+            return True
+
+
+class PetstoreRequestHandler(BaseHTTPRequestHandler):
+    """Implements the Petstore /pet endpoints on top of PetStore"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40ms
+    disable_nagle_algorithm = True
+    store: PetStore = None
+    latency_s: float = 0.0
+
+    def log_message(self, format, *args):
+        pass  # Keep load and benchmark output readable
+
+    # ==================== HELPERS ====================
+
+    def _send_json(self, status_code: int, payload: Any = None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _pet_id_from_path(self) -> Tuple[bool, Optional[int]]:
+        """Returns (matched, pet_id); pet_id is None when it is not an integer"""
+        match = PET_PATH.match(urlsplit(self.path).path)
+        if not match:
+            return False, None
+        try:
+            return True, int(match.group("pet_id"))
+        except ValueError:
+            return True, None
+
+    def _parse_pet(self) -> Optional[Dict[str, Any]]:
+        try:
+            pet = json.loads(self._read_body() or b"null")
+        except ValueError:
+            return None
+        if not isinstance(pet, dict) or not pet:
+            return None
+        if type(pet.get("id")) is not int or not isinstance(pet.get("name"), str):
+            return None
+        if "photoUrls" in pet and not isinstance(pet["photoUrls"], list):
+            return None
+        pet.setdefault("photoUrls", [])
+        pet.setdefault("tags", [])
+        return pet
+
+    def _simulate_latency(self):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    # ==================== ENDPOINTS ====================
+
+    def do_GET(self):
+        self._simulate_latency()
+        url = urlsplit(self.path)
+        if url.path == "/v2/pet/findByStatus":
+            status = parse_qs(url.query).get("status", [""])[0]
+            return self._send_json(200, self.store.find_by_status(status))
+
+        matched, pet_id = self._pet_id_from_path()
+        if not matched:
+            return self._send_json(404, {"code": 404, "type": "unknown", "message": "not found"})
+        if pet_id is None:
+            return self._send_json(404, {"code": 404, "type": "unknown",
+                                         "message": "java.lang.NumberFormatException"})
+        pet = self.store.get(pet_id)
+        if pet is None:
+            return self._send_json(404, {"code": 1, "type": "error", "message": "Pet not found"})
+        self._send_json(200, pet)
+
+    def do_POST(self):
+        self._simulate_latency()
+        if urlsplit(self.path).path == "/v2/pet":
+            pet = self._parse_pet()
+            if pet is None:
+                return self._send_json(500, {"code": 500, "type": "unknown",
+                                             "message": "something bad happened"})
+            self.store.put(pet)
+            return self._send_json(200, pet)
+
+        matched, pet_id = self._pet_id_from_path()
+        if not matched or pet_id is None:
+            return self._send_json(404, {"code": 404, "type": "unknown", "message": "not found"})
+        form = parse_qs(self._read_body().decode())
+        fields = {key: form[key][0] for key in ("name", "status") if key in form}
+        if not self.store.update_fields(pet_id, fields):
+            return self._send_json(404, {"code": 404, "type": "unknown", "message": "not found"})
+        self._send_json(200, {"code": 200, "type": "unknown", "message": str(pet_id)})
+
+    def do_PUT(self):
+        self._simulate_latency()
+        if urlsplit(self.path).path != "/v2/pet":
+            return self._send_json(404, {"code": 404, "type": "unknown", "message": "not found"})
+        pet = self._parse_pet()
+        if pet is None:
+            return self._send_json(500, {"code": 500, "type": "unknown",
+                                         "message": "something bad happened"})
+        # Like the public Petstore, updating an unknown pet creates it
+        self.store.put(pet)
+        self._send_json(200, pet)
+
+    def do_DELETE(self):
+        self._simulate_latency()
+        matched, pet_id = self._pet_id_from_path()
+        if not matched or pet_id is None or not self.store.delete(pet_id):
+            return self._send_json(404)
+        self._send_json(200, {"code": 200, "type": "unknown", "message": str(pet_id)})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients going away mid-request is normal at the end of a load test
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class PetstoreStubServer:
+    """Runs the stand-in Petstore in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        handler = type("Handler", (PetstoreRequestHandler,), {
+            "store": PetStore(),
+            "latency_s": latency_ms / 1000,
+        })
+        self.httpd = _StubHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def start(self) -> "PetstoreStubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "PetstoreStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Swagger Petstore /pet API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Artificial server-side latency per request")
+    args = parser.parse_args()
+
+    server = PetstoreStubServer(args.host, args.port, args.latency_ms)
+    print(f"Petstore stand-in listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Pytest plugin: throttle every Petstore client in the session together
+
+Every PetStoreAPIClient created during the session sends its requests
+through RateGovernor.shared(), so the suite backs off when the server
+answers 429/5xx or slows down, instead of hammering a shared deployment.
+Tests that build a client with their own rate_governor keep it.
+
+Options:
+    --rate-limit=RPS   Starting requests/second of the shared governor
+                       (enables the plugin); it adapts from there
+
+Example:
+    pytest tests/ --rate-limit=20 --concurrency=8
+"""
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateGovernor
+
+
+def pytest_addoption(parser):
+    """Add rate limiting options"""
+    group = parser.getgroup("rate-limit", "Adaptive client-side rate limiting")
+    group.addoption(
+        "--rate-limit",
+        action="store",
+        type=float,
+        default=None,
+        metavar="RPS",
+        help="Send every Petstore request through one adaptive rate governor "
+             "starting at RPS requests/second"
+    )
+
+
+def pytest_configure(config):
+    """Activate the shared governor for every client created in this session"""
+    initial_rate = config.getoption("--rate-limit")
+    if initial_rate is None:
+        return
+    if initial_rate <= 0:
+        raise pytest.UsageError(f"--rate-limit must be positive, got {initial_rate}")
+    governor = RateGovernor.shared(initial_rate=initial_rate)
+    config._rate_governor = governor
+    rate_limiter.activate(governor)
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "_rate_governor", None) is not None:
+        rate_limiter.activate(None)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Summarize how much the governor throttled the session"""
+    governor = getattr(config, "_rate_governor", None)
+    if governor is None:
+        return
+    stats = governor.stats()
+    terminalreporter.section("Rate limiting")
+    terminalreporter.write_line(
+        f"{stats['requests']} requests, final rate {stats['rate_per_s']}/s, "
+        f"concurrency limit {stats['concurrency_limit']}, {stats['congestion_events']} congestion events "
+        f"({stats['decreases']} decreases), {stats['throttle_wait_s']}s waiting for a slot or token"
+    )
@@ -0,0 +1,283 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, FrozenSet, Iterator, Optional
+
+import requests
+
+from utils.latency import template_path
+
+
+# Status codes that mean "back off": rate limited or server overloaded
+CONGESTION_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate can be changed on the fly"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the given time (e.g. a Retry-After)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def set_rate(self, rate: float, burst: Optional[float] = None):
+        """Change the refill rate and, optionally, the bucket size"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if burst is not None:
+                self.burst = burst
+                self._tokens = min(self._tokens, burst)
+
+
+class RateGovernor:
+    """
+    Adaptive client-side rate limiting: token bucket + AIMD concurrency
+
+    Requests need both a token (requests/second) and a concurrency slot.
+    Like TCP, the governor starts in slow start (both limits double every
+    window) until the first congestion signal, after which successful, fast
+    responses increase both limits additively; 429/5xx,
+    connection errors, timeouts and latency above the target cut them
+    multiplicatively, at most once per cooldown so that one burst of errors
+    counts as a single congestion event. The latency target is per endpoint
+    (method + templated path), so a large findByStatus listing is compared
+    with earlier listings, not with the fastest single-pet GET. Over time the limits converge on the
+    highest throughput the server sustains without throttling.
+
+    Use RateGovernor.shared() to govern every client in the process together
+    (in the test suite: --rate-limit, see utils/rate_limit_plugin.py).
+    Error statuses a caller provokes on purpose (negative tests) are passed
+    to observe() as expected, so they do not throttle everyone else.
+    """
+
+    _shared: Optional["RateGovernor"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, initial_rate: float = 10.0, min_rate: float = 1.0, max_rate: float = 500.0,
+                 initial_concurrency: float = 4.0, min_concurrency: float = 1.0,
+                 max_concurrency: float = 64.0, rate_increase: float = 20.0,
+                 decrease_factor: float = 0.5, latency_target_ms: Optional[float] = None,
+                 latency_tolerance: float = 3.0, cooldown_s: float = 1.0):
+        """
+        Args:
+            initial_rate: Starting requests per second
+            min_rate: Lower bound for the rate
+            max_rate: Upper bound for the rate
+            initial_concurrency: Starting number of requests allowed in flight
+            min_concurrency: Lower bound for concurrency
+            max_concurrency: Upper bound for concurrency
+            rate_increase: Requests/second added per second of healthy traffic
+            decrease_factor: Multiplier applied to both limits on congestion
+            latency_target_ms: Latency above which a response counts as congestion;
+                               defaults to latency_tolerance x the fastest response
+                               seen for the same endpoint
+            latency_tolerance: Multiplier used when latency_target_ms is not set
+            cooldown_s: Minimum time between two multiplicative decreases
+        """
+        self.min_rate, self.max_rate = min_rate, max_rate
+        self.min_concurrency, self.max_concurrency = min_concurrency, max_concurrency
+        self.rate_increase = rate_increase
+        self.decrease_factor = decrease_factor
+        self.latency_target_ms = latency_target_ms
+        self.latency_tolerance = latency_tolerance
+        self.cooldown_s = cooldown_s
+
+        self.bucket = TokenBucket(initial_rate, burst=max(1.0, initial_concurrency))
+        self.concurrency_limit = initial_concurrency
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._last_decrease = 0.0
+        self._min_latency_ms: Dict[str, float] = {}
+        self._slow_start = True
+
+        self.requests = 0
+        self.congestion_events = 0
+        self.decreases = 0
+        self.throttle_wait_s = 0.0
+
+    @classmethod
+    def shared(cls, **kwargs) -> "RateGovernor":
+        """Process-wide governor (kwargs only apply on first call)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            return cls._shared
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    # ==================== ADMISSION ====================
+
+    @contextmanager
+    def slot(self) -> Iterator["RateGovernor"]:
+        """
+        Hold a concurrency slot and a token for one request
+
+        Report the outcome with observe(); leaving the block with a
+        requests exception (connection error, timeout, ...) counts as
+        congestion.
+        """
+        started = time.monotonic()
+        with self._condition:
+            while self._in_flight >= max(1, int(self.concurrency_limit)):
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            self.bucket.acquire()
+            with self._condition:
+                self.throttle_wait_s += time.monotonic() - started
+            yield self
+        except requests.exceptions.RequestException:
+            self._on_congestion(time.monotonic())
+            raise
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def observe(self, response: requests.Response, expected_statuses: FrozenSet[int] = frozenset()):
+        """
+        Feed one response back into the AIMD controller
+
+        Args:
+            response: Response to the request sent in slot()
+            expected_statuses: Error statuses the caller provoked on purpose;
+                               they do not count as congestion
+        """
+        now = time.monotonic()
+        latency_ms = response.elapsed.total_seconds() * 1000
+        with self._condition:
+            self.requests += 1
+
+        if response.status_code in CONGESTION_STATUS_CODES and response.status_code not in expected_statuses:
+            retry_after = _retry_after_seconds(response)
+            if retry_after:
+                self.bucket.pause(retry_after)
+            self._on_congestion(now)
+        elif latency_ms > self._latency_target(_endpoint(response), latency_ms):
+            self._on_congestion(now)
+        else:
+            self._on_success(latency_ms)
+
+    # ==================== AIMD ====================
+
+    def _latency_target(self, endpoint: str, latency_ms: float) -> float:
+        if self.latency_target_ms is not None:
+            return self.latency_target_ms
+        with self._condition:
+            fastest = min(latency_ms, self._min_latency_ms.get(endpoint, latency_ms))
+            self._min_latency_ms[endpoint] = fastest
+            # Never treat sub-millisecond jitter on a local server as congestion
+            return max(fastest * self.latency_tolerance, 50.0)
+
+    def _on_success(self, latency_ms: float):
+        with self._condition:
+            if self._slow_start:
+                # Doubles both limits every window until the first congestion signal
+                concurrency_step, rate_step = 1.0, 1.0
+            else:
+                # +1 slot per window of `limit` requests, +rate_increase req/s per second
+                concurrency_step = 1.0 / self.concurrency_limit
+                rate_step = self.rate_increase / max(self.bucket.rate, 1.0)
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + concurrency_step)
+            rate = min(self.max_rate, self.bucket.rate + rate_step)
+            self._condition.notify()
+            burst = max(1.0, self.concurrency_limit)
+        self.bucket.set_rate(rate, burst)
+
+    def _on_congestion(self, now: float):
+        with self._condition:
+            self.congestion_events += 1
+            self._slow_start = False
+            if now - self._last_decrease < self.cooldown_s:
+                return
+            self._last_decrease = now
+            self.decreases += 1
+            self.concurrency_limit = max(self.min_concurrency,
+                                         self.concurrency_limit * self.decrease_factor)
+            rate = max(self.min_rate, self.bucket.rate * self.decrease_factor)
+            burst = max(1.0, self.concurrency_limit)
+        self.bucket.set_rate(rate, burst)
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "rate_per_s": round(self.bucket.rate, 2),
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "in_flight": self._in_flight,
+                "slow_start": self._slow_start,
+                "requests": self.requests,
+                "congestion_events": self.congestion_events,
+                "decreases": self.decreases,
+                "throttle_wait_s": round(self.throttle_wait_s, 3),
+            }
+
+
+def _endpoint(response: requests.Response) -> str:
+    """Method and templated path the response answers, e.g. GET /pet/{petId}"""
+    request = response.request
+    if request is None:
+        return ""
+    return f"{request.method.upper()} {template_path(request.url)}"
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_ACTIVE: Optional[RateGovernor] = None
+
+
+def activate(governor: Optional[RateGovernor]):
+    """Make every PetStoreAPIClient created from now on use governor (None disables)"""
+    global _ACTIVE
+    _ACTIVE = governor
+
+
+def active() -> Optional[RateGovernor]:
+    return _ACTIVE
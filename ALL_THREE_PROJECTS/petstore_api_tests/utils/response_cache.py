@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import requests
+
+
+class CacheEntry:
+    """A cached GET response plus the validators needed to revalidate it"""
+
+    __slots__ = ("response", "expires_at", "etag", "last_modified")
+
+    def __init__(self, response: requests.Response, expires_at: float):
+        self.response = response
+        self.expires_at = expires_at
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET, empty if the server sent no validators"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache for idempotent Petstore reads
+
+    Entries are keyed by (base_url, endpoint, str(argument)), e.g.
+    ("https://petstore.swagger.io/v2", "get_pet", "12345"), so get_pet(123)
+    and get_pet("123") share an entry while clients of different deployments
+    sharing the cache do not, and expire after a per-endpoint TTL. Expired
+    entries that carry an ETag or Last-Modified header are kept and
+    revalidated with a conditional GET instead of being refetched.
+
+    Every invalidation bumps a generation counter. A response is only stored
+    if no invalidation hit its key while it was in flight; otherwise a read
+    racing a write could cache the pre-write body for a full TTL. Reads in
+    flight are counted per generation, so invalidation marks no read can
+    be older than are dropped.
+    """
+
+    DEFAULT_TTLS = {
+        "get_pet": 30.0,
+        "find_pets_by_status": 5.0,
+    }
+
+    def __init__(self, max_entries: int = 1024, ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached responses before LRU eviction
+            ttls: Seconds each endpoint's responses stay fresh, by client method name
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._invalidated_at: Dict[Tuple[str, str, str], int] = {}
+        self._endpoint_invalidated_at: Dict[Tuple[str, str], int] = {}
+        self._in_flight: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    @staticmethod
+    def _key(endpoint: str, key: Hashable, base_url: str) -> Tuple[str, str, str]:
+        return base_url, endpoint, str(key)
+
+    # ==================== LOOKUP ====================
+
+    def generation(self) -> int:
+        """
+        Current invalidation generation, registering a read in flight
+
+        Read it before sending the request and pass it to store(), or to
+        abandon() if the request failed.
+        """
+        with self._lock:
+            self._in_flight[self._generation] += 1
+            return self._generation
+
+    def abandon(self, generation: int):
+        """End a read registered by generation() that produced no response"""
+        with self._lock:
+            self._finish(generation)
+
+    def _finish(self, generation: Optional[int]):
+        """Drop the read's registration and the invalidation marks no read in flight is older than"""
+        if generation is None or not self._in_flight[generation]:
+            return
+        self._in_flight[generation] -= 1
+        if not self._in_flight[generation]:
+            del self._in_flight[generation]
+        if not self._in_flight:
+            self._invalidated_at.clear()
+            self._endpoint_invalidated_at.clear()
+        elif len(self._invalidated_at) > self.max_entries:
+            oldest = min(self._in_flight)
+            self._invalidated_at = {key: value for key, value in self._invalidated_at.items() if value > oldest}
+
+    def lookup(self, endpoint: str, key: Hashable,
+               base_url: str = "") -> Tuple[Optional[requests.Response], Dict[str, str]]:
+        """
+        Look up a cached response
+
+        Args:
+            endpoint: Client method name
+            key: Method argument (normalized with str)
+            base_url: Deployment the request goes to
+
+        Returns:
+            (response, {}) on a fresh hit,
+            (None, conditional_headers) when a stale entry can be revalidated,
+            (None, {}) on a miss
+        """
+        cache_key = self._key(endpoint, key, base_url)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None, {}
+            self._entries.move_to_end(cache_key)
+            if time.monotonic() < entry.expires_at:
+                self.hits += 1
+                return entry.response, {}
+            headers = entry.conditional_headers()
+            if not headers:
+                del self._entries[cache_key]
+            self.misses += 1
+            return None, headers
+
+    def store(self, endpoint: str, key: Hashable, response: requests.Response,
+              generation: Optional[int] = None, base_url: str = "") -> Optional[requests.Response]:
+        """
+        Store a fresh response, or resolve a 304 Not Modified against the cached one
+
+        Args:
+            endpoint: Client method name
+            key: Method argument (normalized with str)
+            response: Response to the GET
+            generation: generation() read before the GET was sent; the response
+                        is not cached if the key was invalidated since
+            base_url: Deployment the request went to
+
+        Returns:
+            The response callers should see (the cached body for a 304), or
+            None for a 304 whose cached body is gone (evicted or invalidated
+            while the conditional GET was in flight); send an unconditional GET
+        """
+        cache_key = self._key(endpoint, key, base_url)
+        expires_at = time.monotonic() + self.ttls.get(endpoint, 0.0)
+        # Read the body now so the cached object is fully detached from the socket
+        if response.status_code == 200:
+            _ = response.content
+        with self._lock:
+            stale = generation is not None and generation < max(
+                self._invalidated_at.get(cache_key, 0),
+                self._endpoint_invalidated_at.get((base_url, endpoint), 0)
+            )
+            # After the check: finishing the last read in flight drops the marks
+            self._finish(generation)
+            if stale:
+                self.stale_stores += 1
+                return None if response.status_code == 304 else response
+            if response.status_code == 304:
+                entry = self._entries.get(cache_key)
+                if entry is None:
+                    return None
+                entry.expires_at = expires_at
+                self._entries.move_to_end(cache_key)
+                self.revalidations += 1
+                return entry.response
+            if response.status_code != 200:
+                self._entries.pop(cache_key, None)
+                return response
+            self._entries[cache_key] = CacheEntry(response, expires_at)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return response
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, endpoint: str, key: Optional[Hashable] = None, base_url: str = ""):
+        """Drop one entry, or every entry of an endpoint when key is None"""
+        with self._lock:
+            self._generation += 1
+            # Only reads in flight need the mark (see _finish)
+            remember = bool(self._in_flight)
+            if key is not None:
+                cache_key = self._key(endpoint, key, base_url)
+                if remember:
+                    self._invalidated_at[cache_key] = self._generation
+                if self._entries.pop(cache_key, None) is not None:
+                    self.invalidations += 1
+                return
+            if remember:
+                self._endpoint_invalidated_at[(base_url, endpoint)] = self._generation
+            for cache_key in [k for k in self._entries if k[:2] == (base_url, endpoint)]:
+                del self._entries[cache_key]
+                self.invalidations += 1
+
+    def invalidate_pet(self, pet_id: Any, base_url: str = ""):
+        """Drop everything a write to the given pet may have made stale"""
+        self.invalidate("get_pet", pet_id, base_url)
+        # Any status listing may now contain (or still contain) the pet
+        self.invalidate("find_pets_by_status", base_url=base_url)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== STATISTICS ====================
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for measuring round trips saved"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_stores": self.stale_stores,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                # 304 answers still cost a round trip, but no body transfer
+                "round_trips_saved": self.hits,
+            }
@@ -0,0 +1,283 @@
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+
+# Pet model as published in https://petstore.swagger.io/v2/swagger.json
+SWAGGER_DEFINITIONS: Dict[str, Dict[str, Any]] = {
+    "Category": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"}
+        }
+    },
+    "Tag": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"}
+        }
+    },
+    "Pet": {
+        "type": "object",
+        "required": ["name", "photoUrls"],
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "category": {"$ref": "#/definitions/Category"},
+            "name": {"type": "string", "example": "doggie"},
+            "photoUrls": {"type": "array", "items": {"type": "string"}},
+            "tags": {"type": "array", "items": {"$ref": "#/definitions/Tag"}},
+            "status": {
+                "type": "string",
+                "description": "pet status in the store",
+                "enum": ["available", "pending", "sold"]
+            }
+        }
+    }
+}
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+class SchemaViolation(NamedTuple):
+    """A single validation failure, worded like jsonschema's ValidationError.message"""
+    index: int      # Position of the item in the validated list
+    path: str       # JSON path inside the item, e.g. "$.tags[0].id" (the object for a missing property)
+    message: str
+
+
+# Error collectors are closures that are only run on items that failed the
+# generated fast predicate, so building paths and messages costs nothing for
+# valid items
+Predicate = Callable[[Any], bool]
+Collector = Callable[[Any, str, List[Tuple[str, str]]], None]
+
+_MISSING = object()
+
+
+class CompiledSchemaValidator:
+    """
+    Validator compiled once from a swagger (2.0) model definition
+
+    The fast path is generated Python source with every check inlined (nested
+    definitions included), so validating a valid item costs a handful of
+    type() comparisons instead of a generic schema walk. Error paths and
+    messages are only built for items that actually fail.
+    """
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], model: str):
+        self.definitions = definitions
+        self.model = model
+        self._collectors: Dict[str, Collector] = {}
+        self._is_valid = self._generate_predicate(model)
+        self._collect = self._compile_ref(f"#/definitions/{model}")
+
+    def is_valid(self, item: Any) -> bool:
+        """Return True if a single item matches the model"""
+        return self._is_valid(item)
+
+    def validate(self, item: Any, index: int = 0) -> List[SchemaViolation]:
+        """Validate a single item and return its violations (empty when valid)"""
+        if self._is_valid(item):
+            return []
+        errors: List[Tuple[str, str]] = []
+        self._collect(item, "$", errors)
+        return [SchemaViolation(index, path, message) for path, message in errors]
+
+    def validate_many(self, items: Iterable[Any]) -> List[SchemaViolation]:
+        """Validate a whole list (e.g. a findByStatus response) in a single pass"""
+        is_valid = self._is_valid
+        violations: List[SchemaViolation] = []
+        for index, item in enumerate(items):
+            if not is_valid(item):
+                violations.extend(self.validate(item, index))
+        return violations
+
+    # ==================== FAST PATH (CODE GENERATION) ====================
+
+    def _generate_predicate(self, model: str) -> Predicate:
+        constants: Dict[str, Any] = {"_MISSING": _MISSING}
+        body: List[str] = []
+        self._emit(self.definitions[model], "v0", 1, body, constants, [model])
+        # Constants and the builtins used are bound as defaults, so the checks
+        # read fast locals instead of global and builtin dict lookups
+        bound = {name: value for name, value in constants.items() if value is not None}
+        bound.update(type=type, dict=dict, list=list, int=int, str=str, float=float, bool=bool)
+        lines = [f"def is_valid(v0, {', '.join(f'{name}={name}' for name in bound)}):"] + body
+        lines.append("    return True")
+        namespace = dict(bound)
+        exec(compile("\n".join(lines), f"<compiled {model} validator>", "exec"), namespace)
+        return namespace["is_valid"]
+
+    def _emit(self, schema: Dict[str, Any], var: str, depth: int, lines: List[str],
+              constants: Dict[str, Any], stack: List[str]) -> None:
+        pad = "    " * depth
+        if "$ref" in schema:
+            name = schema["$ref"].rsplit("/", 1)[-1]
+            if name in stack:
+                raise ValueError(f"Recursive swagger definition is not supported: {name}")
+            self._emit(self.definitions[name], var, depth, lines, constants, stack + [name])
+            return
+
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            lines.append(f"{pad}if type({var}) is not dict: return False")
+            required = schema.get("required", ())
+            properties = schema.get("properties", {})
+            for name in required:
+                if name not in properties:
+                    lines.append(f"{pad}if {name!r} not in {var}: return False")
+            for name, sub_schema in properties.items():
+                child = f"v{len(constants)}"
+                constants[child] = None
+                lines.append(f"{pad}{child} = {var}.get({name!r}, _MISSING)")
+                if name in required:
+                    # One dict lookup covers both the presence and the type check
+                    lines.append(f"{pad}if {child} is _MISSING: return False")
+                    self._emit(sub_schema, child, depth, lines, constants, stack)
+                else:
+                    lines.append(f"{pad}if {child} is not _MISSING:")
+                    self._emit(sub_schema, child, depth + 1, lines, constants, stack)
+        elif schema_type == "array":
+            child = f"v{len(constants)}"
+            constants[child] = None
+            lines.append(f"{pad}if type({var}) is not list: return False")
+            lines.append(f"{pad}for {child} in {var}:")
+            self._emit(schema.get("items", {"type": "string"}), child, depth + 1,
+                       lines, constants, stack)
+        elif schema_type == "integer":
+            low, high = _integer_bounds(schema)
+            if low is None:
+                lines.append(f"{pad}if type({var}) is not int: return False")
+            else:
+                lines.append(f"{pad}if type({var}) is not int or not {low} <= {var} <= {high}: "
+                             f"return False")
+        elif schema_type == "string":
+            if "enum" in schema:
+                enum_name = f"_ENUM{len(constants)}"
+                constants[enum_name] = frozenset(schema["enum"])
+                lines.append(f"{pad}if type({var}) is not str or {var} not in {enum_name}: "
+                             f"return False")
+            else:
+                lines.append(f"{pad}if type({var}) is not str: return False")
+        elif schema_type == "boolean":
+            lines.append(f"{pad}if type({var}) is not bool: return False")
+        elif schema_type == "number":
+            lines.append(f"{pad}if type({var}) is not int and type({var}) is not float: "
+                         f"return False")
+        else:
+            raise ValueError(f"Unsupported schema type: {schema_type}")
+
+    # ==================== ERROR COLLECTION ====================
+
+    def _compile_ref(self, ref: str) -> Collector:
+        name = ref.rsplit("/", 1)[-1]
+        if name not in self._collectors:
+            if name not in self.definitions:
+                raise KeyError(f"Unknown swagger definition: {ref}")
+            self._collectors[name] = self._compile(self.definitions[name])
+        return self._collectors[name]
+
+    def _compile(self, schema: Dict[str, Any]) -> Collector:
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            return self._compile_object(schema)
+        if schema_type == "array":
+            return self._compile_array(schema)
+        if schema_type == "integer":
+            return self._compile_integer(schema)
+        if schema_type == "string":
+            return self._compile_string(schema)
+        if schema_type == "boolean":
+            return self._compile_type((bool,), "boolean")
+        if schema_type == "number":
+            return self._compile_type((int, float), "number")
+        raise ValueError(f"Unsupported schema type: {schema_type}")
+
+    @staticmethod
+    def _compile_type(python_types: Tuple[type, ...], type_name: str) -> Collector:
+        def collector(value, path, errors):
+            if type(value) not in python_types:
+                errors.append((path, _type_message(value, type_name)))
+
+        return collector
+
+    @staticmethod
+    def _compile_integer(schema: Dict[str, Any]) -> Collector:
+        low, high = _integer_bounds(schema)
+
+        def collector(value, path, errors):
+            # bool is a subclass of int, hence the exact type() comparison
+            if type(value) is not int:
+                errors.append((path, _type_message(value, "integer")))
+            elif low is not None and value < low:
+                errors.append((path, f"{value!r} is less than the minimum of {low!r}"))
+            elif high is not None and value > high:
+                errors.append((path, f"{value!r} is greater than the maximum of {high!r}"))
+
+        return collector
+
+    @staticmethod
+    def _compile_string(schema: Dict[str, Any]) -> Collector:
+        enum = list(schema["enum"]) if "enum" in schema else None
+        allowed = frozenset(enum) if enum is not None else None
+
+        def collector(value, path, errors):
+            if type(value) is not str:
+                errors.append((path, _type_message(value, "string")))
+            # Like jsonschema, a non-string also fails the enum (string enums only, so no hashing needed)
+            if allowed is not None and (type(value) is not str or value not in allowed):
+                errors.append((path, f"{value!r} is not one of {enum!r}"))
+
+        return collector
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Collector:
+        item_collector = self._compile(schema.get("items", {"type": "string"}))
+
+        def collector(value, path, errors):
+            if type(value) is not list:
+                errors.append((path, _type_message(value, "array")))
+                return
+            for position, item in enumerate(value):
+                item_collector(item, f"{path}[{position}]", errors)
+
+        return collector
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Collector:
+        required = tuple(schema.get("required", ()))
+        properties = tuple(
+            (name, self._compile(sub_schema))
+            for name, sub_schema in schema.get("properties", {}).items()
+        )
+
+        def collector(value, path, errors):
+            if type(value) is not dict:
+                errors.append((path, _type_message(value, "object")))
+                return
+            for name in required:
+                if name not in value:
+                    errors.append((path, f"{name!r} is a required property"))
+            for name, sub_collector in properties:
+                if name in value:
+                    sub_collector(value[name], f"{path}.{name}", errors)
+
+        return collector
+
+
+def _type_message(value: Any, type_name: str) -> str:
+    return f"{value!r} is not of type {type_name!r}"
+
+
+def _integer_bounds(schema: Dict[str, Any]) -> Tuple[Any, Any]:
+    if schema.get("format") == "int64":
+        return INT64_MIN, INT64_MAX
+    if schema.get("format") == "int32":
+        return -2 ** 31, 2 ** 31 - 1
+    return None, None
+
+
+# Compiled once at import time and shared by all tests
+PET_VALIDATOR = CompiledSchemaValidator(SWAGGER_DEFINITIONS, "Pet")
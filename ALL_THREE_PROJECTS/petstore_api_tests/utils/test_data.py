@@ -1,6 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 import random
 
+import numpy as np
+
+from utils.schema_validator import PET_VALIDATOR, SchemaViolation
+
 
 class TestDataGenerator:
     """Generate test data for API tests"""
@@ -80,6 +84,136 @@ class TestDataGenerator:
         return 999999
 
 
+class PetBatch:
+    """Columnar block of generated pets (one NumPy array per field)"""
+    
+    def __init__(self, ids: np.ndarray, category_ids: np.ndarray,
+                 tag_ids: np.ndarray, status_codes: np.ndarray, statuses: List[str]):
+        self.ids = ids
+        self.category_ids = category_ids
+        self.tag_ids = tag_ids
+        self.status_codes = status_codes
+        self.statuses = statuses
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def to_json_bodies(self) -> List[bytes]:
+        """Serialize every pet in the batch to a JSON request body"""
+        # All generated fields are ints or fixed ASCII strings, so a format
+        # template yields the same bytes as compact json.dumps (separators=(",", ":"))
+        # of to_dicts() at a fraction of the cost
+        status_json = [f'"{status}"' for status in self.statuses]
+        template = BulkPetGenerator.BODY_TEMPLATE
+        return [
+            template.format(pet_id, category_id, tag_id, status_json[code]).encode()
+            for pet_id, category_id, tag_id, code in zip(
+                self.ids.tolist(), self.category_ids.tolist(),
+                self.tag_ids.tolist(), self.status_codes.tolist()
+            )
+        ]
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the batch as pet dictionaries (same shape as generate_valid_pet)"""
+        return [
+            {
+                "id": pet_id,
+                "category": {"id": category_id, "name": "Dogs"},
+                "name": f"TestDog{pet_id}",
+                "photoUrls": ["https://example.com/photo1.jpg"],
+                "tags": [{"id": tag_id, "name": "test-tag"}],
+                "status": self.statuses[code]
+            }
+            for pet_id, category_id, tag_id, code in zip(
+                self.ids.tolist(), self.category_ids.tolist(),
+                self.tag_ids.tolist(), self.status_codes.tolist()
+            )
+        ]
+
+
+class BulkPetGenerator:
+    """
+    Generate large volumes of valid pets for volume and soak tests
+    
+    Pets are produced chunk by chunk in columnar form from a seeded NumPy RNG,
+    so the same seed and status mix always yield the same pets, independent
+    of how many chunks the caller actually consumes.
+    
+    Reproducibility holds per (seed, chunk_index, count): each column is
+    drawn in full before the next, so a short last chunk is not a prefix of
+    a full chunk with the same index.
+    """
+    
+    BODY_TEMPLATE = (
+        '{{"id":{0},"category":{{"id":{1},"name":"Dogs"}},"name":"TestDog{0}",'
+        '"photoUrls":["https://example.com/photo1.jpg"],'
+        '"tags":[{{"id":{2},"name":"test-tag"}}],"status":{3}}}'
+    )
+    
+    def __init__(self, seed: int = 0, status_mix: Optional[Dict[str, float]] = None,
+                 id_start: int = 1000000, chunk_size: int = 10000):
+        """
+        Args:
+            seed: RNG seed; identical seed and config give identical pets
+            status_mix: Relative weights per status, e.g. {"available": 0.7, "sold": 0.3}
+            id_start: First pet ID; IDs are assigned sequentially so they never collide
+            chunk_size: Number of pets generated per chunk
+        """
+        status_mix = status_mix or {"available": 1.0}
+        for status in status_mix:
+            if status not in PetSchema.VALID_STATUSES:
+                raise ValueError(f"Invalid status in status_mix: {status}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        
+        weights = np.array(list(status_mix.values()), dtype=float)
+        if weights.sum() <= 0 or (weights < 0).any():
+            raise ValueError("status_mix weights must be non-negative and not all zero")
+        
+        self.seed = seed
+        self.statuses = list(status_mix)
+        self.status_probabilities = weights / weights.sum()
+        self.id_start = id_start
+        self.chunk_size = chunk_size
+    
+    def generate_batch(self, count: int, chunk_index: int = 0) -> PetBatch:
+        """
+        Generate one columnar batch of pets
+        
+        Args:
+            count: Number of pets, at most chunk_size
+            chunk_index: Chunk position; selects the ID range and the RNG stream
+            
+        Raises:
+            ValueError: count is negative or larger than chunk_size, or chunk_index is negative
+        """
+        if not 0 <= count <= self.chunk_size:
+            # A larger batch would reuse the IDs of the next chunk
+            raise ValueError(f"count must be between 0 and chunk_size ({self.chunk_size}), got {count}")
+        if chunk_index < 0:
+            raise ValueError("chunk_index must not be negative")
+        # Each chunk gets its own stream derived from (seed, chunk_index)
+        rng = np.random.default_rng([self.seed, chunk_index])
+        first_id = self.id_start + chunk_index * self.chunk_size
+        return PetBatch(
+            ids=np.arange(first_id, first_id + count, dtype=np.int64),
+            category_ids=rng.integers(1, 11, size=count),
+            tag_ids=rng.integers(1, 101, size=count),
+            status_codes=rng.choice(len(self.statuses), size=count, p=self.status_probabilities),
+            statuses=self.statuses
+        )
+    
+    def iter_batches(self, total: int) -> Iterator[PetBatch]:
+        """Lazily yield columnar batches covering `total` pets"""
+        for chunk_index, offset in enumerate(range(0, total, self.chunk_size)):
+            yield self.generate_batch(min(self.chunk_size, total - offset), chunk_index)
+    
+    def iter_json_bodies(self, total: int) -> Iterator[List[bytes]]:
+        """Lazily yield pre-serialized JSON request bodies, one list per chunk"""
+        for batch in self.iter_batches(total):
+            yield batch.to_json_bodies()
+
+
 class PetSchema:
     """Expected schema for pet objects"""
     
@@ -118,3 +252,19 @@ class PetSchema:
                 return False
         
         return True
+    
+    @staticmethod
+    def validate_pet_list(pets: List[Any]) -> List[SchemaViolation]:
+        """
+        Validate a list of pets against the swagger Pet definition in one pass
+        
+        Uses the compiled validator (nested category and tags included) and
+        returns structured violations instead of printing them.
+        
+        Args:
+            pets: List of pet dictionaries, e.g. a findByStatus response
+            
+        Returns:
+            List of SchemaViolation records; empty when every pet is valid
+        """
+        return PET_VALIDATOR.validate_many(pets)